@@ -0,0 +1,99 @@
+#
+# (c) Copyright IBM Corp. 2025
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""In-process software GREP11 server used by the benchmarks."""
+
+from __future__ import annotations
+
+import datetime
+
+import grpc
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.x509.oid import NameOID
+
+from oso.framework.plugin.addons.signing_server import SigningServerConfig
+from oso.framework.plugin.addons.signing_server._soft_grep11 import (
+    SoftCryptoServicer,
+    serve as serve_soft_grep11,
+)
+
+
+def self_signed_certificate() -> tuple[bytes, bytes]:
+    """PEM encoded certificate and key for ``localhost``."""
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "localhost")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(days=1))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .add_extension(
+            x509.SubjectAlternativeName([x509.DNSName("localhost")]),
+            critical=False,
+        )
+        .sign(key, hashes.SHA256())
+    )
+    cert_pem = cert.public_bytes(serialization.Encoding.PEM)
+    key_pem = key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+    return cert_pem, key_pem
+
+
+def serve(
+    latency: float = 0.0,
+    options: list | None = None,
+    jitter: float = 0.0,
+    error_rate: float = 0.0,
+    **settings,
+):
+    """Start a TLS server on a free local port.
+
+    See `SoftCryptoServicer` for ``latency``, ``jitter`` and ``error_rate``.
+
+    Returns
+    -------
+    tuple[grpc.Server, SigningServerConfig]
+        The running server, and an unvalidated configuration connecting to it,
+        with ``settings`` applied, usable by ``Grep11Client``.
+    """
+    cert_pem, key_pem = self_signed_certificate()
+    servicer = SoftCryptoServicer(latency=latency, jitter=jitter, error_rate=error_rate)
+    server, port = serve_soft_grep11(
+        "localhost:0",
+        grpc.ssl_server_credentials([(key_pem, cert_pem)]),
+        servicer,
+        options=options,
+    )
+
+    config = SigningServerConfig.model_construct(
+        type="oso.framework.plugin.addons.signing_server",
+        ca_cert=cert_pem.decode(),
+        client_cert=cert_pem.decode(),
+        client_key=key_pem.decode(),
+        grep11_endpoint=[f"localhost:{port}"],
+        keystore_path="",
+        grep11_probe_interval=0,
+        **settings,
+    )
+    return server, config
@@ -0,0 +1,127 @@
+#
+# (c) Copyright IBM Corp. 2025
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Compare gRPC channel options against a local GREP11 stand-in.
+
+Reports first, the latency of a sign on a fresh channel, which pays for the
+TCP and TLS handshakes, next to a sign on a warm channel: keepalive pings avoid
+the former after idle periods behind NAT. Then, for every payload size, the
+median signing latency with the default options, gzip compression and a larger
+fixed flow control window. Compression pays off on slow links only, its cost is
+all that shows on loopback.
+
+Run with ``PYTHONPATH=src python benchmarks/channel_options.py``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import statistics
+import time
+from contextlib import closing
+
+from _server import serve
+
+from oso.framework.core.logging import LoggingFactory
+from oso.framework.plugin.addons.signing_server._grep11_client import Grep11Client
+from oso.framework.plugin.addons.signing_server._key import KeyType
+
+SIZES = [4 << 10, 64 << 10, 512 << 10, 2 << 20]
+
+VARIANTS = {
+    "default": {},
+    "gzip": {"grpc_compression": "gzip", "grpc_compression_min_size": 1024},
+    "window 4MiB": {"grpc_initial_window_size": 4 << 20},
+}
+
+
+def _payload(size: int, compressible: bool) -> bytes:
+    if not compressible:
+        return os.urandom(size)
+    record = b'{"to": "0x%s", "amount": 1000000, "memo": "transfer"}' % (
+        os.urandom(20).hex().encode()
+    )
+    return (record * (size // len(record) + 1))[:size]
+
+
+def _median_sign(
+    client: Grep11Client, key: bytes, payload: bytes, rounds: int
+) -> float:
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        client.sign(KeyType.SECP256K1, key, payload)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def _connection(config, key: bytes, rounds: int) -> tuple[float, float]:
+    cold = []
+    for _ in range(rounds):
+        client = Grep11Client(config)
+        try:
+            start = time.perf_counter()
+            client.sign(KeyType.SECP256K1, key, b"data")
+            cold.append(time.perf_counter() - start)
+            warm = _median_sign(client, key, b"data", rounds)
+        finally:
+            client.close()
+    return statistics.median(cold), warm
+
+
+def main() -> None:
+    """Run every channel option variant and print its signing latencies."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.0, help="server delay (s)")
+    parser.add_argument("--random", action="store_true", help="incompressible payloads")
+    args = parser.parse_args()
+
+    LoggingFactory(name="benchmark", level=logging.WARNING)
+    server, config = serve(latency=args.latency)
+    try:
+        with closing(Grep11Client(config)) as client:
+            key = client.generate_key_pair(KeyType.SECP256K1).PrivateKey
+        cold, warm = _connection(config, key, args.rounds)
+        print(f"fresh channel {cold * 1000:.3f} ms, warm channel {warm * 1000:.3f} ms")
+        print()
+
+        clients = {
+            name: Grep11Client(config.model_copy(update=settings))
+            for name, settings in VARIANTS.items()
+        }
+        try:
+            print(f"{'payload':>10} | " + " | ".join(f"{n:>11}" for n in clients))
+            for size in SIZES:
+                payload = _payload(size, compressible=not args.random)
+                latencies = [
+                    _median_sign(client, key, payload, args.rounds)
+                    for client in clients.values()
+                ]
+                print(
+                    f"{size:>10} | "
+                    + " | ".join(f"{latency * 1000:>8.3f} ms" for latency in latencies)
+                )
+        finally:
+            for client in clients.values():
+                client.close()
+    finally:
+        server.stop(None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#
+# (c) Copyright IBM Corp. 2025
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Compare signing raw payloads with signing their local digest.
+
+For every payload size, the size of the ``SignSingleRequest`` and the median
+signing latency against a local GREP11 stand-in are reported, once with the raw
+payload and once with the ``sign_digests`` mode, which hashes locally.
+
+Run with ``PYTHONPATH=src python benchmarks/sign_digest.py``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import logging
+import os
+import statistics
+import time
+
+from _server import serve
+
+from oso.framework.core.logging import LoggingFactory
+from oso.framework.plugin.addons.signing_server._grep11_client import Grep11Client
+from oso.framework.plugin.addons.signing_server._key import KeyType
+
+SIZES = [256, 4 << 10, 64 << 10, 512 << 10, 2 << 20]
+
+
+def _measure(
+    client: Grep11Client, key: bytes, payload: bytes, algorithm: str | None, rounds: int
+):
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        data = hashlib.new(algorithm, payload).digest() if algorithm else payload
+        client.sign(KeyType.SECP256K1, key, data)
+        timings.append(time.perf_counter() - start)
+    request_size = client._sign_request(KeyType.SECP256K1, key, data).ByteSize()
+    return request_size, statistics.median(timings)
+
+
+def main() -> None:
+    """Sign every payload size both ways and print the request sizes and latencies."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=50)
+    parser.add_argument("--algorithm", default="sha256")
+    parser.add_argument("--latency", type=float, default=0.0, help="server delay (s)")
+    args = parser.parse_args()
+
+    LoggingFactory(name="benchmark", level=logging.WARNING)
+    server, config = serve(latency=args.latency)
+    client = Grep11Client(config)
+    try:
+        key = client.generate_key_pair(KeyType.SECP256K1).PrivateKey
+        print(
+            f"{'payload':>10} | {'raw bytes':>10} {'raw ms':>8} | "
+            f"{'digest bytes':>12} {'digest ms':>9}"
+        )
+        for size in SIZES:
+            payload = os.urandom(size)
+            raw_bytes, raw_latency = _measure(client, key, payload, None, args.rounds)
+            digest_bytes, digest_latency = _measure(
+                client, key, payload, args.algorithm, args.rounds
+            )
+            print(
+                f"{size:>10} | {raw_bytes:>10} {raw_latency * 1000:>8.3f} | "
+                f"{digest_bytes:>12} {digest_latency * 1000:>9.3f}"
+            )
+    finally:
+        client.close()
+        server.stop(None)
+
+
+if __name__ == "__main__":
+    main()
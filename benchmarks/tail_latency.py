@@ -0,0 +1,98 @@
+#
+# (c) Copyright IBM Corp. 2025
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Measure hedging and retries against a slow and flaky GREP11 stand-in.
+
+Every call to the stand-in takes ``--latency`` seconds plus an exponentially
+distributed delay of mean ``--jitter``, and fails with ``UNAVAILABLE`` for a
+share ``--error-rate`` of the calls. For every variant, the signing latency
+percentiles and the share of failed signatures are reported.
+
+Run with ``PYTHONPATH=src python benchmarks/tail_latency.py``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import statistics
+import time
+from contextlib import closing
+
+from _server import serve
+
+from oso.framework.core.logging import LoggingFactory
+from oso.framework.plugin.addons.signing_server._grep11_client import Grep11Client
+from oso.framework.plugin.addons.signing_server._key import KeyType
+
+VARIANTS = {
+    "no retry": {"retry_max_attempts": 1, "circuit_breaker": False},
+    "retry": {"retry_max_attempts": 3, "circuit_breaker": False},
+    "retry+hedging": {
+        "retry_max_attempts": 3,
+        "circuit_breaker": False,
+        "hedging": True,
+    },
+}
+
+
+def _run(client: Grep11Client, key: bytes, rounds: int) -> tuple[list[float], int]:
+    timings = []
+    failed = 0
+    for _ in range(rounds):
+        start = time.perf_counter()
+        try:
+            client.sign(KeyType.SECP256K1, key, b"data")
+        except Exception:
+            failed += 1
+            continue
+        timings.append(time.perf_counter() - start)
+    return timings, failed
+
+
+def main() -> None:
+    """Run every variant against the stand-in and print its latencies."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.002, help="server delay (s)")
+    parser.add_argument("--jitter", type=float, default=0.002, help="mean extra (s)")
+    parser.add_argument("--error-rate", type=float, default=0.02)
+    args = parser.parse_args()
+
+    LoggingFactory(name="benchmark", level=logging.CRITICAL)
+    server, config = serve(
+        latency=args.latency, jitter=args.jitter, error_rate=args.error_rate
+    )
+    try:
+        with closing(Grep11Client(config.model_copy(update=VARIANTS["retry"]))) as c:
+            key = c.generate_key_pair(KeyType.SECP256K1).PrivateKey
+
+        print(f"{'variant':>14} | {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8} | failed")
+        for name, settings in VARIANTS.items():
+            with closing(Grep11Client(config.model_copy(update=settings))) as client:
+                timings, failed = _run(client, key, args.rounds)
+            # Inclusive, so the percentiles stay within the measured timings
+            percentiles = statistics.quantiles(timings, n=100, method="inclusive")
+            print(
+                f"{name:>14} | {percentiles[49] * 1000:>8.3f} "
+                f"{percentiles[98] * 1000:>8.3f} {max(timings) * 1000:>8.3f} | "
+                f"{failed / args.rounds:>6.1%}"
+            )
+    finally:
+        server.stop(None)
+
+
+if __name__ == "__main__":
+    main()
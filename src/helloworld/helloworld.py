@@ -105,8 +105,7 @@ class HelloWorld(PluginProtocol):
                   if command == "GENERATE":
                       nb = int(command_data.get("nb", 1))
                       keys_info = []
-                      for _ in range(nb):
-                          key_id, pub_key_pem = signing_server.generate_key_pair(KeyType.SECP256K1)
+                      for key_id, pub_key_pem in signing_server.generate_key_pairs(KeyType.SECP256K1, nb):
                           keys_info.append({
                             "keyid": key_id,
                             "public_key": pub_key_pem
@@ -0,0 +1,57 @@
+#
+# (c) Copyright IBM Corp. 2025
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Signing Sidecar Entrypoint."""
+
+
+import signal
+import sys
+
+from oso.framework.config import ConfigManager
+from oso.framework.core.logging import LoggingFactory
+from oso.framework.exceptions import StartupException
+
+
+def main() -> None:
+    """Entrypoint.
+
+    Serves the signing server addon of the plugin configuration on its
+    ``sidecar_socket``, until the process is terminated.
+    """
+    from oso.framework.config.models import app, logging  # noqa: F401
+    from oso.framework.plugin.extension import PluginConfig  # noqa: F401
+    from oso.framework.plugin.addons.signing_server import (
+        NAME,
+        SigningServerAddon,
+    )
+    from oso.framework.plugin.addons.signing_server._sidecar import SigningSidecar
+
+    config = ConfigManager.reload()
+    LoggingFactory(config.app.name, config.logging.level_as_int)
+
+    addon_config = next(
+        (addon for addon in config.plugin.addons if addon.type.NAME == NAME), None
+    )
+    if addon_config is None or not addon_config.sidecar_socket:
+        raise StartupException("No signing server addon with a sidecar_socket")
+
+    addon = SigningServerAddon(config.plugin, addon_config)
+    sidecar = SigningSidecar(addon, addon_config.sidecar_socket)
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        sidecar.serve_forever()
+    finally:
+        sidecar.server_close()
+        addon.close()
@@ -0,0 +1,118 @@
+#
+# (c) Copyright IBM Corp. 2025
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Software GREP11 Server Entrypoint."""
+
+
+import signal
+import sys
+from typing import Literal
+
+from pydantic import Field
+
+from oso.framework.config import AutoLoadConfig, ConfigManager
+from oso.framework.core.logging import LoggingFactory
+
+
+class _SoftGrep11Config(AutoLoadConfig, _config_prefix="soft_grep11"):
+    """Software GREP11 server configuration, from ``SOFT_GREP11__*`` variables.
+
+    Attributes
+    ----------
+    address : str, default="0.0.0.0:9876"
+        Address the server listens on.
+    latency : float, default=0.0
+        Seconds every call takes at least.
+    jitter : float, default=0.0
+        Mean of the exponentially distributed extra delay of every call.
+    error_rate : float, default=0.0
+        Share of the calls failing with ``error_code``.
+    error_code : str, default="UNAVAILABLE"
+        Status of the failing calls, one of ``UNAVAILABLE``,
+        ``DEADLINE_EXCEEDED``, ``RESOURCE_EXHAUSTED`` or ``INTERNAL``.
+    max_workers : int, default=32
+        Number of threads serving the calls.
+    wrapping_key : str, default=""
+        Hex encoded 256 bit AES key encrypting the private key blobs, so that
+        stored keys stay usable across restarts. Random by default.
+    session_ttl : float, default=300.0
+        Seconds a multi-part signing session is kept without a call.
+    max_sessions : int, default=10000
+        Number of multi-part signing sessions kept at most.
+    """
+
+    address: str = "0.0.0.0:9876"
+    latency: float = Field(default=0.0, ge=0)
+    jitter: float = Field(default=0.0, ge=0)
+    error_rate: float = Field(default=0.0, ge=0, le=1)
+    error_code: Literal[
+        "UNAVAILABLE", "DEADLINE_EXCEEDED", "RESOURCE_EXHAUSTED", "INTERNAL"
+    ] = "UNAVAILABLE"
+    max_workers: int = Field(default=32, gt=0)
+    wrapping_key: str = ""
+    session_ttl: float = Field(default=300.0, gt=0)
+    max_sessions: int = Field(default=10_000, gt=0)
+
+
+def main() -> None:
+    """Entrypoint.
+
+    Serves a software stand-in of a GREP11 server over mutual TLS, with the
+    certificates of the ``CERTS__*`` variables, until the process is
+    terminated. Not meant to hold real keys.
+    """
+    import grpc
+
+    from oso.framework.config.models import certs, logging  # noqa: F401
+
+    config = ConfigManager.reload()
+
+    # Imported once the configuration is loaded, the addon package registers
+    # the plugin configuration models this server does not need
+    from oso.framework.plugin.addons.signing_server._soft_grep11 import (
+        SoftCryptoServicer,
+        serve,
+    )
+    logger = LoggingFactory("SOFT_GREP11", config.logging.level_as_int).logger
+    settings = config.soft_grep11
+
+    servicer = SoftCryptoServicer(
+        latency=settings.latency,
+        jitter=settings.jitter,
+        error_rate=settings.error_rate,
+        error_code=grpc.StatusCode[settings.error_code],
+        wrapping_key=bytes.fromhex(settings.wrapping_key) or None,
+        session_ttl=settings.session_ttl,
+        max_sessions=settings.max_sessions,
+    )
+    credentials = grpc.ssl_server_credentials(
+        [(config.certs.app_key.encode(), config.certs.app_crt.encode())],
+        root_certificates=config.certs.ca.encode(),
+        require_client_auth=True,
+    )
+    server, port = serve(
+        settings.address, credentials, servicer, max_workers=settings.max_workers
+    )
+    logger.info(f"Software GREP11 server listening on port {port}")
+
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        server.wait_for_termination()
+    finally:
+        server.stop(None)
+
+
+if __name__ == "__main__":
+    main()
@@ -18,29 +18,55 @@
 from __future__ import annotations
 
 
+import asyncio
+import hashlib
 import uuid
 import logging
 import base64
-import sqlite3
 from pathlib import Path
 import pathlib
 import shutil
-from typing import TYPE_CHECKING, Callable
-from pydantic import field_validator
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import closing
+from typing import TYPE_CHECKING, Callable, Iterable, Literal
+from pydantic import Field, field_validator, model_validator
 
 from ..main import AddonProtocol, BaseAddonConfig
-from ._key import KeyPair, KeyType
+from ._batch import MicroBatcher, SignResult, bounded_map
+from ._hd import (
+    HDKeyDeriver,
+    HDNode,
+    derived_key_id,
+    is_derived,
+    parse_path,
+    split_key_id,
+)
+from ._key import KeyPair, KeyType, public_key_to_pem
+from ._key_cache import KeyCache
+from ._keystore import Keystore, KeyRow
+from ._health_cache import HealthCache
+from ._sidecar import SidecarClient
+from ._key_pool import KeyPoolRefiller
+from ._rewrap import KeyRewrapper, RewrapProgress
+from ._stream import Payload, iter_chunks, prefetch
+from ._verifier import LocalVerifier
 from ._grep11_client import Grep11Client
+from ._aio_grep11_client import AsyncGrep11Client
 from oso.framework.data.types import V1_3
 from oso.framework.core.logging import get_logger
 
 if TYPE_CHECKING:
-    from typing import Any, ClassVar, Literal
+    from typing import Any, ClassVar
 
 NAME: Literal["SigningServer"] = "SigningServer"
 
 
-def configure(framework_config: Any, addon_config: "SigningServerConfig") -> "SigningServerAddon":
+def configure(
+    framework_config: Any, addon_config: "SigningServerConfig"
+) -> "SigningServerAddon | SidecarClient":
+    if addon_config.sidecar_socket:
+        return SidecarClient(addon_config.sidecar_socket)
     return SigningServerAddon(framework_config, addon_config)
 
 
@@ -55,23 +81,320 @@ class SigningServerConfig(BaseAddonConfig):
         PEM-encoded certificate chain as a byte string for gRPC channel
     client_key: str
         PEM-encoded certificate chain as a byte string for gRPC channel
-    grep11_endpoint: str
-        Endpoint used to connect to the GREP11 server
+    grep11_endpoint: list[str], default=["localhost"]
+        Endpoints of the GREP11 servers, calls are spread over the healthy ones.
+        Accepts a comma separated string
+    grep11_endpoint_strategy: str, default="least_outstanding"
+        How an endpoint is picked for each request, ``least_outstanding`` or
+        ``weighted_round_robin``
+    grep11_endpoint_weights: list[int], default=[]
+        Weight of every endpoint, in the order of ``grep11_endpoint``. All
+        endpoints weigh the same by default. Accepts a comma separated string
+    grep11_probe_interval: float, default=5.0
+        Seconds between two background health probes of every endpoint when
+        there are several, ``0`` disables the probes
     keystore_path: str
         Path of the attached persistent data volume used to store generated
         keys between iterations
+    max_in_flight: int, default=16
+        Maximum number of concurrent GREP11 requests issued by batch calls
+    channel_pool_size: int, default=1
+        Number of gRPC channels, each with its own connection, to the GREP11
+        server. The ``*_async`` methods get as many ``grpc.aio`` channels
+    channel_pool_strategy: {"round_robin", "least_loaded"}, default="round_robin"
+        How a channel of the pool is picked for each request
+    grpc_keepalive_time: float, default=300.0
+        Seconds between two keepalive pings on every channel, so that idle
+        connections are not dropped by NAT or firewalls, ``0`` disables the
+        pings. The GREP11 server must permit pings this often
+    grpc_keepalive_timeout: float, default=20.0
+        Seconds to wait for a keepalive ping to be acknowledged before the
+        connection is closed
+    grpc_keepalive_permit_without_calls: bool, default=True
+        Whether keepalive pings are also sent when no call is in flight
+    grpc_max_send_message_length: int, default=0
+        Largest request sent to the GREP11 server in bytes, ``0`` keeps the
+        gRPC default and ``-1`` removes the limit
+    grpc_max_receive_message_length: int, default=0
+        Largest response accepted from the GREP11 server in bytes, ``0`` keeps
+        the gRPC default and ``-1`` removes the limit
+    grpc_initial_window_size: int, default=0
+        Initial HTTP/2 flow control window of every stream in bytes, which
+        then stays fixed. ``0`` keeps gRPC's window, sized from the observed
+        bandwidth-delay product
+    grpc_compression: {"none", "gzip"}, default="none"
+        Compression of requests of at least ``grpc_compression_min_size``
+        bytes
+    grpc_compression_min_size: int, default=65536
+        Size in bytes from which requests are compressed
+    key_cache_size: int, default=1024
+        Number of decoded keys kept in memory in front of the keystore, ``0``
+        disables the cache. Its size, hits, misses and evictions are reported
+        under ``key_cache`` in the health status
+    keystore_migration_batch_size: int, default=10000
+        Number of keys read and copied at a time when migrating the keystore
+        schema, which bounds memory use. The whole migration is a single
+        transaction
+    keystore_synchronous: {"OFF", "NORMAL", "FULL", "EXTRA"}, default="NORMAL"
+        SQLite ``synchronous`` pragma of the keystore, which runs in WAL mode
+    keystore_cache_size: int, default=-2000
+        SQLite ``cache_size`` pragma of every keystore connection, negative
+        values are in KiB
+    keystore_mmap_size: int, default=0
+        SQLite ``mmap_size`` pragma of every keystore connection, in bytes
+    keystore_busy_timeout: float, default=5.0
+        Seconds a keystore connection waits for a lock held by another one
+    key_pool_key_types: list[str], default=[]
+        Key types, e.g. ``SECP256K1``, to keep a pool of pre-generated key pairs
+        for. Accepts a comma separated string
+    key_pool_low_water: int, default=10
+        Pool depth below which the pool is refilled in the background
+    key_pool_high_water: int, default=100
+        Pool depth a refill stops at
+    key_pool_refill_concurrency: int, default=4
+        Number of concurrent key generations while refilling the pool
+    key_pool_refill_interval: float, default=5.0
+        Seconds between two checks of the pool depth
+    verify_mode: {"local", "grep11"}, default="local"
+        Verify signatures locally with the stored public key, or send every
+        verification to the GREP11 server
+    sign_stream_chunk_size: int, default=1048576
+        Number of bytes sent per ``SignUpdate`` request by `sign_stream`
+    sign_digests: dict[str, str], default={}
+        Hash algorithm, e.g. ``sha256``, per key type name. Data signed or
+        verified with a key of a listed type is hashed locally and only the
+        digest is sent. Only ECDSA key types, i.e. ``SECP256K1``, can be listed
+    hedging: bool, default=False
+        Issue a second attempt of a sign or verify request that is slower than
+        usual, keep the first result and cancel the other attempt. The
+        ``*_async`` methods do not hedge
+    hedge_percentile: float, default=95.0
+        Percentile of the recent latencies of a request after which it is hedged
+    hedge_min_delay: float, default=0.001
+        Minimum number of seconds before a request is hedged
+    hedge_initial_delay: float, default=0.1
+        Seconds before a request is hedged until enough latencies are recorded
+    circuit_breaker: bool, default=True
+        Reject requests to a GREP11 endpoint right away while it keeps failing,
+        including those of the ``*_async`` methods
+    circuit_failure_rate: float, default=0.5
+        Share of failed or slow requests to an endpoint that opens its circuit
+    circuit_slow_call_duration: float, default=10.0
+        Seconds after which a request counts as failed, ``0`` disables the
+        latency threshold
+    circuit_window: int, default=20
+        Number of recent requests the failure rate is computed over
+    circuit_min_calls: int, default=10
+        Number of requests needed before a circuit can open
+    circuit_open_duration: float, default=10.0
+        Seconds a circuit stays open before trial requests are let through
+    circuit_half_open_calls: int, default=3
+        Number of trial requests that must succeed to close a circuit again
+    adaptive_concurrency: bool, default=False
+        Bound the in-flight GREP11 requests with a limit that adapts to the
+        latency of signing requests, starting at ``max_in_flight``. The
+        ``*_async`` methods share the limit with the other ones
+    concurrency_min_limit: int, default=1
+        Lowest adaptive limit
+    concurrency_max_limit: int, default=64
+        Highest adaptive limit
+    concurrency_tolerance: float, default=2.0
+        Signing latency, relative to the lowest recent one, above which the
+        adaptive limit is lowered
+    concurrency_backoff: float, default=0.9
+        Factor applied to the adaptive limit when it is lowered
+    sign_timeout: float, default=10.0
+        Deadline of every GREP11 sign call in seconds, ``0`` for no deadline
+    verify_timeout: float, default=10.0
+        Deadline of every GREP11 verify call in seconds, ``0`` for no deadline
+    generate_key_pair_timeout: float, default=30.0
+        Deadline of every GREP11 key generation in seconds, ``0`` for no
+        deadline
+    health_check_timeout: float, default=5.0
+        Deadline of every GREP11 health check and probe in seconds, ``0`` for
+        no deadline
+    sign_batch_window: float, default=0.0
+        Seconds `SigningServerAddon.sign` calls are collected for, so that
+        concurrent calls share one keystore query and are sent as one wave of
+        requests, ``0`` disables the batching
+    sign_batch_max_size: int, default=64
+        Number of collected sign calls that sends the batch early
+    rewrap_batch_size: int, default=1000
+        Number of keys rewrapped per keystore transaction by `rewrap_keys`
+    hd_cache_size: int, default=4096
+        Number of HD keys, derived with `SigningServerAddon.derive_key`, kept
+        in memory together with the intermediate keys of their path. Evicted
+        keys are derived again when used, ``0`` disables the cache
+    sidecar_socket: str, default=""
+        Path of the Unix socket of a signing sidecar shared by every worker,
+        started with ``start-signing-sidecar``. When set, workers get a thin
+        `SidecarClient` to the sidecar instead of their own addon, with the
+        same methods, and only the sidecar holds GREP11 channels, keystore
+        connections and caches
+    startup_mode: {"blocking", "background"}, default="blocking"
+        Whether the addon checks the GREP11 server before it is created, or
+        connects to it in the background, reporting a "Warming up" status
+        until every channel to one endpoint is connected
+    health_check_cache_ttl: float, default=0.0
+        Seconds a health status is served for without contacting the GREP11
+        server, refreshed in the background every half of it. A status not
+        refreshed for that long is reported as unavailable. ``0`` disables
+        the cache
+    retry_max_attempts: int, default=3
+        Maximum number of attempts of sign and verify calls failing with
+        ``UNAVAILABLE``, ``1`` to disable retries
+    retry_initial_backoff: float, default=0.05
+        Upper bound of the delay before the first retry, in seconds
+    retry_max_backoff: float, default=1.0
+        Upper bound of the delay before any retry, in seconds
+    retry_backoff_multiplier: float, default=2.0
+        Growth of the delay bound after every retry
     """
     ca_cert: str
     client_cert: str
     client_key: str
-    grep11_endpoint: str = "localhost"
+    grep11_endpoint: list[str] = Field(
+        default_factory=lambda: ["localhost"], min_length=1
+    )
+    grep11_endpoint_strategy: Literal["least_outstanding", "weighted_round_robin"] = (
+        "least_outstanding"
+    )
+    grep11_endpoint_weights: list[int] = Field(default_factory=list)
+    grep11_probe_interval: float = Field(default=5.0, ge=0)
     keystore_path: str  # SQLite DB file
     legacy_keystore_dir: str | None = None  # Old filesystem store
+    max_in_flight: int = Field(default=16, gt=0)
+    channel_pool_size: int = Field(default=1, gt=0)
+    channel_pool_strategy: Literal["round_robin", "least_loaded"] = "round_robin"
+    grpc_keepalive_time: float = Field(default=300.0, ge=0)
+    grpc_keepalive_timeout: float = Field(default=20.0, gt=0)
+    grpc_keepalive_permit_without_calls: bool = True
+    grpc_max_send_message_length: int = Field(default=0, ge=-1)
+    grpc_max_receive_message_length: int = Field(default=0, ge=-1)
+    grpc_initial_window_size: int = Field(default=0, ge=0)
+    grpc_compression: Literal["none", "gzip"] = "none"
+    grpc_compression_min_size: int = Field(default=64 << 10, ge=0)
+    key_cache_size: int = Field(default=1024, ge=0)
+    keystore_migration_batch_size: int = Field(default=10_000, gt=0)
+    keystore_synchronous: Literal["OFF", "NORMAL", "FULL", "EXTRA"] = "NORMAL"
+    keystore_cache_size: int = -2000
+    keystore_mmap_size: int = Field(default=0, ge=0)
+    keystore_busy_timeout: float = Field(default=5.0, ge=0)
+    key_pool_key_types: list[str] = Field(default_factory=list)
+    key_pool_low_water: int = Field(default=10, ge=0)
+    key_pool_high_water: int = Field(default=100, gt=0)
+    key_pool_refill_concurrency: int = Field(default=4, gt=0)
+    key_pool_refill_interval: float = Field(default=5.0, gt=0)
+    verify_mode: Literal["local", "grep11"] = "local"
+    sign_stream_chunk_size: int = Field(default=1 << 20, gt=0)
+    sign_digests: dict[str, str] = Field(default_factory=dict)
+    hedging: bool = False
+    hedge_percentile: float = Field(default=95.0, gt=0, lt=100)
+    hedge_min_delay: float = Field(default=0.001, ge=0)
+    hedge_initial_delay: float = Field(default=0.1, ge=0)
+    circuit_breaker: bool = True
+    circuit_failure_rate: float = Field(default=0.5, gt=0, le=1)
+    circuit_slow_call_duration: float = Field(default=10.0, ge=0)
+    circuit_window: int = Field(default=20, gt=0)
+    circuit_min_calls: int = Field(default=10, gt=0)
+    circuit_open_duration: float = Field(default=10.0, ge=0)
+    circuit_half_open_calls: int = Field(default=3, gt=0)
+    adaptive_concurrency: bool = False
+    concurrency_min_limit: int = Field(default=1, gt=0)
+    concurrency_max_limit: int = Field(default=64, gt=0)
+    concurrency_tolerance: float = Field(default=2.0, gt=1)
+    concurrency_backoff: float = Field(default=0.9, gt=0, lt=1)
+    sign_timeout: float = Field(default=10.0, ge=0)
+    verify_timeout: float = Field(default=10.0, ge=0)
+    generate_key_pair_timeout: float = Field(default=30.0, ge=0)
+    health_check_timeout: float = Field(default=5.0, ge=0)
+    sign_batch_window: float = Field(default=0.0, ge=0)
+    sign_batch_max_size: int = Field(default=64, gt=0)
+    rewrap_batch_size: int = Field(default=1000, gt=0)
+    hd_cache_size: int = Field(default=4096, ge=0)
+    sidecar_socket: str = ""
+    startup_mode: Literal["blocking", "background"] = "blocking"
+    health_check_cache_ttl: float = Field(default=0.0, ge=0)
+    retry_max_attempts: int = Field(default=3, gt=0)
+    retry_initial_backoff: float = Field(default=0.05, ge=0)
+    retry_max_backoff: float = Field(default=1.0, ge=0)
+    retry_backoff_multiplier: float = Field(default=2.0, ge=1)
 
     @field_validator("ca_cert", "client_cert", "client_key", mode="before")
     def _decode_base64_fields(cls, v: str) -> str:
         return base64.b64decode(v).decode("utf-8")
 
+    @field_validator(
+        "grep11_endpoint",
+        "grep11_endpoint_weights",
+        "key_pool_key_types",
+        mode="before",
+    )
+    def _split_list_fields(cls, v: Any) -> Any:
+        # Lists nested in addon configs come from the environment as a comma
+        # separated string, or as a mapping of indexes
+        if isinstance(v, str):
+            return [item.strip() for item in v.split(",") if item.strip()]
+        if isinstance(v, dict):
+            return [v[k] for k in sorted(v, key=int)]
+        return v
+
+    @field_validator("key_pool_key_types", mode="after")
+    def _check_key_types(cls, v: list[str]) -> list[str]:
+        names = [name.upper() for name in v]
+        for name in names:
+            if name not in KeyType.__members__:
+                raise ValueError(f"Unknown key type '{name}'")
+        return names
+
+    @field_validator("sign_digests", mode="after")
+    def _check_sign_digests(cls, v: dict[str, str]) -> dict[str, str]:
+        # Nested keys from the environment are lower case
+        digests = {name.upper(): algorithm.lower() for name, algorithm in v.items()}
+        for name, algorithm in digests.items():
+            if name not in KeyType.__members__:
+                raise ValueError(f"Unknown key type '{name}'")
+            if name == KeyType.ED25519.name:
+                raise ValueError(
+                    "Ed25519 signs the data itself, it cannot be prehashed"
+                )
+            try:
+                digest_size = hashlib.new(algorithm).digest_size
+            except ValueError:
+                raise ValueError(f"Unknown hash algorithm '{algorithm}'")
+            if not digest_size:
+                raise ValueError(f"Hash algorithm '{algorithm}' has no fixed size")
+        return digests
+
+    @model_validator(mode="after")
+    def _check_endpoint_weights(self) -> "SigningServerConfig":
+        if self.grep11_endpoint_weights:
+            if len(self.grep11_endpoint_weights) != len(self.grep11_endpoint):
+                raise ValueError("grep11_endpoint_weights needs a weight per endpoint")
+            if min(self.grep11_endpoint_weights) <= 0:
+                raise ValueError("grep11_endpoint_weights must be positive")
+        return self
+
+    @model_validator(mode="after")
+    def _check_circuit_min_calls(self) -> "SigningServerConfig":
+        if self.circuit_min_calls > self.circuit_window:
+            raise ValueError("circuit_min_calls must not exceed circuit_window")
+        return self
+
+    @model_validator(mode="after")
+    def _check_concurrency_limits(self) -> "SigningServerConfig":
+        if self.concurrency_min_limit > self.concurrency_max_limit:
+            raise ValueError(
+                "concurrency_min_limit must not exceed concurrency_max_limit"
+            )
+        return self
+
+    @model_validator(mode="after")
+    def _check_key_pool_water_marks(self) -> "SigningServerConfig":
+        if self.key_pool_low_water > self.key_pool_high_water:
+            raise ValueError("key_pool_low_water must not exceed key_pool_high_water")
+        return self
+
 
 class SigningServerAddon(AddonProtocol):
     """Signing Server.
@@ -106,24 +429,108 @@ class SigningServerAddon(AddonProtocol):
 
         db_file.parent.mkdir(parents=True, exist_ok=True)
 
-        # SQLite connection
-        self._conn = sqlite3.connect(str(db_file))
-        self._conn.execute("""
-            CREATE TABLE IF NOT EXISTS keys (
-                id TEXT PRIMARY KEY,
-                key_type TEXT NOT NULL,
-                private_key TEXT NOT NULL,
-                public_key TEXT NOT NULL
-            )
-        """)
-        self._conn.commit()
+        # SQLite keystore, migrated to the current schema if needed
+        self._keystore = Keystore(
+            db_file,
+            migration_batch_size=self._config.keystore_migration_batch_size,
+            synchronous=self._config.keystore_synchronous,
+            cache_size=self._config.keystore_cache_size,
+            mmap_size=self._config.keystore_mmap_size,
+            busy_timeout=self._config.keystore_busy_timeout,
+        )
+
+        self._key_cache: KeyCache[tuple[KeyType, KeyPair]] = KeyCache(
+            self._config.key_cache_size
+        )
 
         # Migrate and delete old filesystem keystore
         if self._config.legacy_keystore_dir:
             self._migrate_and_cleanup_legacy(self._config.legacy_keystore_dir)
 
         self._grep11_client = Grep11Client(self._config)
-        self._grep11_client.health_check()
+
+        # Children of HD parents, derived when used and never stored
+        self._hd_keys = HDKeyDeriver(
+            load_parent=self._load_hd_parent,
+            derive=self._derive_hd_child,
+            derive_public=self._derive_hd_public_key,
+            cache_size=self._config.hd_cache_size,
+        )
+
+        self._health_cache: HealthCache | None = None
+        if self._config.health_check_cache_ttl:
+            self._health_cache = HealthCache(
+                check=self._grep11_client.health_check,
+                ttl=self._config.health_check_cache_ttl,
+            )
+
+        self._warmed_up = threading.Event()
+        self._closing = threading.Event()
+        self._warm_up_thread: threading.Thread | None = None
+        if self._config.startup_mode == "background":
+            self._warm_up_thread = threading.Thread(
+                target=self._warm_up, name="signing-server-warm-up", daemon=True
+            )
+            self._warm_up_thread.start()
+        else:
+            self._start_health_cache(self._grep11_client.health_check())
+            self._warmed_up.set()
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=self._config.max_in_flight,
+            thread_name_prefix="signing-server",
+        )
+
+        self._verifier = LocalVerifier()
+
+        self._sign_batcher: MicroBatcher[tuple[str, bytes], str] | None = None
+        if self._config.sign_batch_window:
+            self._sign_batcher = MicroBatcher(
+                handler=self._sign_batch,
+                window=self._config.sign_batch_window,
+                max_size=self._config.sign_batch_max_size,
+                name="signing-server-sign-batcher",
+            )
+
+        self._key_pool: KeyPoolRefiller | None = None
+        if self._config.key_pool_key_types:
+            self._key_pool = KeyPoolRefiller(
+                keystore=self._keystore,
+                generate=lambda key_type: self._grep11_client.generate_key_pair(
+                    key_type=key_type
+                ),
+                key_types=[KeyType[name] for name in self._config.key_pool_key_types],
+                low_water=self._config.key_pool_low_water,
+                high_water=self._config.key_pool_high_water,
+                concurrency=self._config.key_pool_refill_concurrency,
+                interval=self._config.key_pool_refill_interval,
+            )
+            self._key_pool.start()
+
+        # Created on first use, grpc.aio channels are bound to an event loop
+        self._aio_client: AsyncGrep11Client | None = None
+        self._aio_loop: asyncio.AbstractEventLoop | None = None
+
+    def _start_health_cache(self, status: V1_3.ComponentStatus | None) -> None:
+        if self._health_cache is not None:
+            self._health_cache.start(status)
+
+    def _warm_up(self) -> None:
+        """Connect to the GREP11 server, then check its health."""
+        self._logger.info("Warming up the GREP11 connection in the background")
+        ready = self._grep11_client.connect()
+        while not ready.wait(1.0):
+            if self._closing.is_set():
+                return
+        self._logger.info("Connected to the GREP11 server")
+
+        status: V1_3.ComponentStatus | None = None
+        try:
+            status = self._grep11_client.health_check()
+        except Exception as e:
+            self._logger.warning(f"GREP11 health check after warm-up failed: {e}")
+        self._start_health_cache(status)
+        self._warmed_up.set()
 
     def _migrate_and_cleanup_legacy(self, legacy_dir: str):
         legacy_path = pathlib.Path(legacy_dir)
@@ -131,7 +538,7 @@ class SigningServerAddon(AddonProtocol):
             self._logger.debug(f"No legacy keystore found at {legacy_dir}")
             return
 
-        migrated_count = 0
+        rows: list[KeyRow] = []
         for key_type_dir in legacy_path.iterdir():
             if not key_type_dir.is_dir():
                 continue
@@ -147,20 +554,17 @@ class SigningServerAddon(AddonProtocol):
 
                 key_id = priv_file.stem
                 # Skip if already in DB
-                cur = self._conn.execute("SELECT 1 FROM keys WHERE id = ?", (key_id,))
-                if cur.fetchone():
+                if self._keystore.exists(key_id):
                     continue
 
                 priv_bytes = priv_file.read_bytes()
                 pub_bytes = pub_file.read_bytes()
 
-                self._conn.execute(
-                    "INSERT INTO keys (id, key_type, private_key, public_key) VALUES (?, ?, ?, ?)",
-                    (key_id, key_type.name, priv_bytes.hex(), pub_bytes.hex())
-                )
-                migrated_count += 1
+                rows.append((key_id, key_type.name, priv_bytes, pub_bytes))
 
-        self._conn.commit()
+        self._keystore.insert_many(rows)
+        self._key_cache.clear()
+        migrated_count = len(rows)
 
         # Log migration result
         if migrated_count > 0:
@@ -200,8 +604,12 @@ class SigningServerAddon(AddonProtocol):
                 The public key in PEM format.
         """
         logging.info(f"Generating new key pair of type {key_type.name}")
-        key_pair = self._grep11_client.generate_key_pair(key_type=key_type)
-        key_id = self._save_key_pair(key_type, key_pair)
+        pooled = self._claim_pooled_key_pair(key_type)
+        if pooled is not None:
+            key_id, key_pair = pooled
+        else:
+            key_pair = self._grep11_client.generate_key_pair(key_type=key_type)
+            key_id = self._save_key_pair(key_type, key_pair)
         pub_key_pem = self._grep11_client.serialized_key_to_pem(
             key_type=key_type, pub_key_bytes=key_pair.PublicKey
         )
@@ -209,6 +617,231 @@ class SigningServerAddon(AddonProtocol):
         self._logger.debug(f"New key id: '{key_id}'")
         return key_id, pub_key_pem
 
+    def _claim_pooled_key_pair(self, key_type: KeyType) -> tuple[str, KeyPair] | None:
+        claimed = self._claim_pooled_key_pairs(key_type, 1)
+        return claimed[0] if claimed else None
+
+    def _claim_pooled_key_pairs(
+        self, key_type: KeyType, n: int
+    ) -> list[tuple[str, KeyPair]]:
+        if (
+            self._key_pool is None
+            or key_type.name not in self._config.key_pool_key_types
+        ):
+            return []
+
+        rows = self._keystore.claim_many_from_pool(key_type.name, n)
+        self._key_pool.notify()
+        if len(rows) < n:
+            self._logger.warning(f"Key pool of {key_type.name} is empty")
+
+        for key_id, *_ in rows:
+            self._logger.debug(f"Claimed pooled key pair '{key_id}'")
+        return [
+            (key_id, KeyPair(PrivateKey=private_key, PublicKey=public_key))
+            for key_id, _, private_key, public_key in rows
+        ]
+
+    def generate_key_pairs(
+        self, key_type: KeyType, n: int, max_in_flight: int | None = None
+    ) -> list[tuple[str, bytes]]:
+        """Generate many key pairs concurrently.
+
+        Key pairs are claimed from the key pool first, if the key type is
+        pooled. The remaining GREP11 requests are issued concurrently and every
+        generated key is persisted in a single keystore transaction. Failed
+        generations are logged and skipped, so fewer than ``n`` pairs may be
+        returned.
+
+        Parameters
+        ----------
+        key_type : KeyType
+            The type of keys to generate.
+        n : int
+            Number of key pairs to generate.
+        max_in_flight : int | None
+            Maximum number of concurrent generation requests, defaults to
+            ``max_in_flight`` from the addon configuration.
+
+        Returns
+        -------
+        list[tuple[str, bytes]]
+            Pairs of key ID and public key in PEM format.
+        """
+        self._logger.info(f"Generating {n} new key pair(s) of type {key_type.name}")
+        limit = min(
+            max_in_flight or self._config.max_in_flight, self._config.max_in_flight
+        )
+
+        pooled = self._claim_pooled_key_pairs(key_type, n)
+        outcomes = bounded_map(
+            self._executor,
+            lambda _: self._grep11_client.generate_key_pair(key_type=key_type),
+            range(n - len(pooled)),
+            limit,
+        )
+
+        key_pairs: list[KeyPair] = []
+        for outcome in outcomes:
+            if isinstance(outcome, Exception):
+                self._logger.error(f"Key pair generation failed: {outcome}")
+            else:
+                key_pairs.append(outcome)
+
+        key_ids = [key_id for key_id, _ in pooled]
+        key_ids += self._save_key_pairs(key_type, key_pairs)
+        key_pairs = [key_pair for _, key_pair in pooled] + key_pairs
+        self._logger.info(f"Finished generating {len(key_ids)} new key pair(s)")
+        return [
+            (
+                key_id,
+                self._grep11_client.serialized_key_to_pem(
+                    key_type=key_type, pub_key_bytes=key_pair.PublicKey
+                ),
+            )
+            for key_id, key_pair in zip(key_ids, key_pairs)
+        ]
+
+    def rewrap_keys(
+        self,
+        job: str = "rewrap",
+        max_in_flight: int | None = None,
+        on_progress: Callable[[RewrapProgress], None] | None = None,
+    ) -> RewrapProgress:
+        """Rewrap every stored private key after a wrapping key rotation.
+
+        The blobs are rewrapped concurrently with ``RewrapKeyBlob`` and written
+        back ``rewrap_batch_size`` keys per transaction, together with a
+        checkpoint. Running a job again under the same name after a crash
+        resumes where it stopped. Keys that failed before the crash are not
+        retried by the resumed run, start the job again once it has finished
+        to pick them up.
+
+        Parameters
+        ----------
+        job : str
+            Name of the job, to tell concurrent jobs apart.
+        max_in_flight : int | None
+            Maximum number of concurrent rewrap requests, defaults to
+            ``max_in_flight`` from the addon configuration.
+        on_progress : Callable[[RewrapProgress], None] | None
+            Called after every transaction with the progress of the job.
+
+        Returns
+        -------
+        RewrapProgress
+            Counts of rewrapped and failed keys, throughput and the IDs of the
+            keys that failed.
+        """
+        limit = min(
+            max_in_flight or self._config.max_in_flight, self._config.max_in_flight
+        )
+
+        def _invalidate(key_ids: list[str]) -> None:
+            for key_id in key_ids:
+                self._key_cache.invalidate(key_id)
+
+        rewrapper = KeyRewrapper(
+            keystore=self._keystore,
+            rewrap=self._grep11_client.rewrap_key_blob,
+            executor=self._executor,
+            max_in_flight=limit,
+            batch_size=self._config.rewrap_batch_size,
+            job=job,
+            on_rewrapped=_invalidate,
+            on_progress=on_progress,
+        )
+        progress = rewrapper.run()
+        # Derived keys are wrapped like their parent
+        self._hd_keys.clear()
+        return progress
+
+    def generate_hd_parent(self, key_type: KeyType) -> str:
+        """Generate the parent of a tree of hierarchical deterministic keys.
+
+        A random seed and the master key derived from it are generated by the
+        GREP11 server, BIP32 for SECP256K1 keys and SLIP10 for ED25519 keys.
+        Only the master key and its chain code are stored.
+
+        Parameters
+        ----------
+        key_type : KeyType
+            The type of the keys derived from the parent.
+
+        Returns
+        -------
+        str
+            The unique identifier of the parent, see `derive_key`.
+        """
+        private_key, chain_code = self._grep11_client.generate_hd_master(key_type)
+        parent_id = str(uuid.uuid4())
+        self._keystore.insert_hd_parent(
+            parent_id, key_type.name, private_key, chain_code
+        )
+        self._logger.info(f"Generated HD parent of type {key_type.name}")
+        self._logger.debug(f"New HD parent id: '{parent_id}'")
+        return parent_id
+
+    def derive_key(self, parent_id: str, path: str) -> tuple[str, str]:
+        """Derive a child key of an HD parent.
+
+        The key is derived with ``DeriveKey`` and kept in a bounded cache, but
+        never stored. Its ID is made of the parent ID and the path, and can be
+        used like the ID of a stored key: the key is derived again whenever it
+        is no longer cached.
+
+        Parameters
+        ----------
+        parent_id : str
+            The unique identifier of the parent, see `generate_hd_parent`.
+        path : str
+            Derivation path, e.g. ``m/44'/60'/0'/0/7``. ED25519 keys only
+            have hardened children.
+
+        Returns
+        -------
+        tuple[str, str]
+            - key_id : str
+                The unique identifier of the derived key.
+            - pub_key_pem : str
+                The public key in PEM format.
+
+        Raises
+        ------
+        ValueError
+            If the path is invalid.
+        """
+        indexes = parse_path(path)
+        keys = self._hd_keys.key_pair(parent_id, indexes)
+        if not keys:
+            raise Exception(f"Could not find HD parent for key id: '{parent_id}'")
+        key_type, key_pair = keys
+        pub_key_pem = self._grep11_client.serialized_key_to_pem(
+            key_type=key_type, pub_key_bytes=key_pair.PublicKey
+        )
+        return derived_key_id(parent_id, indexes), pub_key_pem
+
+    def _load_hd_parent(self, parent_id: str) -> HDNode | None:
+        row = self._keystore.get_hd_parent(parent_id)
+        if not row:
+            return None
+        key_type_name, private_key, chain_code = row
+        key_type = self._get_key_type(key_type_name)
+        if key_type is None:
+            return None
+        return HDNode(key_type, private_key, chain_code)
+
+    def _derive_hd_child(self, node: HDNode, index: int) -> HDNode:
+        private_key, chain_code = self._grep11_client.derive_key(
+            node.key_type, node.private_key, node.chain_code, index
+        )
+        return HDNode(node.key_type, private_key, chain_code)
+
+    def _derive_hd_public_key(self, node: HDNode, index: int) -> bytes:
+        return self._grep11_client.derive_public_key(
+            node.key_type, node.private_key, node.chain_code, index
+        )
+
     def list_keys(self, key_type: KeyType) -> list[str]:
         """Find the existing keys of the specified type in the keystore.
 
@@ -222,8 +855,7 @@ class SigningServerAddon(AddonProtocol):
         list[str]
             List of key ids of the given key type.
         """
-        cur = self._conn.execute("SELECT id FROM keys WHERE key_type = ?", (key_type.name,))
-        return [row[0] for row in cur.fetchall()]
+        return self._keystore.list_ids(key_type.name)
 
     def get_key_pem(self, key_id: str) -> bytes | None:
         """Get the public key PEM for a given key ID.
@@ -239,14 +871,41 @@ class SigningServerAddon(AddonProtocol):
             The PEM-encoded public key as bytes if the key is found and conversion
             succeeds, otherwise None.
         """
-        keys = self._find_keys(key_id)
-        if not keys:
+        pem = self.get_key_pems([key_id])[0]
+        if pem is None:
             self._logger.info(f"Could not find key pair for key id: '{key_id}'")
-            return None
-        key_type, key_pair = keys
-        return self._grep11_client.serialized_key_to_pem(
-            key_type=key_type, pub_key_bytes=key_pair.PublicKey
+        return pem
+
+    def get_key_pems(self, key_ids: Iterable[str]) -> list[str | None]:
+        """Get the public key PEMs for many key IDs.
+
+        The PEMs are read from the keystore with a single query per 500 keys,
+        the public keys of derived keys are derived if not cached.
+
+        Parameters
+        ----------
+        key_ids : Iterable[str]
+            The unique identifiers of the keys.
+
+        Returns
+        -------
+        list[str | None]
+            The PEM-encoded public keys, in input order, None for keys that are
+            not found.
+        """
+        key_ids = list(key_ids)
+        stored = self._keystore.get_pems(
+            [key_id for key_id in key_ids if not is_derived(key_id)]
         )
+        pems = iter(stored)
+        return [
+            self._derived_key_pem(key_id) if is_derived(key_id) else next(pems)
+            for key_id in key_ids
+        ]
+
+    def _derived_key_pem(self, key_id: str) -> str | None:
+        keys = self._find_keys(key_id)
+        return None if keys is None else public_key_to_pem(keys[1].PublicKey)
 
     def _find_keys(self, key_id: str) -> tuple[KeyType, KeyPair] | None:
         """Find private and public keys for the given key ID.
@@ -269,26 +928,57 @@ class SigningServerAddon(AddonProtocol):
         ------
         FileNotFoundError
             If either the private or public key file exists but is not a valid file.
+        ValueError
+            If the key is derived from an HD parent along an invalid path.
         """
-        row = self._conn.execute(
-            "SELECT key_type, private_key, public_key FROM keys WHERE id = ?",
-            (key_id,)
-        ).fetchone()
+        derived = split_key_id(key_id)
+        if derived is not None:
+            return self._hd_keys.key_pair(*derived)
+
+        cached = self._key_cache.get(key_id)
+        if cached is not None:
+            return cached
+
+        row = self._keystore.get(key_id)
 
         if not row:
             return None
 
-        key_type_name, priv_hex, pub_hex = row
+        key_type_name, priv_bytes, pub_bytes = row
         key_type = self._get_key_type(key_type_name)
         if key_type is None:
             return None
 
-        key_pair = KeyPair(
-            PrivateKey=bytes.fromhex(priv_hex),
-            PublicKey=bytes.fromhex(pub_hex)
-        )
+        key_pair = KeyPair(PrivateKey=priv_bytes, PublicKey=pub_bytes)
+        self._key_cache.put(key_id, (key_type, key_pair))
         return key_type, key_pair
 
+    def _find_many_keys(
+        self, key_ids: list[str]
+    ) -> list[tuple[KeyType, KeyPair] | None]:
+        """Find the keys of many key IDs, with a single keystore query.
+
+        See `_find_keys`.
+        """
+        found: list[tuple[KeyType, KeyPair] | None] = [
+            self._key_cache.get(key_id) for key_id in key_ids
+        ]
+        missing = [i for i, keys in enumerate(found) if keys is None]
+        if not missing:
+            return found
+
+        rows = self._keystore.get_many([key_ids[i] for i in missing])
+        for i, row in zip(missing, rows):
+            if not row:
+                continue
+            key_type_name, priv_bytes, pub_bytes = row
+            key_type = self._get_key_type(key_type_name)
+            if key_type is None:
+                continue
+            found[i] = (key_type, KeyPair(PrivateKey=priv_bytes, PublicKey=pub_bytes))
+            self._key_cache.put(key_ids[i], found[i])
+        return found
+
     def _get_key_type(self, key_type_name: str) -> KeyType | None:
         for kt in KeyType:
             if kt.name == key_type_name:
@@ -296,22 +986,41 @@ class SigningServerAddon(AddonProtocol):
         return None
 
     def _save_key_pair(self, key_type: KeyType, key_pair: KeyPair) -> str:
-        key_id = str(uuid.uuid4())
-        pub_hex = key_pair.PublicKey.hex()
-        self._logger.info(
-           f"Saving key pair: key_type='{key_type.name}', key_id='{key_id}', public_key='{pub_hex}'"
-        )
+        return self._save_key_pairs(key_type, [key_pair])[0]
 
-        self._conn.execute(
-            "INSERT INTO keys (id, key_type, private_key, public_key) VALUES (?, ?, ?, ?)",
-            (key_id, key_type.name, key_pair.PrivateKey.hex(), pub_hex)
-        )
-        self._conn.commit()
-        return key_id
+    def _save_key_pairs(self, key_type: KeyType, key_pairs: list[KeyPair]) -> list[str]:
+        rows: list[KeyRow] = []
+        for key_pair in key_pairs:
+            key_id = str(uuid.uuid4())
+            self._logger.debug(
+                f"Saving key pair: key_type='{key_type.name}', key_id='{key_id}', "
+                f"public_key='{key_pair.PublicKey.hex()}'"
+            )
+            rows.append(
+                (key_id, key_type.name, key_pair.PrivateKey, key_pair.PublicKey)
+            )
+
+        # Single transaction, a single fsync for the whole batch
+        self._logger.info(f"Saving {len(rows)} {key_type.name} key pair(s)")
+        self._keystore.insert_many(rows)
+        for key_id, *_ in rows:
+            self._key_cache.invalidate(key_id)
+        return [row[0] for row in rows]
+
+    def _message(self, key_type: KeyType, data: bytes) -> bytes:
+        """Return the data sent for signing or verification, see ``sign_digests``."""
+        algorithm = self._config.sign_digests.get(key_type.name)
+        if algorithm is None:
+            return data
+        return hashlib.new(algorithm, data).digest()
 
     def sign(self, key_id: str, data: bytes) -> str:
         """Sign data using GREP11 server.
 
+        If ``sign_digests`` lists the key type, the data is hashed locally and
+        only its digest is sent. With ``sign_batch_window``, concurrent calls
+        are collected and signed together.
+
         Parameters
         ----------
         key_id : str
@@ -324,14 +1033,145 @@ class SigningServerAddon(AddonProtocol):
         str
             Signature as a string.
         """
+        # Derived keys are not in the keystore, they skip the batch query
+        if self._sign_batcher is not None and not is_derived(key_id):
+            return self._sign_batcher.submit((key_id, data)).result()
+
         keys = self._find_keys(key_id)
         if not keys:
             raise Exception(f"Could not find key pair for key id: '{key_id}'")
         key_type, key_pair = keys
+        return self._sign_with(key_type, key_pair, data)
+
+    def _sign_with(self, key_type: KeyType, key_pair: KeyPair, data: bytes) -> str:
         return self._grep11_client.sign(
-            key_type=key_type, priv_key_bytes=key_pair.PrivateKey, data=data
+            key_type=key_type,
+            priv_key_bytes=key_pair.PrivateKey,
+            data=self._message(key_type, data),
+        )
+
+    def _sign_batch(self, batch: list[tuple[tuple[str, bytes], Future[str]]]) -> None:
+        """Resolve the keys of a batch of `sign` calls and send them at once."""
+        found = self._find_many_keys([key_id for (key_id, _), _ in batch])
+
+        for ((key_id, data), future), keys in zip(batch, found):
+            if not keys:
+                future.set_exception(
+                    Exception(f"Could not find key pair for key id: '{key_id}'")
+                )
+                continue
+
+            def _settle(signed: Future[str], future: Future[str] = future) -> None:
+                try:
+                    future.set_result(signed.result())
+                except Exception as e:
+                    future.set_exception(e)
+
+            key_type, key_pair = keys
+            signed = self._executor.submit(self._sign_with, key_type, key_pair, data)
+            signed.add_done_callback(_settle)
+
+    def sign_stream(
+        self, key_id: str, payload: Payload, chunk_size: int | None = None
+    ) -> str:
+        """Sign a large payload without holding it in memory.
+
+        The payload is read in chunks on a background thread while the previous
+        chunk is sent to the GREP11 server, see `Grep11Client.sign_stream`.
+        SECP256K1 keys sign the SHA-256 digest of the payload, so the signature
+        verifies against ``hashlib.sha256(payload).digest()``.
+
+        Parameters
+        ----------
+        key_id : str
+            Key ID used to find stored key.
+        payload : Iterable[bytes] | BinaryIO
+            Data to be signed, as an iterable of chunks or a binary file.
+        chunk_size : int | None
+            Maximum number of bytes per request, defaults to
+            ``sign_stream_chunk_size`` from the addon configuration.
+
+        Returns
+        -------
+        str
+            Signature as a string.
+
+        Raises
+        ------
+        ValueError
+            If the key type does not support multi-part signing.
+        """
+        keys = self._find_keys(key_id)
+        if not keys:
+            raise Exception(f"Could not find key pair for key id: '{key_id}'")
+        key_type, key_pair = keys
+        chunks = iter_chunks(payload, chunk_size or self._config.sign_stream_chunk_size)
+        # Closing stops the reader thread if the signing fails midway
+        with closing(prefetch(chunks)) as prefetched:
+            return self._grep11_client.sign_stream(
+                key_type=key_type,
+                priv_key_bytes=key_pair.PrivateKey,
+                chunks=prefetched,
+            )
+
+    def sign_many(
+        self,
+        requests: Iterable[tuple[str, bytes]],
+        max_in_flight: int | None = None,
+    ) -> list[SignResult]:
+        """Sign many payloads concurrently using GREP11 server.
+
+        Keys are resolved on the calling thread while the signing requests are
+        dispatched concurrently over the gRPC channel. A failing item does not
+        abort the batch.
+
+        Parameters
+        ----------
+        requests : Iterable[tuple[str, bytes]]
+            Pairs of key ID and data to be signed.
+        max_in_flight : int | None
+            Maximum number of concurrent signing requests, defaults to
+            ``max_in_flight`` from the addon configuration.
+
+        Returns
+        -------
+        list[SignResult]
+            One result per request, in input order.
+        """
+        limit = min(
+            max_in_flight or self._config.max_in_flight, self._config.max_in_flight
         )
 
+        key_ids: list[str] = []
+
+        def _resolve():
+            # Runs on the calling thread, keystore lookups stay off the workers
+            for key_id, data in requests:
+                key_ids.append(key_id)
+                yield key_id, self._find_keys(key_id), data
+
+        def _sign(item) -> str:
+            key_id, keys, data = item
+            if not keys:
+                raise Exception(f"Could not find key pair for key id: '{key_id}'")
+            key_type, key_pair = keys
+            return self._grep11_client.sign(
+                key_type=key_type,
+                priv_key_bytes=key_pair.PrivateKey,
+                data=self._message(key_type, data),
+            )
+
+        outcomes = bounded_map(self._executor, _sign, _resolve(), limit)
+
+        results = []
+        for key_id, outcome in zip(key_ids, outcomes):
+            if isinstance(outcome, Exception):
+                self._logger.error(f"Signing failed for key '{key_id}': {outcome}")
+                results.append(SignResult(key_id=key_id, error=outcome))
+            else:
+                results.append(SignResult(key_id=key_id, signature=outcome))
+        return results
+
     def count_keys(self, key_type: KeyType | None = None) -> int:
         """
         Return the number of keys stored in the database.
@@ -346,22 +1186,56 @@ class SigningServerAddon(AddonProtocol):
         int
             Number of keys.
         """
-        if key_type is not None:
-            cur = self._conn.execute("SELECT COUNT(*) FROM keys WHERE key_type = ?", (key_type.name,))
-        else:
-            cur = self._conn.execute("SELECT COUNT(*) FROM keys")
-        row = cur.fetchone()
-        return row[0] if row else 0
+        return self._keystore.count(key_type.name if key_type is not None else None)
 
     def health_check(self) -> V1_3.ComponentStatus:
         """Check the GREP11 server health status.
 
+        With ``health_check_cache_ttl``, the status cached by the background
+        refresh is returned without contacting the GREP11 server. With the
+        ``background`` startup mode, a 503 "Warming up" status is returned
+        until the GREP11 connection is ready.
+
         Returns
         -------
         `oso.framework.data.types.ComponentStatus`
             OSO component status.
         """
-        return self._grep11_client.health_check()
+        if not self._warmed_up.is_set():
+            status = V1_3.ComponentStatus(
+                status_code=503,
+                status="Warming up",
+                errors=[
+                    V1_3.Error(code="2", message="Connecting to the GREP11 server")
+                ],
+            )
+        elif self._health_cache is not None:
+            status = self._health_cache.get()
+        else:
+            status = self._grep11_client.health_check()
+        return self._with_addon_stats(status)
+
+    def _with_addon_stats(self, status: V1_3.ComponentStatus) -> V1_3.ComponentStatus:
+        update: dict[str, Any] = {"key_cache": self._key_cache.stats()}
+        if self._key_pool is not None:
+            update["key_pool"] = self._key_pool.depth()
+        return status.model_copy(update=update)
+
+    def close(self) -> None:
+        """Stop background work and release the keystore connections."""
+        self._closing.set()
+        if self._warm_up_thread is not None:
+            self._warm_up_thread.join()
+        if self._sign_batcher is not None:
+            self._sign_batcher.close()
+        if self._key_pool is not None:
+            self._key_pool.stop()
+        if self._health_cache is not None:
+            self._health_cache.stop()
+        self._executor.shutdown()
+        self._close_aio_client()
+        self._grep11_client.close()
+        self._keystore.close()
 
     def verify(self, key_id: str, data: bytes, signature: str) -> bool:
         """
@@ -387,8 +1261,12 @@ class SigningServerAddon(AddonProtocol):
             return False
     
         key_type, key_pair = keys
+        data = self._message(key_type, data)
     
         try:
+            local = self._verify_locally(key_type, key_pair, data, signature)
+            if local is not None:
+                return local
             return self._grep11_client.verify(
                 key_type=key_type,
                 pub_key_bytes=key_pair.PublicKey,
@@ -398,3 +1276,214 @@ class SigningServerAddon(AddonProtocol):
         except Exception as e:
             self._logger.error(f"Signature verification failed for key '{key_id}': {e}")
             return False
+
+    def _verify_locally(
+        self, key_type: KeyType, key_pair: KeyPair, data: bytes, signature: str
+    ) -> bool | None:
+        """Verify with the stored public key if configured.
+
+        Returns None when the GREP11 server has to verify instead.
+        """
+        if self._config.verify_mode != "local":
+            return None
+        try:
+            return self._verifier.verify(
+                key_type=key_type,
+                pub_key_bytes=key_pair.PublicKey,
+                data=data,
+                signature=signature,
+            )
+        except ValueError as e:
+            self._logger.warning(f"Falling back to GREP11 verification: {e}")
+            return None
+
+    def verify_many(
+        self,
+        requests: Iterable[tuple[str, bytes, str]],
+        max_in_flight: int | None = None,
+    ) -> list[bool]:
+        """Verify many signatures concurrently.
+
+        Parameters
+        ----------
+        requests : Iterable[tuple[str, bytes, str]]
+            Triples of key ID, signed data and hex encoded signature.
+        max_in_flight : int | None
+            Maximum number of concurrent verifications, defaults to
+            ``max_in_flight`` from the addon configuration.
+
+        Returns
+        -------
+        list[bool]
+            Whether each signature is valid, in input order.
+        """
+        limit = min(
+            max_in_flight or self._config.max_in_flight, self._config.max_in_flight
+        )
+        outcomes = bounded_map(
+            self._executor,
+            lambda request: self.verify(*request),
+            requests,
+            limit,
+        )
+        return [outcome is True for outcome in outcomes]
+
+    async def _get_aio_client(self) -> AsyncGrep11Client:
+        """Return the client bound to the running event loop.
+
+        The async methods serve one event loop at a time. When called from
+        another loop, e.g. by a new `asyncio.run`, a new client replaces the
+        previous one, whose channels are closed.
+        """
+        loop = asyncio.get_running_loop()
+        if self._aio_client is not None and self._aio_loop is loop:
+            return self._aio_client
+
+        stale = self._aio_client
+        client = AsyncGrep11Client(
+            self._config,
+            router=self._grep11_client.router,
+            limiter=self._grep11_client.limiter,
+        )
+        self._aio_client, self._aio_loop = client, loop
+        if stale is not None:
+            # Closing without a grace period does not depend on the loop the
+            # channels were created on, which is usually closed by now
+            await stale.close()
+        return client
+
+    def _close_aio_client(self) -> None:
+        client, loop = self._aio_client, self._aio_loop
+        self._aio_client = self._aio_loop = None
+        if client is None or loop is None:
+            return
+
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if loop.is_running() and loop is not running:
+            asyncio.run_coroutine_threadsafe(client.close(), loop).result()
+        elif running is None:
+            asyncio.run(client.close())
+        else:
+            # Without a grace period, closing completes in the task's first step
+            running.create_task(client.close())
+
+    async def generate_key_pair_async(self, key_type: KeyType) -> tuple[str, bytes]:
+        """Generate a new key pair without blocking the event loop.
+
+        See `generate_key_pair`.
+        """
+        self._logger.info(f"Generating new key pair of type {key_type.name}")
+        client = await self._get_aio_client()
+        key_pair = await client.generate_key_pair(key_type=key_type)
+        key_id = self._save_key_pair(key_type, key_pair)
+        pub_key_pem = client.serialized_key_to_pem(
+            key_type=key_type, pub_key_bytes=key_pair.PublicKey
+        )
+        self._logger.debug(f"New key id: '{key_id}'")
+        return key_id, pub_key_pem
+
+    async def _find_keys_async(self, key_id: str) -> tuple[KeyType, KeyPair] | None:
+        """See `_find_keys`, derived keys are resolved on the executor."""
+        if not is_derived(key_id):
+            return self._find_keys(key_id)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._find_keys, key_id)
+
+    async def sign_async(self, key_id: str, data: bytes) -> str:
+        """Sign data using GREP11 server without blocking the event loop.
+
+        See `sign`.
+        """
+        keys = await self._find_keys_async(key_id)
+        if not keys:
+            raise Exception(f"Could not find key pair for key id: '{key_id}'")
+        key_type, key_pair = keys
+        client = await self._get_aio_client()
+        return await client.sign(
+            key_type=key_type,
+            priv_key_bytes=key_pair.PrivateKey,
+            data=self._message(key_type, data),
+        )
+
+    async def sign_many_async(
+        self,
+        requests: Iterable[tuple[str, bytes]],
+        max_in_flight: int | None = None,
+    ) -> list[SignResult]:
+        """Sign many payloads concurrently from the running event loop.
+
+        Unlike `sign_many`, the in-flight limit is not capped by the worker
+        threads, so it can be raised well above ``max_in_flight``. With
+        ``adaptive_concurrency``, the adaptive limit still applies.
+
+        Parameters
+        ----------
+        requests : Iterable[tuple[str, bytes]]
+            Pairs of key ID and data to be signed.
+        max_in_flight : int | None
+            Maximum number of concurrent signing requests, defaults to
+            ``max_in_flight`` from the addon configuration.
+
+        Returns
+        -------
+        list[SignResult]
+            One result per request, in input order.
+        """
+        semaphore = asyncio.Semaphore(max_in_flight or self._config.max_in_flight)
+
+        async def _sign(key_id: str, data: bytes) -> SignResult:
+            async with semaphore:
+                try:
+                    signature = await self.sign_async(key_id, data)
+                except Exception as e:
+                    self._logger.error(f"Signing failed for key '{key_id}': {e}")
+                    return SignResult(key_id=key_id, error=e)
+            return SignResult(key_id=key_id, signature=signature)
+
+        return list(
+            await asyncio.gather(*(_sign(key_id, data) for key_id, data in requests))
+        )
+
+    async def verify_async(self, key_id: str, data: bytes, signature: str) -> bool:
+        """Verify a signature without blocking the event loop.
+
+        See `verify`.
+        """
+        keys = await self._find_keys_async(key_id)
+        if not keys:
+            self._logger.info(f"Could not find key pair for key id: '{key_id}'")
+            return False
+
+        key_type, key_pair = keys
+        data = self._message(key_type, data)
+
+        try:
+            local = self._verify_locally(key_type, key_pair, data, signature)
+            if local is not None:
+                return local
+            client = await self._get_aio_client()
+            return await client.verify(
+                key_type=key_type,
+                pub_key_bytes=key_pair.PublicKey,
+                data=data,
+                signature=signature
+            )
+        except Exception as e:
+            self._logger.error(f"Signature verification failed for key '{key_id}': {e}")
+            return False
+
+    async def health_check_async(self) -> V1_3.ComponentStatus:
+        """Check the GREP11 server health status without blocking the event loop.
+
+        Returns
+        -------
+        `oso.framework.data.types.ComponentStatus`
+            OSO component status.
+        """
+        if self._health_cache is not None or not self._warmed_up.is_set():
+            return self.health_check()
+        client = await self._get_aio_client()
+        return self._with_addon_stats(await client.health_check())
@@ -0,0 +1,235 @@
+#
+# (c) Copyright IBM Corp. 2025
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import itertools
+from contextlib import AsyncExitStack, ExitStack, asynccontextmanager
+from typing import AsyncIterator
+
+import grpc
+
+from ._channel_pool import PoolStrategy
+from ._endpoint_router import EndpointRouter
+from ._key import KeyPair, KeyType
+from ._grep11_client import _Grep11ClientBase
+from ._limiter import AdaptiveLimiter
+from ._retry import RetryPolicy
+from .generated import server_pb2, server_pb2_grpc
+
+from oso.framework.data.types import V1_3
+from oso.framework.core.logging import get_logger
+
+
+class _AsyncChannel:
+    """A ``grpc.aio`` channel, its stub and its in-flight call count."""
+
+    def __init__(self, channel: grpc.aio.Channel) -> None:
+        self.channel = channel
+        self.stub = server_pb2_grpc.CryptoStub(channel)
+        self.in_flight = 0
+
+
+class _AsyncEndpoint:
+    """The ``grpc.aio`` channels to one endpoint."""
+
+    def __init__(
+        self, endpoint: str, channels: list[grpc.aio.Channel], strategy: PoolStrategy
+    ) -> None:
+        self.endpoint = endpoint
+        self.channels = [_AsyncChannel(channel) for channel in channels]
+        self.strategy = strategy
+        self._round_robin = itertools.count()
+
+    @property
+    def in_flight(self) -> int:
+        return sum(channel.in_flight for channel in self.channels)
+
+    def pick(self) -> _AsyncChannel:
+        if self.strategy == "least_loaded":
+            return min(self.channels, key=lambda channel: channel.in_flight)
+        return self.channels[next(self._round_robin) % len(self.channels)]
+
+
+class AsyncGrep11Client(_Grep11ClientBase):
+    """GREP11 client built on ``grpc.aio``.
+
+    Mirrors `Grep11Client` with coroutine methods, so that many HSM operations
+    can be in flight from a single event loop. The channels are bound to the
+    event loop running when the client is created. Every endpoint gets
+    ``channel_pool_size`` channels, picked with ``channel_pool_strategy``.
+
+    Given the ``router`` of a `Grep11Client`, every call is routed by it, so
+    that the endpoint health, in-flight counts and circuit breakers are shared
+    with the synchronous calls. Without one, every call goes to the endpoint
+    with the fewest in-flight calls. Given a ``limiter``, every call waits for
+    one of its slots, shared with the synchronous calls too.
+
+    Calls are not hedged.
+    """
+
+    def __init__(
+        self,
+        signing_server_config,
+        router: EndpointRouter | None = None,
+        limiter: AdaptiveLimiter | None = None,
+    ) -> None:
+        super().__init__()
+
+        self.logger = get_logger("grep11-aio-client")
+
+        self.logger.info("Initializing asyncio grep11 client")
+
+        self._router = router
+        self._limiter = limiter
+        self._timeouts = self._rpc_timeouts(signing_server_config)
+        self._set_compression(signing_server_config)
+        self._retry = RetryPolicy(
+            max_attempts=signing_server_config.retry_max_attempts,
+            initial_backoff=signing_server_config.retry_initial_backoff,
+            max_backoff=signing_server_config.retry_max_backoff,
+            multiplier=signing_server_config.retry_backoff_multiplier,
+        )
+        self._set_channels_and_stubs(
+            ca_cert=signing_server_config.ca_cert.encode(),
+            client_key=signing_server_config.client_key.encode(),
+            client_cert=signing_server_config.client_cert.encode(),
+            endpoints=signing_server_config.grep11_endpoint,
+            size=signing_server_config.channel_pool_size,
+            strategy=signing_server_config.channel_pool_strategy,
+            options=self._channel_options(signing_server_config),
+        )
+
+    def _set_channels_and_stubs(
+        self,
+        ca_cert: bytes,
+        client_key: bytes,
+        client_cert: bytes,
+        endpoints: list[str],
+        size: int,
+        strategy: PoolStrategy,
+        options: list[tuple[str, object]],
+    ) -> None:
+        self.logger.info("Setting asyncio channels and stubs")
+
+        channel_credential = self._channel_credentials(
+            ca_cert=ca_cert, client_key=client_key, client_cert=client_cert
+        )
+        # Like `ChannelPool`, every channel owns its own TCP connection
+        channel_options = [("grpc.use_local_subchannel_pool", 1), *options]
+
+        self._endpoints = {
+            endpoint: _AsyncEndpoint(
+                endpoint,
+                [
+                    grpc.aio.secure_channel(
+                        target=endpoint,
+                        credentials=channel_credential,
+                        options=channel_options,
+                    )
+                    for _ in range(size)
+                ],
+                strategy,
+            )
+            for endpoint in endpoints
+        }
+
+    @asynccontextmanager
+    async def _stub(self) -> AsyncIterator[server_pb2_grpc.CryptoStub]:
+        with ExitStack() as stack:
+            if self._router is not None:
+                endpoint = self._endpoints[stack.enter_context(self._router.route())]
+            else:
+                endpoint = min(self._endpoints.values(), key=lambda e: e.in_flight)
+
+            channel = endpoint.pick()
+            channel.in_flight += 1
+            try:
+                yield channel.stub
+            finally:
+                channel.in_flight -= 1
+
+    async def _call(self, rpc: str, request, idempotent: bool = False):
+        """Call an RPC with its deadline, retrying idempotent calls.
+
+        See `Grep11Client._call`.
+        """
+        timeout = self._timeouts.get(rpc)
+        compression = self._request_compression(request)
+
+        async def _attempt():
+            async with AsyncExitStack() as stack:
+                if self._limiter is not None:
+                    await stack.enter_async_context(
+                        self._limiter.slot_async(sample=rpc == "SignSingle")
+                    )
+                stub = await stack.enter_async_context(self._stub())
+                return await getattr(stub, rpc)(
+                    request, timeout=timeout, compression=compression
+                )
+
+        if idempotent:
+            return await self._retry.call_async(rpc, _attempt)
+        return await _attempt()
+
+    async def close(self) -> None:
+        """Close the underlying channels."""
+        for endpoint in self._endpoints.values():
+            for channel in endpoint.channels:
+                await channel.channel.close()
+
+    async def generate_key_pair(self, key_type: KeyType) -> KeyPair:
+        request = self._generate_key_pair_request(key_type)
+        response = await self._call("GenerateKeyPair", request)
+        return self._key_pair_from_response(key_type, response)
+
+    async def health_check(self) -> V1_3.ComponentStatus:
+        self.logger.info("Running health check")
+
+        try:
+            request = server_pb2.GetMechanismListRequest()
+            response = await self._call("GetMechanismList", request)
+            return self._health_status(response)
+
+        except Exception as e:
+            self.logger.debug(f"Health check error: {e}")
+            raise e
+
+    async def sign(self, key_type: KeyType, priv_key_bytes: bytes, data: bytes) -> str:
+        sign_request = self._sign_request(key_type, priv_key_bytes, data)
+        sign_response = await self._call("SignSingle", sign_request, idempotent=True)
+        return self._signature_from_response(sign_response)
+
+    async def verify(
+        self, key_type: KeyType, pub_key_bytes: bytes, data: bytes, signature: str
+    ) -> bool:
+        """Verify a signature using the GREP11 server.
+
+        See `Grep11Client.verify`.
+        """
+        try:
+            verify_request = self._verify_request(
+                key_type, pub_key_bytes, data, signature
+            )
+            verify_response = await self._call(
+                "VerifySingle", verify_request, idempotent=True
+            )
+
+            self.logger.info("Completed verification")
+            self.logger.debug(f"Received VerifySingleResponse: {verify_response=}")
+
+            return True
+        except Exception as e:
+            self.logger.error(f"Signature verification failed: {e}")
+            return False
@@ -0,0 +1,201 @@
+#
+# (c) Copyright IBM Corp. 2025
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Batch helpers for the Signing Server Addon."""
+
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from concurrent.futures import ALL_COMPLETED, FIRST_COMPLETED, Executor, Future, wait
+from dataclasses import dataclass
+from typing import Callable, Generic, Iterable, TypeVar
+
+from oso.framework.core.logging import get_logger
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+@dataclass
+class SignResult:
+    """Outcome of a single item of a batch signing call.
+
+    Attributes
+    ----------
+    key_id : str
+        The key ID the item was signed with.
+    signature : str | None
+        Hex encoded signature, set when signing succeeded.
+    error : Exception | None
+        The exception raised while signing, set when signing failed.
+    """
+
+    key_id: str
+    signature: str | None = None
+    error: Exception | None = None
+
+    @property
+    def ok(self) -> bool:
+        """Whether the item was signed successfully."""
+        return self.error is None
+
+
+def bounded_map(
+    executor: Executor,
+    fn: Callable[[T], R],
+    items: Iterable[T],
+    max_in_flight: int,
+) -> list[R | Exception]:
+    """Run ``fn`` over ``items`` with at most ``max_in_flight`` pending calls.
+
+    Items are pulled lazily from ``items`` so that large batches are never fully
+    materialized as futures.
+
+    Parameters
+    ----------
+    executor : concurrent.futures.Executor
+        Executor the calls are submitted to.
+    fn : Callable
+        Function applied to every item.
+    items : Iterable
+        Inputs to ``fn``.
+    max_in_flight : int
+        Maximum number of submitted but not yet completed calls.
+
+    Returns
+    -------
+    list
+        Results in input order. A call that raised is represented by the
+        exception instance instead of a result.
+    """
+    results: dict[int, R | Exception] = {}
+    pending: dict[Future[R], int] = {}
+
+    def _drain(return_when: str) -> None:
+        done, _ = wait(pending, return_when=return_when)
+        for future in done:
+            index = pending.pop(future)
+            try:
+                results[index] = future.result()
+            except Exception as e:
+                results[index] = e
+
+    count = 0
+    for index, item in enumerate(items):
+        if len(pending) >= max_in_flight:
+            _drain(FIRST_COMPLETED)
+        pending[executor.submit(fn, item)] = index
+        count += 1
+
+    if pending:
+        _drain(ALL_COMPLETED)
+
+    return [results[index] for index in range(count)]
+
+
+class MicroBatcher(Generic[T, R]):
+    """Group items submitted concurrently by independent callers into batches.
+
+    The first item submitted opens a batch, which is handed to ``handler`` on
+    the batcher thread once ``window`` seconds elapsed or ``max_size`` items
+    were collected. The handler must settle the future of every item, and
+    should hand slow work over to an executor so that the next batch is not
+    held back.
+
+    Parameters
+    ----------
+    handler : Callable[[list[tuple[T, Future[R]]]], None]
+        Processes a batch of items and their futures.
+    window : float
+        Seconds a batch stays open for after its first item.
+    max_size : int
+        Number of items that closes a batch early.
+    name : str
+        Name of the batcher thread.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[list[tuple[T, Future[R]]]], None],
+        window: float,
+        max_size: int,
+        name: str = "micro-batcher",
+    ) -> None:
+        self.logger = get_logger("signing_server.micro_batcher")
+        self.window = window
+        self.max_size = max_size
+        self._handler = handler
+        self._queue: queue.SimpleQueue[tuple[T, Future[R]] | None] = (
+            queue.SimpleQueue()
+        )
+        self._closed = False
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, item: T) -> Future[R]:
+        """Add an item to the open batch.
+
+        Raises
+        ------
+        RuntimeError
+            If the batcher is closed.
+        """
+        future: Future[R] = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Micro-batcher is closed")
+            self._queue.put((item, future))
+        return future
+
+    def close(self) -> None:
+        """Handle the items already submitted and stop the batcher thread."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(None)
+        self._thread.join()
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            entry = self._queue.get()
+            if entry is None:
+                break
+            batch = [entry]
+            deadline = time.monotonic() + self.window
+            while len(batch) < self.max_size:
+                timeout = deadline - time.monotonic()
+                try:
+                    entry = self._queue.get(timeout=max(timeout, 0))
+                except queue.Empty:
+                    break
+                if entry is None:
+                    stopping = True
+                    break
+                batch.append(entry)
+            self._handle(batch)
+
+    def _handle(self, batch: list[tuple[T, Future[R]]]) -> None:
+        try:
+            self._handler(batch)
+        except Exception as e:
+            self.logger.error(f"Batch of {len(batch)} item(s) failed: {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
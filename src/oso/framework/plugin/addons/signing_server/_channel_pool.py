@@ -0,0 +1,180 @@
+#
+# (c) Copyright IBM Corp. 2025
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Pool of gRPC channels to a single GREP11 endpoint."""
+
+from __future__ import annotations
+
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, Literal
+
+import grpc
+
+from .generated import server_pb2_grpc
+
+from oso.framework.core.logging import get_logger
+
+PoolStrategy = Literal["round_robin", "least_loaded"]
+
+
+class _PooledChannel:
+    """A channel, its stub and the bookkeeping used to pick it."""
+
+    def __init__(self, index: int, factory) -> None:
+        self.index = index
+        self.in_flight = 0
+        self._factory = factory
+        self._connect()
+
+    def _connect(self) -> None:
+        self.channel: grpc.Channel = self._factory()
+        self.stub = server_pb2_grpc.CryptoStub(self.channel)
+        self.state = grpc.ChannelConnectivity.IDLE
+        self.connected_at = time.monotonic()
+        self.channel.subscribe(self._on_state_change, try_to_connect=False)
+
+    @property
+    def failing(self) -> bool:
+        return self.state == grpc.ChannelConnectivity.TRANSIENT_FAILURE
+
+    def _on_state_change(self, state: grpc.ChannelConnectivity) -> None:
+        self.state = state
+
+    def reconnect(self) -> None:
+        old = self.channel
+        old.unsubscribe(self._on_state_change)
+        self._connect()
+        old.close()
+
+    def close(self) -> None:
+        self.channel.unsubscribe(self._on_state_change)
+        self.channel.close()
+
+
+class ChannelPool:
+    """Spread GREP11 traffic over several HTTP/2 connections.
+
+    Every channel is created with a local subchannel pool, so each one owns its
+    own TCP connection instead of sharing the process wide subchannel.
+
+    Parameters
+    ----------
+    endpoint : str
+        GREP11 server endpoint.
+    credentials : grpc.ChannelCredentials
+        Credentials used for every channel.
+    size : int
+        Number of channels.
+    strategy : {"round_robin", "least_loaded"}
+        How a channel is picked for a call.
+    options : list[tuple[str, Any]] | None
+        Additional gRPC channel arguments.
+    reconnect_interval : float
+        Minimum number of seconds between two reconnects of the same channel.
+    """
+
+    def __init__(
+        self,
+        endpoint: str,
+        credentials: grpc.ChannelCredentials,
+        size: int = 1,
+        strategy: PoolStrategy = "round_robin",
+        options: list[tuple[str, object]] | None = None,
+        reconnect_interval: float = 1.0,
+    ) -> None:
+        self.logger = get_logger("grep11-channel-pool")
+        self.endpoint = endpoint
+        self.strategy = strategy
+        self.reconnect_interval = reconnect_interval
+
+        channel_options = [("grpc.use_local_subchannel_pool", 1), *(options or [])]
+
+        def _factory() -> grpc.Channel:
+            return grpc.secure_channel(
+                target=endpoint, credentials=credentials, options=channel_options
+            )
+
+        self._lock = threading.Lock()
+        self._round_robin = itertools.count()
+        self._channels = [_PooledChannel(i, _factory) for i in range(size)]
+
+        self.logger.info(
+            f"Created {size} channel(s) to '{endpoint}' using {strategy} strategy"
+        )
+
+    @property
+    def in_flight(self) -> list[int]:
+        """In-flight call count per channel."""
+        return [channel.in_flight for channel in self._channels]
+
+    def _pick(self) -> _PooledChannel:
+        now = time.monotonic()
+        for channel in self._channels:
+            # Replace failing channels instead of waiting on gRPC's own
+            # reconnect backoff, the new channel connects on its first call
+            if (
+                channel.failing
+                and now - channel.connected_at >= self.reconnect_interval
+            ):
+                self.logger.warning(
+                    f"Reconnecting channel {channel.index} to '{self.endpoint}'"
+                )
+                channel.reconnect()
+
+        candidates = [channel for channel in self._channels if not channel.failing]
+        if not candidates:
+            candidates = self._channels
+
+        if self.strategy == "least_loaded":
+            return min(candidates, key=lambda channel: channel.in_flight)
+        return candidates[next(self._round_robin) % len(candidates)]
+
+    @contextmanager
+    def stub(self) -> Iterator[server_pb2_grpc.CryptoStub]:
+        """Borrow a stub for the duration of one call.
+
+        Yields
+        ------
+        server_pb2_grpc.CryptoStub
+            Stub bound to the picked channel.
+        """
+        with self._lock:
+            channel = self._pick()
+            channel.in_flight += 1
+        try:
+            yield channel.stub
+        finally:
+            with self._lock:
+                channel.in_flight -= 1
+
+    def ready_futures(self) -> list[grpc.Future]:
+        """Connect every idle channel.
+
+        Returns
+        -------
+        list[grpc.Future]
+            One future per channel, resolved once the channel is connected.
+        """
+        return [
+            grpc.channel_ready_future(channel.channel) for channel in self._channels
+        ]
+
+    def close(self) -> None:
+        """Close every channel in the pool."""
+        for channel in self._channels:
+            channel.close()
@@ -0,0 +1,157 @@
+#
+# (c) Copyright IBM Corp. 2025
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Circuit breaker guarding the calls to a GREP11 endpoint."""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from typing import Literal
+
+CircuitState = Literal["closed", "open", "half_open"]
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an endpoint whose circuit is open."""
+
+
+class CircuitBreaker:
+    """Stop calling an endpoint that keeps failing or is too slow.
+
+    The outcome of the last ``window`` calls is kept. Once at least
+    ``min_calls`` are recorded and the share of failed or slow calls reaches
+    ``failure_rate``, the circuit opens and calls are rejected. After
+    ``open_duration`` seconds, up to ``half_open_calls`` trial calls are let
+    through: the circuit closes if they all succeed, and opens again otherwise.
+
+    Parameters
+    ----------
+    failure_rate : float
+        Share of failed or slow calls, between 0 and 1, that opens the circuit.
+    slow_call_duration : float
+        Seconds after which a successful call counts as failed, ``0`` disables
+        the latency threshold.
+    window : int
+        Number of recent calls the failure rate is computed over.
+    min_calls : int
+        Number of recorded calls needed before the circuit can open.
+    open_duration : float
+        Seconds the circuit stays open before trial calls are let through.
+    half_open_calls : int
+        Number of trial calls in the half-open state.
+    """
+
+    def __init__(
+        self,
+        failure_rate: float = 0.5,
+        slow_call_duration: float = 0.0,
+        window: int = 20,
+        min_calls: int = 10,
+        open_duration: float = 10.0,
+        half_open_calls: int = 3,
+    ) -> None:
+        self.failure_rate = failure_rate
+        self.slow_call_duration = slow_call_duration
+        self.min_calls = min_calls
+        self.open_duration = open_duration
+        self.half_open_calls = half_open_calls
+
+        self._outcomes: deque[bool] = deque(maxlen=window)
+        self._state: CircuitState = "closed"
+        self._opened_at = 0.0
+        self._trials = 0
+        self._trial_successes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> CircuitState:
+        """Current state, an open circuit turns half-open once it has waited."""
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> CircuitState:
+        if (
+            self._state == "open"
+            and time.monotonic() - self._opened_at >= self.open_duration
+        ):
+            self._state = "half_open"
+            self._trials = 0
+            self._trial_successes = 0
+        return self._state
+
+    def available(self) -> bool:
+        """Whether a call would be let through."""
+        with self._lock:
+            state = self._current_state()
+            return state == "closed" or (
+                state == "half_open" and self._trials < self.half_open_calls
+            )
+
+    def acquire(self) -> bool:
+        """Let a call through if possible, see `available`.
+
+        Every successful acquire must be followed by a `record`.
+        """
+        with self._lock:
+            state = self._current_state()
+            if state == "closed":
+                return True
+            if state == "half_open" and self._trials < self.half_open_calls:
+                self._trials += 1
+                return True
+            return False
+
+    def record(self, success: bool | None, duration: float = 0.0) -> None:
+        """Record the outcome of a call.
+
+        Parameters
+        ----------
+        success : bool | None
+            Whether the endpoint served the call, None if the outcome says
+            nothing about the endpoint, e.g. an invalid request.
+        duration : float
+            Seconds the call took.
+        """
+        if success and self.slow_call_duration and duration >= self.slow_call_duration:
+            success = False
+
+        with self._lock:
+            if self._state == "half_open":
+                if success is None:
+                    self._trials -= 1
+                elif not success:
+                    self._open()
+                else:
+                    self._trial_successes += 1
+                    if self._trial_successes >= self.half_open_calls:
+                        self._state = "closed"
+                        self._outcomes.clear()
+                return
+
+            if self._state == "open" or success is None:
+                return
+
+            self._outcomes.append(success)
+            if len(self._outcomes) >= self.min_calls:
+                failures = self._outcomes.count(False)
+                if failures / len(self._outcomes) >= self.failure_rate:
+                    self._open()
+
+    def _open(self) -> None:
+        self._state = "open"
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
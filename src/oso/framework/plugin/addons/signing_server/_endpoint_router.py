@@ -0,0 +1,307 @@
+#
+# (c) Copyright IBM Corp. 2025
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Routing of GREP11 calls over several endpoints."""
+
+from __future__ import annotations
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator, Literal
+
+import grpc
+
+from ._channel_pool import ChannelPool
+from ._circuit_breaker import CircuitBreaker, CircuitOpenError, CircuitState
+from .generated import server_pb2_grpc
+
+from oso.framework.core.logging import get_logger
+
+EndpointStrategy = Literal["least_outstanding", "weighted_round_robin"]
+
+#: Status codes that count as a failure of the endpoint for its circuit breaker
+_BREAKER_FAILURES = frozenset(
+    {
+        grpc.StatusCode.UNAVAILABLE,
+        grpc.StatusCode.DEADLINE_EXCEEDED,
+        grpc.StatusCode.RESOURCE_EXHAUSTED,
+        grpc.StatusCode.INTERNAL,
+    }
+)
+
+
+class _Endpoint:
+    """A channel pool and the health and weight used to route to it."""
+
+    def __init__(
+        self, pool: ChannelPool, weight: int, breaker: CircuitBreaker | None
+    ) -> None:
+        self.pool = pool
+        self.weight = weight
+        self.breaker = breaker
+        self.healthy = True
+        self.error: str | None = None
+        # Routed calls, whether made on the pool or on another channel
+        self.in_flight = 0
+        # Smooth weighted round robin state
+        self.current_weight = 0
+
+    @property
+    def name(self) -> str:
+        return self.pool.endpoint
+
+    @property
+    def available(self) -> bool:
+        return self.breaker is None or self.breaker.available()
+
+
+class EndpointRouter:
+    """Route every call to a healthy GREP11 endpoint.
+
+    An endpoint is marked unhealthy when a call to it fails with
+    ``UNAVAILABLE``, or when a probe fails, and healthy again once a probe or
+    a call to it succeeds. Calls are spread over the healthy endpoints only,
+    or over all of them if none is healthy.
+
+    With circuit breakers, endpoints whose circuit is open, or half-open with
+    every trial call in flight, are skipped, and calls fail right away with
+    `CircuitOpenError` when no endpoint lets them through.
+
+    Parameters
+    ----------
+    pools : list[ChannelPool]
+        One channel pool per endpoint.
+    strategy : {"least_outstanding", "weighted_round_robin"}
+        Pick the endpoint with the fewest in-flight calls per unit of weight, or
+        cycle through the endpoints in proportion to their weight.
+    weights : list[int] | None
+        Weight of every endpoint, all endpoints weigh ``1`` by default.
+    circuit_breaker : Callable[[], CircuitBreaker] | None
+        Creates the circuit breaker of every endpoint, no circuit breakers are
+        used if None.
+    """
+
+    def __init__(
+        self,
+        pools: list[ChannelPool],
+        strategy: EndpointStrategy = "least_outstanding",
+        weights: list[int] | None = None,
+        circuit_breaker: Callable[[], CircuitBreaker] | None = None,
+    ) -> None:
+        self.logger = get_logger("grep11-endpoint-router")
+        self.strategy = strategy
+        self._endpoints = [
+            _Endpoint(pool, weight, circuit_breaker() if circuit_breaker else None)
+            for pool, weight in zip(pools, weights or [1] * len(pools), strict=True)
+        ]
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._prober: threading.Thread | None = None
+
+    @property
+    def pools(self) -> list[ChannelPool]:
+        """Channel pool of every endpoint."""
+        return [endpoint.pool for endpoint in self._endpoints]
+
+    def status(self) -> dict[str, str]:
+        """Health of every endpoint."""
+        return {
+            endpoint.name: "healthy" if endpoint.healthy else "unhealthy"
+            for endpoint in self._endpoints
+        }
+
+    def healthy_endpoints(self) -> set[str]:
+        """Names of the healthy endpoints whose circuit is not open."""
+        return {
+            endpoint.name
+            for endpoint in self._endpoints
+            if endpoint.healthy and endpoint.available
+        }
+
+    def circuit_status(self) -> dict[str, CircuitState]:
+        """Circuit breaker state of every endpoint, empty without breakers."""
+        return {
+            endpoint.name: endpoint.breaker.state
+            for endpoint in self._endpoints
+            if endpoint.breaker is not None
+        }
+
+    def all_open(self) -> bool:
+        """Whether calls are rejected because every circuit is open."""
+        return not any(endpoint.available for endpoint in self._endpoints)
+
+    def _mark(
+        self, endpoint: _Endpoint, healthy: bool, error: str | None = None
+    ) -> None:
+        if endpoint.healthy != healthy:
+            if healthy:
+                self.logger.info(f"GREP11 endpoint '{endpoint.name}' is healthy")
+            else:
+                self.logger.warning(
+                    f"GREP11 endpoint '{endpoint.name}' is unhealthy: {error}"
+                )
+        endpoint.healthy = healthy
+        endpoint.error = error
+
+    def _pick(self, skipped: list[_Endpoint]) -> _Endpoint:
+        available = [
+            endpoint
+            for endpoint in self._endpoints
+            if endpoint.available and endpoint not in skipped
+        ]
+        if not available:
+            raise CircuitOpenError("Circuit open for every GREP11 endpoint")
+        candidates = [endpoint for endpoint in available if endpoint.healthy]
+        if not candidates:
+            candidates = available
+
+        if self.strategy == "weighted_round_robin":
+            total = 0
+            for endpoint in candidates:
+                endpoint.current_weight += endpoint.weight
+                total += endpoint.weight
+            picked = max(candidates, key=lambda endpoint: endpoint.current_weight)
+            picked.current_weight -= total
+            return picked
+
+        return min(
+            candidates, key=lambda endpoint: endpoint.in_flight / endpoint.weight
+        )
+
+    @contextmanager
+    def _route(self) -> Iterator[_Endpoint]:
+        with self._lock:
+            # The trial calls of a half-open circuit may be used up between
+            # the pick and the acquire, the next endpoint is tried then
+            skipped: list[_Endpoint] = []
+            while True:
+                endpoint = self._pick(skipped)
+                if endpoint.breaker is None or endpoint.breaker.acquire():
+                    break
+                skipped.append(endpoint)
+            endpoint.in_flight += 1
+
+        start = time.monotonic()
+        outcome: bool | None = None
+        try:
+            yield endpoint
+            outcome = True
+            if not endpoint.healthy:
+                self._mark(endpoint, healthy=True)
+        except grpc.RpcError as e:
+            if e.code() == grpc.StatusCode.UNAVAILABLE:
+                self._mark(endpoint, healthy=False, error=str(e.details()))
+            outcome = e.code() not in _BREAKER_FAILURES
+            raise
+        finally:
+            with self._lock:
+                endpoint.in_flight -= 1
+            if endpoint.breaker is not None:
+                endpoint.breaker.record(outcome, time.monotonic() - start)
+
+    @contextmanager
+    def stub(self) -> Iterator[server_pb2_grpc.CryptoStub]:
+        """Borrow a stub of the picked endpoint for the duration of one call.
+
+        Yields
+        ------
+        server_pb2_grpc.CryptoStub
+            Stub bound to a channel of the picked endpoint.
+
+        Raises
+        ------
+        CircuitOpenError
+            If no endpoint lets the call through its circuit.
+        """
+        with self._route() as endpoint, endpoint.pool.stub() as stub:
+            yield stub
+
+    @contextmanager
+    def route(self) -> Iterator[str]:
+        """Pick the endpoint of one call made on a channel of the caller.
+
+        Used by callers with channels of their own, e.g. ``grpc.aio`` ones.
+        The call counts for the in-flight calls, health and circuit breaker of
+        the endpoint like one made through `stub`.
+
+        Yields
+        ------
+        str
+            The picked endpoint.
+
+        Raises
+        ------
+        CircuitOpenError
+            If no endpoint lets the call through its circuit.
+        """
+        with self._route() as endpoint:
+            yield endpoint.name
+
+    def probe(
+        self, check: Callable[[server_pb2_grpc.CryptoStub], object]
+    ) -> dict[str, object]:
+        """Run a check against every endpoint and update their health.
+
+        Parameters
+        ----------
+        check : Callable[[server_pb2_grpc.CryptoStub], object]
+            Called with a stub of each endpoint, the endpoint is unhealthy if it
+            raises.
+
+        Returns
+        -------
+        dict[str, object]
+            The result of the check, or the exception raised, per endpoint.
+        """
+        results: dict[str, object] = {}
+        for endpoint in self._endpoints:
+            if not endpoint.available:
+                # Left alone until its circuit lets trial calls through
+                results[endpoint.name] = CircuitOpenError(
+                    f"Circuit open for '{endpoint.name}'"
+                )
+                continue
+            try:
+                with endpoint.pool.stub() as stub:
+                    results[endpoint.name] = check(stub)
+            except Exception as e:
+                self._mark(endpoint, healthy=False, error=str(e))
+                results[endpoint.name] = e
+            else:
+                self._mark(endpoint, healthy=True)
+        return results
+
+    def start_probing(
+        self, check: Callable[[server_pb2_grpc.CryptoStub], object], interval: float
+    ) -> None:
+        """Probe every endpoint every ``interval`` seconds in the background."""
+
+        def _run() -> None:
+            while not self._stopped.wait(interval):
+                self.probe(check)
+
+        self._prober = threading.Thread(
+            target=_run, name="grep11-endpoint-prober", daemon=True
+        )
+        self._prober.start()
+
+    def close(self) -> None:
+        """Stop probing and close the channels of every endpoint."""
+        self._stopped.set()
+        if self._prober is not None:
+            self._prober.join()
+        for endpoint in self._endpoints:
+            endpoint.pool.close()
@@ -15,52 +15,141 @@
 #
 
 import grpc
-import base64
-import textwrap
+import threading
+from contextlib import ExitStack, nullcontext
+from typing import Any, Callable, ContextManager, Iterable
 
 from pkcs11 import Mechanism, Attribute
+from pkcs11 import KeyType as CKKeyType
 from asn1crypto import core as asn1_core
 from cryptography.hazmat.primitives.asymmetric import ed25519
 from cryptography.hazmat.primitives import serialization
 
-from ._key import KeyPair, KeyType, SupportedMechanism
-from .generated import server_pb2, server_pb2_grpc
+from ._channel_pool import ChannelPool, PoolStrategy
+from ._circuit_breaker import CircuitBreaker
+from ._endpoint_router import EndpointRouter, EndpointStrategy
+from ._hedging import Hedger
+from ._limiter import AdaptiveLimiter
+from ._retry import RetryPolicy
+from ._key import (
+    DerivationMechanism,
+    KeyPair,
+    KeyType,
+    SupportedMechanism,
+    public_key_to_pem,
+)
+from .generated import server_pb2
 
 from oso.framework.data.types import V1_3
 from oso.framework.core.logging import get_logger
 
 
-class Grep11Client:
-    def __init__(self, signing_server_config) -> None:
-        super().__init__()
-
-        self.logger = get_logger("grep11-client")
-
-        self.logger.info("Initializing grep11 client")
-
-        self._set_channel_and_stub(
-            ca_cert=signing_server_config.ca_cert.encode(),
-            client_key=signing_server_config.client_key.encode(),
-            client_cert=signing_server_config.client_cert.encode(),
-            endpoint=signing_server_config.grep11_endpoint,
-        )
-
-    def _set_channel_and_stub(
-        self, ca_cert: bytes, client_key: bytes, client_cert: bytes, endpoint: str
-    ) -> None:
-        self.logger.info("Setting channel and stub")
+#: ``CKA_IBM_USE_AS_DATA``, lets a key be the base of a BIP32 or SLIP10 derivation
+_USE_AS_DATA = Attribute._VENDOR_DEFINED + 0x10008
+
+#: Version of the ``CKM_IBM_BTC_DERIVE`` parameters
+_BTC_DERIVE_VERSION = 1
+
+_BTCDerive = server_pb2.BTCDeriveParm
+
+#: Derivation types of a master key, a private and a public child key, BIP32
+#: for SECP256K1 keys and SLIP10 for ED25519 keys
+_DERIVE_TYPES = {
+    KeyType.SECP256K1.name: (
+        _BTCDerive.CkBIP0032MASTERK,
+        _BTCDerive.CkBIP0032PRV2PRV,
+        _BTCDerive.CkBIP0032PRV2PUB,
+    ),
+    KeyType.ED25519.name: (
+        _BTCDerive.CkSLIP0010MASTERK,
+        _BTCDerive.CkSLIP0010PRV2PRV,
+        _BTCDerive.CkSLIP0010PRV2PUB,
+    ),
+}
+
+
+class _Grep11ClientBase:
+    """Request building and response parsing shared by the GREP11 clients."""
+
+    logger: Any
+    _timeouts: dict[str, float | None] = {}
+    _compression: grpc.Compression | None = None
+    _compression_min_size: int = 0
+
+    @staticmethod
+    def _rpc_timeouts(signing_server_config) -> dict[str, float | None]:
+        """Deadline of every RPC in seconds, None for no deadline."""
+        sign = signing_server_config.sign_timeout or None
+        return {
+            "GenerateKeyPair": signing_server_config.generate_key_pair_timeout or None,
+            "GenerateKey": signing_server_config.generate_key_pair_timeout or None,
+            "DeriveKey": sign,
+            "GetMechanismList": signing_server_config.health_check_timeout or None,
+            "SignSingle": sign,
+            "SignInit": sign,
+            "SignUpdate": sign,
+            "SignFinal": sign,
+            "VerifySingle": signing_server_config.verify_timeout or None,
+            "RewrapKeyBlob": sign,
+        }
 
-        channel_credential = grpc.ssl_channel_credentials(
+    @staticmethod
+    def _channel_options(signing_server_config) -> list[tuple[str, object]]:
+        """Build the gRPC channel arguments from the ``grpc_*`` settings."""
+        keepalive_time = signing_server_config.grpc_keepalive_time
+        keepalive_timeout = signing_server_config.grpc_keepalive_timeout
+        max_send = signing_server_config.grpc_max_send_message_length
+        max_receive = signing_server_config.grpc_max_receive_message_length
+        window_size = signing_server_config.grpc_initial_window_size
+
+        options: list[tuple[str, object]] = []
+        if keepalive_time:
+            options += [
+                ("grpc.keepalive_time_ms", int(keepalive_time * 1000)),
+                ("grpc.keepalive_timeout_ms", int(keepalive_timeout * 1000)),
+                (
+                    "grpc.keepalive_permit_without_calls",
+                    int(signing_server_config.grpc_keepalive_permit_without_calls),
+                ),
+                # Keep pinging however long the connection stays idle
+                ("grpc.http2.max_pings_without_data", 0),
+            ]
+        if max_send:
+            options.append(("grpc.max_send_message_length", max_send))
+        if max_receive:
+            options.append(("grpc.max_receive_message_length", max_receive))
+        if window_size:
+            # Bandwidth-delay product probing would resize the window
+            options += [
+                ("grpc.http2.lookahead_bytes", window_size),
+                ("grpc.http2.bdp_probe", 0),
+            ]
+        return options
+
+    def _set_compression(self, signing_server_config) -> None:
+        if signing_server_config.grpc_compression == "gzip":
+            self._compression = grpc.Compression.Gzip
+        self._compression_min_size = signing_server_config.grpc_compression_min_size
+
+    def _request_compression(self, request) -> grpc.Compression | None:
+        """Compression of a request, None to send it as is."""
+        if self._compression is None or request.ByteSize() < self._compression_min_size:
+            return None
+        return self._compression
+
+    @staticmethod
+    def _channel_credentials(
+        ca_cert: bytes, client_key: bytes, client_cert: bytes
+    ) -> grpc.ChannelCredentials:
+        return grpc.ssl_channel_credentials(
             root_certificates=ca_cert,
             private_key=client_key,
             certificate_chain=client_cert,
         )
 
-        channel = grpc.secure_channel(target=endpoint, credentials=channel_credential)
-
-        self.stub = server_pb2_grpc.CryptoStub(channel)
-
-    def generate_key_pair(self, key_type: KeyType) -> KeyPair:
+    def _generate_key_pair_request(
+        self, key_type: KeyType
+    ) -> server_pb2.GenerateKeyPairRequest:
         self.logger.info("Generating new key pair")
         self.logger.debug(f"Generating key pair of type: {key_type.name}")
 
@@ -80,19 +169,17 @@ class Grep11Client:
             Attribute.TOKEN: server_pb2.AttributeValue(AttributeTF=True),
         }
 
-        request = server_pb2.GenerateKeyPairRequest(
+        return server_pb2.GenerateKeyPairRequest(
             Mech=key_gen_mechanism,
             PrivKeyTemplate=priv_key_template,
             PubKeyTemplate=pub_key_template,
         )
 
-        #self.logger.debug(f"GenerateKeyPairRequest: {request}")
-
-        response = self.stub.GenerateKeyPair(request)
+    def _key_pair_from_response(
+        self, key_type: KeyType, response: server_pb2.GenerateKeyPairResponse
+    ) -> KeyPair:
         assert isinstance(response, server_pb2.GenerateKeyPairResponse)
 
-        #self.logger.info("Received GenerateKeyPair response")
-
         key_pair = KeyPair(
             PrivateKey=response.PrivKeyBytes,
             PublicKey=response.PubKeyBytes,
@@ -115,42 +202,86 @@ class Grep11Client:
 
             key_pair.PublicKey = pub_key_der_bytes
 
-        #self.logger.debug(f"Key Pair Generated: {key_pair.to_hex()=}")
-
         return key_pair
 
-    def health_check(self) -> V1_3.ComponentStatus:
-        self.logger.info("Running health check")
+    def _generate_seed_request(self) -> server_pb2.GenerateKeyRequest:
+        self.logger.info("Generating new HD seed")
 
-        try:
-            request = server_pb2.GetMechanismListRequest()
-            response = self.stub.GetMechanismList(request)
-            assert isinstance(response, server_pb2.GetMechanismListResponse)
-
-            errors = []
-
-            for mechanism in SupportedMechanism:
-                if mechanism not in response.Mechs:
-                    errors.append(
-                        V1_3.Error(
-                            code="1",
-                            message=f"GREP11 server does not support {mechanism.name}",
-                        )
-                    )
+        template = {
+            Attribute.KEY_TYPE: server_pb2.AttributeValue(
+                AttributeI=CKKeyType.GENERIC_SECRET
+            ),
+            Attribute.VALUE_LEN: server_pb2.AttributeValue(AttributeI=32),
+            Attribute.DERIVE: server_pb2.AttributeValue(AttributeTF=True),
+            Attribute.EXTRACTABLE: server_pb2.AttributeValue(AttributeTF=False),
+            _USE_AS_DATA: server_pb2.AttributeValue(AttributeTF=True),
+        }
+
+        return server_pb2.GenerateKeyRequest(
+            Mech=server_pb2.Mechanism(Mechanism=Mechanism.GENERIC_SECRET_KEY_GEN),
+            Template=template,
+        )
+
+    def _derive_key_request(
+        self, derive_type: int, base_key: bytes, chain_code: bytes, index: int
+    ) -> server_pb2.DeriveKeyRequest:
+        self.logger.debug(
+            f"Deriving key: type={_BTCDerive.BTCDeriveType.Name(derive_type)}, "
+            f"index={index}"
+        )
+
+        template = {
+            Attribute.KEY_TYPE: server_pb2.AttributeValue(AttributeI=CKKeyType.EC),
+            Attribute.VALUE_LEN: server_pb2.AttributeValue(AttributeI=0),
+            Attribute.SIGN: server_pb2.AttributeValue(AttributeTF=True),
+            Attribute.VERIFY: server_pb2.AttributeValue(AttributeTF=True),
+            Attribute.DERIVE: server_pb2.AttributeValue(AttributeTF=True),
+            Attribute.EXTRACTABLE: server_pb2.AttributeValue(AttributeTF=False),
+            _USE_AS_DATA: server_pb2.AttributeValue(AttributeTF=True),
+        }
+
+        mechanism = server_pb2.Mechanism(
+            Mechanism=DerivationMechanism.BTC_DERIVE,
+            BTCDeriveParameter=_BTCDerive(
+                Type=derive_type,
+                ChildKeyIndex=index,
+                ChainCode=chain_code,
+                Version=_BTC_DERIVE_VERSION,
+            ),
+        )
+
+        return server_pb2.DeriveKeyRequest(
+            Mech=mechanism,
+            Template=template,
+            BaseKey=server_pb2.KeyBlob(KeyBlobs=[base_key]),
+        )
 
-            if not errors:
-                return V1_3.ComponentStatus(status_code=200, status="OK", errors=[])
+    def _health_status(
+        self, response: server_pb2.GetMechanismListResponse
+    ) -> V1_3.ComponentStatus:
+        assert isinstance(response, server_pb2.GetMechanismListResponse)
 
-            else:
-                return V1_3.ComponentStatus(
-                    status_code=500, status="Internal Server Error", errors=errors
+        errors = []
+
+        for mechanism in SupportedMechanism:
+            if mechanism not in response.Mechs:
+                errors.append(
+                    V1_3.Error(
+                        code="1",
+                        message=f"GREP11 server does not support {mechanism.name}",
+                    )
                 )
 
-        except Exception as e:
-            self.logger.debug(f"Health check error: {e}")
-            raise e
+        if not errors:
+            return V1_3.ComponentStatus(status_code=200, status="OK", errors=[])
 
-    def sign(self, key_type: KeyType, priv_key_bytes: bytes, data: bytes) -> str:
+        return V1_3.ComponentStatus(
+            status_code=500, status="Internal Server Error", errors=errors
+        )
+
+    def _sign_request(
+        self, key_type: KeyType, priv_key_bytes: bytes, data: bytes
+    ) -> server_pb2.SignSingleRequest:
         self.logger.info("Performing a signing")
         self.logger.debug(
             f"Signing data: '{data.hex()}' with key type: '{key_type.name}'"
@@ -158,24 +289,487 @@ class Grep11Client:
 
         priv_key_blob = server_pb2.KeyBlob(KeyBlobs=[priv_key_bytes])
 
-        sign_request = server_pb2.SignSingleRequest(
+        return server_pb2.SignSingleRequest(
             Mech=server_pb2.Mechanism(Mechanism=key_type.value.Mechanism),
             Data=data,
             PrivKey=priv_key_blob,
         )
 
-        sign_response = self.stub.SignSingle(sign_request)
+    def _signature_from_response(
+        self, sign_response: server_pb2.SignSingleResponse
+    ) -> str:
         assert isinstance(sign_response, server_pb2.SignSingleResponse)
 
         self.logger.info("Completed Signing")
         self.logger.debug(f"Received SignSingleResponse: {sign_response=}")
-    
+
         signature = sign_response.Signature.hex()
-    
+
         self.logger.debug(f"Created signature: {signature=}")
-  
+
         return signature
-    
+
+    def _sign_init_request(
+        self, key_type: KeyType, priv_key_bytes: bytes
+    ) -> server_pb2.SignInitRequest:
+        mechanism = key_type.value.StreamMechanism
+        if mechanism is None:
+            raise ValueError(
+                f"Key type {key_type.name} does not support multi-part signing"
+            )
+
+        self.logger.info("Performing a multi-part signing")
+        self.logger.debug(f"Signing stream with key type: '{key_type.name}'")
+
+        return server_pb2.SignInitRequest(
+            Mech=server_pb2.Mechanism(Mechanism=mechanism),
+            PrivKey=server_pb2.KeyBlob(KeyBlobs=[priv_key_bytes]),
+        )
+
+    def _verify_request(
+        self, key_type: KeyType, pub_key_bytes: bytes, data: bytes, signature: str
+    ) -> server_pb2.VerifySingleRequest:
+        self.logger.info("Performing signature verification")
+        self.logger.debug(
+            f"Verifying signature: '{signature}' for data: '{data.hex()}' with key type: '{key_type.name}'"
+        )
+
+        pub_key_blob = server_pb2.KeyBlob(KeyBlobs=[pub_key_bytes])
+        return server_pb2.VerifySingleRequest(
+            Mech=server_pb2.Mechanism(Mechanism=key_type.value.Mechanism),
+            Data=data,
+            PubKey=pub_key_blob,
+            Signature=bytes.fromhex(signature),
+        )
+
+    def serialized_key_to_pem(self, key_type: KeyType, pub_key_bytes: bytes) -> str:
+        return public_key_to_pem(pub_key_bytes)
+
+
+def _release_attempt(held: ExitStack, future: grpc.Future) -> None:
+    """Leave the contexts held by a call started as a future, with its outcome."""
+    if future.cancelled():
+        error: BaseException | None = grpc.FutureCancelledError()
+    else:
+        error = future.exception()
+    if error is None:
+        held.close()
+    else:
+        held.__exit__(type(error), error, error.__traceback__)
+
+
+class _UnhealthyEndpoint(Exception):
+    """An endpoint answered the health check with an error status."""
+
+    def __init__(self, status: V1_3.ComponentStatus) -> None:
+        super().__init__("; ".join(error.message for error in status.errors))
+        self.status = status
+
+
+class Grep11Client(_Grep11ClientBase):
+    def __init__(self, signing_server_config) -> None:
+        super().__init__()
+
+        self.logger = get_logger("grep11-client")
+
+        self.logger.info("Initializing grep11 client")
+
+        self._set_channel_pools(
+            ca_cert=signing_server_config.ca_cert.encode(),
+            client_key=signing_server_config.client_key.encode(),
+            client_cert=signing_server_config.client_cert.encode(),
+            endpoints=signing_server_config.grep11_endpoint,
+            size=signing_server_config.channel_pool_size,
+            strategy=signing_server_config.channel_pool_strategy,
+            endpoint_strategy=signing_server_config.grep11_endpoint_strategy,
+            weights=signing_server_config.grep11_endpoint_weights or None,
+            circuit_breaker=self._circuit_breaker_factory(signing_server_config),
+            options=self._channel_options(signing_server_config),
+        )
+
+        self._connecting: list[grpc.Future] = []
+
+        self._hedger: Hedger | None = None
+        if signing_server_config.hedging:
+            self._hedger = Hedger(
+                percentile=signing_server_config.hedge_percentile,
+                min_delay=signing_server_config.hedge_min_delay,
+                initial_delay=signing_server_config.hedge_initial_delay,
+            )
+
+        self._timeouts = self._rpc_timeouts(signing_server_config)
+        self._set_compression(signing_server_config)
+        self._retry = RetryPolicy(
+            max_attempts=signing_server_config.retry_max_attempts,
+            initial_backoff=signing_server_config.retry_initial_backoff,
+            max_backoff=signing_server_config.retry_max_backoff,
+            multiplier=signing_server_config.retry_backoff_multiplier,
+        )
+
+        self._limiter: AdaptiveLimiter | None = None
+        if signing_server_config.adaptive_concurrency:
+            self._limiter = AdaptiveLimiter(
+                initial_limit=signing_server_config.max_in_flight,
+                min_limit=signing_server_config.concurrency_min_limit,
+                max_limit=signing_server_config.concurrency_max_limit,
+                tolerance=signing_server_config.concurrency_tolerance,
+                backoff=signing_server_config.concurrency_backoff,
+            )
+
+        # A single endpoint is used whatever its health, there is nothing to probe
+        if len(signing_server_config.grep11_endpoint) > 1:
+            interval = signing_server_config.grep11_probe_interval
+            if interval > 0:
+                self._router.start_probing(self._probe, interval)
+
+    def _set_channel_pools(
+        self,
+        ca_cert: bytes,
+        client_key: bytes,
+        client_cert: bytes,
+        endpoints: list[str],
+        size: int,
+        strategy: PoolStrategy,
+        endpoint_strategy: EndpointStrategy,
+        weights: list[int] | None,
+        circuit_breaker: Callable[[], CircuitBreaker] | None,
+        options: list[tuple[str, object]],
+    ) -> None:
+        self.logger.info("Setting channel pools")
+
+        channel_credential = self._channel_credentials(
+            ca_cert=ca_cert, client_key=client_key, client_cert=client_cert
+        )
+
+        self._router = EndpointRouter(
+            pools=[
+                ChannelPool(
+                    endpoint=endpoint,
+                    credentials=channel_credential,
+                    size=size,
+                    strategy=strategy,
+                    options=options,
+                )
+                for endpoint in endpoints
+            ],
+            strategy=endpoint_strategy,
+            weights=weights,
+            circuit_breaker=circuit_breaker,
+        )
+
+    @staticmethod
+    def _circuit_breaker_factory(
+        signing_server_config,
+    ) -> Callable[[], CircuitBreaker] | None:
+        if not signing_server_config.circuit_breaker:
+            return None
+
+        def _factory() -> CircuitBreaker:
+            return CircuitBreaker(
+                failure_rate=signing_server_config.circuit_failure_rate,
+                slow_call_duration=signing_server_config.circuit_slow_call_duration,
+                window=signing_server_config.circuit_window,
+                min_calls=signing_server_config.circuit_min_calls,
+                open_duration=signing_server_config.circuit_open_duration,
+                half_open_calls=signing_server_config.circuit_half_open_calls,
+            )
+
+        return _factory
+
+    def connect(self) -> threading.Event:
+        """Connect every channel in the background.
+
+        Returns
+        -------
+        threading.Event
+            Set once every channel of one endpoint is connected, so that calls
+            routed to it do not pay for the TCP and TLS handshakes.
+        """
+        ready = threading.Event()
+        lock = threading.Lock()
+
+        def _track(futures: list[grpc.Future]) -> None:
+            remaining = len(futures)
+
+            def _done(future: grpc.Future) -> None:
+                nonlocal remaining
+                if future.cancelled():
+                    return
+                with lock:
+                    remaining -= 1
+                    if not remaining:
+                        ready.set()
+
+            for future in futures:
+                future.add_done_callback(_done)
+
+        for pool in self._router.pools:
+            futures = pool.ready_futures()
+            self._connecting += futures
+            _track(futures)
+        return ready
+
+    def close(self) -> None:
+        """Stop probing and connecting, and close every channel."""
+        for future in self._connecting:
+            future.cancel()
+        self._router.close()
+
+    def _call(self, rpc: str, request, idempotent: bool = False):
+        """Call an RPC on a stub picked by the router.
+
+        Idempotent calls are hedged if hedging is enabled. Hedged attempts are
+        started as futures from the calling thread. The second attempt is
+        routed while the first is still in flight, so it goes to another
+        endpoint or channel when the routing strategies allow.
+
+        With adaptive concurrency, every attempt waits for a slot of the
+        limiter, whose limit adapts to the latency of ``SignSingle`` calls.
+
+        Every attempt has the deadline configured for the RPC, and idempotent
+        calls are retried after a transient error. Large requests are
+        compressed if ``grpc_compression`` is set.
+        """
+        timeout = self._timeouts.get(rpc)
+        compression = self._request_compression(request)
+
+        def _attempt():
+            with self._slot(sample=rpc == "SignSingle"), self._router.stub() as stub:
+                return getattr(stub, rpc)(
+                    request, timeout=timeout, compression=compression
+                )
+
+        def _start_attempt() -> grpc.Future:
+            # The slot and the stub are held until the call completes
+            with ExitStack() as stack:
+                stack.enter_context(self._slot(sample=rpc == "SignSingle"))
+                stub = stack.enter_context(self._router.stub())
+                future = getattr(stub, rpc).future(
+                    request, timeout=timeout, compression=compression
+                )
+                held = stack.pop_all()
+            future.add_done_callback(lambda f: _release_attempt(held, f))
+            return future
+
+        def _hedged():
+            if self._hedger is not None:
+                return self._hedger.call(rpc, _start_attempt)
+            return _attempt()
+
+        if idempotent:
+            return self._retry.call(rpc, _hedged)
+        return _attempt()
+
+    def healthy_endpoints(self) -> set[str]:
+        """Endpoints currently considered healthy."""
+        return self._router.healthy_endpoints()
+
+    @property
+    def router(self) -> EndpointRouter:
+        """Router of the calls, to share with an `AsyncGrep11Client`."""
+        return self._router
+
+    @property
+    def limiter(self) -> AdaptiveLimiter | None:
+        """Adaptive concurrency limiter, None without adaptive concurrency."""
+        return self._limiter
+
+    def _probe(self, stub) -> V1_3.ComponentStatus:
+        response = stub.GetMechanismList(
+            server_pb2.GetMechanismListRequest(),
+            timeout=self._timeouts.get("GetMechanismList"),
+        )
+        status = self._health_status(response)
+        if status.status_code != 200:
+            # Keep the status, the endpoint is marked unhealthy all the same
+            raise _UnhealthyEndpoint(status)
+        return status
+
+    def _slot(self, sample: bool) -> ContextManager[None]:
+        if self._limiter is None:
+            return nullcontext()
+        return self._limiter.slot(sample=sample)
+
+    def generate_key_pair(self, key_type: KeyType) -> KeyPair:
+        request = self._generate_key_pair_request(key_type)
+        response = self._call("GenerateKeyPair", request)
+        return self._key_pair_from_response(key_type, response)
+
+    def health_check(self) -> V1_3.ComponentStatus:
+        """Probe every endpoint and report their health.
+
+        The status is healthy as long as one endpoint is, and lists the health
+        of every endpoint under ``endpoints``. When the circuit of every
+        endpoint is open, a 503 status is returned without probing.
+
+        Raises
+        ------
+        Exception
+            The error of the first endpoint if every endpoint is unreachable.
+        """
+        self.logger.info("Running health check")
+
+        if self._router.all_open():
+            return V1_3.ComponentStatus(
+                status_code=503,
+                status="Service Unavailable",
+                errors=[
+                    V1_3.Error(
+                        code="2", message="Circuit open for every GREP11 endpoint"
+                    )
+                ],
+                endpoints=self._router.status(),
+                circuit_breakers=self._router.circuit_status(),
+            )
+
+        results = list(self._router.probe(self._probe).values())
+        statuses = [r for r in results if isinstance(r, V1_3.ComponentStatus)]
+        if not statuses:
+            statuses = [r.status for r in results if isinstance(r, _UnhealthyEndpoint)]
+        if not statuses:
+            self.logger.debug(f"Health check error: {results[0]}")
+            raise results[0]  # type: ignore[misc]
+
+        update: dict[str, Any] = {"endpoints": self._router.status()}
+        circuit_breakers = self._router.circuit_status()
+        if circuit_breakers:
+            update["circuit_breakers"] = circuit_breakers
+        if self._hedger is not None:
+            update["hedging"] = self._hedger.stats()
+        if self._limiter is not None:
+            update["concurrency"] = self._limiter.stats()
+        return statuses[0].model_copy(update=update)
+
+    def sign(self, key_type: KeyType, priv_key_bytes: bytes, data: bytes) -> str:
+        sign_request = self._sign_request(key_type, priv_key_bytes, data)
+        sign_response = self._call("SignSingle", sign_request, idempotent=True)
+        return self._signature_from_response(sign_response)
+
+    def rewrap_key_blob(self, key_blob: bytes) -> bytes:
+        """Rewrap a key blob with the current wrapping key of the HSM domain.
+
+        Parameters
+        ----------
+        key_blob : bytes
+            Key blob wrapped with the previous wrapping key.
+
+        Returns
+        -------
+        bytes
+            The same key, wrapped with the current wrapping key.
+        """
+        request = server_pb2.RewrapKeyBlobRequest(WrappedKeyBytes=key_blob)
+        response = self._call("RewrapKeyBlob", request, idempotent=True)
+        return response.RewrappedKeyBytes
+
+    def generate_hd_master(self, key_type: KeyType) -> tuple[bytes, bytes]:
+        """Generate a random seed and derive an HD master key from it.
+
+        Parameters
+        ----------
+        key_type : KeyType
+            Type of the keys derived from the master key.
+
+        Returns
+        -------
+        tuple[bytes, bytes]
+            Private key blob and chain code of the master key.
+        """
+        seed = self._call("GenerateKey", self._generate_seed_request()).KeyBytes
+        master_type = _DERIVE_TYPES[key_type.name][0]
+        request = self._derive_key_request(master_type, seed, b"", 0)
+        response = self._call("DeriveKey", request, idempotent=True)
+        return response.NewKeyBytes, response.CheckSum
+
+    def derive_key(
+        self, key_type: KeyType, parent_key: bytes, chain_code: bytes, index: int
+    ) -> tuple[bytes, bytes]:
+        """Derive the private child key of an HD key.
+
+        Parameters
+        ----------
+        key_type : KeyType
+            Type of the parent key.
+        parent_key : bytes
+            Private key blob of the parent.
+        chain_code : bytes
+            Chain code of the parent.
+        index : int
+            Index of the child, hardened from ``0x80000000``.
+
+        Returns
+        -------
+        tuple[bytes, bytes]
+            Private key blob and chain code of the child.
+        """
+        child_type = _DERIVE_TYPES[key_type.name][1]
+        request = self._derive_key_request(child_type, parent_key, chain_code, index)
+        response = self._call("DeriveKey", request, idempotent=True)
+        return response.NewKeyBytes, response.CheckSum
+
+    def derive_public_key(
+        self, key_type: KeyType, parent_key: bytes, chain_code: bytes, index: int
+    ) -> bytes:
+        """Derive the public key of a child of an HD key, see `derive_key`.
+
+        Returns
+        -------
+        bytes
+            DER encoded SubjectPublicKeyInfo of the child.
+        """
+        child_type = _DERIVE_TYPES[key_type.name][2]
+        request = self._derive_key_request(child_type, parent_key, chain_code, index)
+        return self._call("DeriveKey", request, idempotent=True).NewKeyBytes
+
+    def sign_stream(
+        self, key_type: KeyType, priv_key_bytes: bytes, chunks: Iterable[bytes]
+    ) -> str:
+        """Sign a payload sent in chunks with SignInit, SignUpdate and SignFinal.
+
+        Only the chunk being sent is held in memory. The whole multi-part
+        operation uses the same channel, as its state belongs to one session.
+        Every part has the ``sign_timeout`` deadline, and none is retried.
+
+        Parameters
+        ----------
+        key_type : KeyType
+            The type of key, it must have a ``StreamMechanism``.
+        priv_key_bytes : bytes
+            The private key blob.
+        chunks : Iterable[bytes]
+            The payload, in order.
+
+        Returns
+        -------
+        str
+            Hex encoded signature.
+
+        Raises
+        ------
+        ValueError
+            If the key type does not support multi-part signing.
+        """
+        init_request = self._sign_init_request(key_type, priv_key_bytes)
+        timeout = self._timeouts.get("SignUpdate")
+        with self._slot(sample=False), self._router.stub() as stub:
+            state = stub.SignInit(init_request, timeout=timeout).State
+            size = 0
+            for chunk in chunks:
+                size += len(chunk)
+                update_request = server_pb2.SignUpdateRequest(State=state, Data=chunk)
+                state = stub.SignUpdate(
+                    update_request,
+                    timeout=timeout,
+                    compression=self._request_compression(update_request),
+                ).State
+            final_response = stub.SignFinal(
+                server_pb2.SignFinalRequest(State=state), timeout=timeout
+            )
+
+        self.logger.info("Completed multi-part signing")
+        self.logger.debug(f"Signed {size} byte(s), received {final_response=}")
+        return final_response.Signature.hex()
+
     def verify(self, key_type: KeyType, pub_key_bytes: bytes, data: bytes, signature: str) -> bool:
         """
         Verify a signature using the GREP11 server.
@@ -196,20 +790,13 @@ class Grep11Client:
         bool
             True if the signature is valid, False otherwise.
         """
-        self.logger.info("Performing signature verification")
-        self.logger.debug(
-            f"Verifying signature: '{signature}' for data: '{data.hex()}' with key type: '{key_type.name}'"
-        )
-    
         try:
-            pub_key_blob = server_pb2.KeyBlob(KeyBlobs=[pub_key_bytes])
-            verify_request = server_pb2.VerifySingleRequest(
-                Mech=server_pb2.Mechanism(Mechanism=key_type.value.Mechanism),
-                Data=data,
-                PubKey=pub_key_blob,
-                Signature=bytes.fromhex(signature),
+            verify_request = self._verify_request(
+                key_type, pub_key_bytes, data, signature
+            )
+            verify_response = self._call(
+                "VerifySingle", verify_request, idempotent=True
             )
-            verify_response = self.stub.VerifySingle(verify_request)
  
             self.logger.info("Completed verification")
             self.logger.debug(f"Received VerifySingleResponse: {verify_response=}")
@@ -218,20 +805,3 @@ class Grep11Client:
         except Exception as e:
             self.logger.error(f"Signature verification failed: {e}")
             return False
-
-    def serialized_key_to_pem(self, key_type: KeyType, pub_key_bytes: bytes) -> str:
-#        self.logger.info("Converting Public Key Blob to PEM")
-#        self.logger.debug(f"KeyType: '{key_type.name}'")
-
-        b64_encoded = base64.b64encode(pub_key_bytes).decode("ascii")
-        wrapped = "\n".join(textwrap.wrap(b64_encoded, 64))
-
-        pem_encoded_pub_key = (
-            f"-----BEGIN PUBLIC KEY-----\n{wrapped}\n-----END PUBLIC KEY-----\n"
-        )
-
-#        self.logger.debug(
-#            f"key type: '{key_type.name}', PUBLIC KEY: {pem_encoded_pub_key}"
-#        )
-
-        return pem_encoded_pub_key
@@ -0,0 +1,183 @@
+#
+# (c) Copyright IBM Corp. 2025
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Hierarchical deterministic (HD) child keys derived on demand.
+
+A derived key is identified by the ID of its stored parent followed by its
+derivation path, e.g. ``<parent_id>/44'/60'/0'/0/7``. Hardened indexes are
+marked with ``'`` or ``h``.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, replace
+from typing import Callable
+
+from ._key import KeyPair, KeyType
+from ._key_cache import KeyCache
+
+#: First hardened child index
+HARDENED = 0x80000000
+
+Path = tuple[int, ...]
+
+
+def parse_path(path: str) -> Path:
+    """Child indexes of a derivation path, with or without the ``m/`` prefix.
+
+    Raises
+    ------
+    ValueError
+        If the path is empty or an index is not a number below ``2**31``.
+    """
+    parts = path.split("/")
+    if parts[0] == "m":
+        parts = parts[1:]
+    if not parts:
+        raise ValueError(f"Empty derivation path: '{path}'")
+
+    indexes = []
+    for part in parts:
+        hardened = part.endswith(("'", "h", "H"))
+        digits = part[:-1] if hardened else part
+        if not (digits.isascii() and digits.isdigit()) or int(digits) >= HARDENED:
+            raise ValueError(f"Invalid derivation path: '{path}'")
+        indexes.append(int(digits) + HARDENED if hardened else int(digits))
+    return tuple(indexes)
+
+
+def format_path(path: Path) -> str:
+    """Canonical form of a derivation path, without the ``m/`` prefix."""
+    return "/".join(
+        f"{index - HARDENED}'" if index >= HARDENED else str(index) for index in path
+    )
+
+
+def derived_key_id(parent_id: str, path: Path) -> str:
+    """ID of the key derived from a parent along a path."""
+    if not path:
+        return parent_id
+    return f"{parent_id}/{format_path(path)}"
+
+
+def is_derived(key_id: str) -> bool:
+    """Whether a key ID is the ID of a derived key."""
+    return "/" in key_id
+
+
+def split_key_id(key_id: str) -> tuple[str, Path] | None:
+    """Parent ID and derivation path of a derived key, None for a stored key.
+
+    Raises
+    ------
+    ValueError
+        If the derivation path is invalid.
+    """
+    parent_id, separator, path = key_id.partition("/")
+    if not separator:
+        return None
+    return parent_id, parse_path(path)
+
+
+@dataclass(frozen=True)
+class HDNode:
+    """Key of an HD tree, with the chain code its children derive from.
+
+    The public key is only derived for the keys that are used.
+    """
+
+    key_type: KeyType
+    private_key: bytes
+    chain_code: bytes
+    public_key: bytes | None = None
+
+
+class HDKeyDeriver:
+    """Derive child keys from stored parents, with a bounded cache of nodes.
+
+    Every node derived on the way to a key is cached, so that siblings and
+    descendants only cost the derivations below their closest cached
+    ancestor. Nothing derived is persisted, evicted nodes are derived again.
+    Concurrent misses on the same node both derive it, with the same result.
+
+    Parameters
+    ----------
+    load_parent : Callable[[str], HDNode | None]
+        Loads a stored parent, None if it does not exist.
+    derive : Callable[[HDNode, int], HDNode]
+        Derives the private child of a node at an index.
+    derive_public : Callable[[HDNode, int], bytes]
+        Derives the public key of the child of a node at an index.
+    cache_size : int
+        Maximum number of cached nodes, ``0`` disables the cache.
+    """
+
+    def __init__(
+        self,
+        load_parent: Callable[[str], HDNode | None],
+        derive: Callable[[HDNode, int], HDNode],
+        derive_public: Callable[[HDNode, int], bytes],
+        cache_size: int,
+    ) -> None:
+        self._load_parent = load_parent
+        self._derive = derive
+        self._derive_public = derive_public
+        self._cache: KeyCache[HDNode] = KeyCache(cache_size)
+
+    def _child(self, node: HDNode, index: int) -> HDNode:
+        if node.key_type == KeyType.ED25519 and index < HARDENED:
+            raise ValueError("ED25519 keys only have hardened children")
+        return self._derive(node, index)
+
+    def node(self, parent_id: str, path: Path) -> HDNode | None:
+        """Node at a path below a parent, None if the parent does not exist."""
+        depth = len(path)
+        node = self._cache.get(derived_key_id(parent_id, path))
+        while node is None and depth > 0:
+            depth -= 1
+            node = self._cache.get(derived_key_id(parent_id, path[:depth]))
+        if node is None:
+            node = self._load_parent(parent_id)
+            if node is None:
+                return None
+            self._cache.put(parent_id, node)
+
+        for depth in range(depth, len(path)):
+            node = self._child(node, path[depth])
+            self._cache.put(derived_key_id(parent_id, path[: depth + 1]), node)
+        return node
+
+    def key_pair(self, parent_id: str, path: Path) -> tuple[KeyType, KeyPair] | None:
+        """Type and key pair of a derived key, see `node`."""
+        key_id = derived_key_id(parent_id, path)
+        node = self._cache.get(key_id)
+        if node is None or node.public_key is None:
+            parent = self.node(parent_id, path[:-1])
+            if parent is None:
+                return None
+            if node is None:
+                node = self._child(parent, path[-1])
+            node = replace(node, public_key=self._derive_public(parent, path[-1]))
+            self._cache.put(key_id, node)
+        key_pair = KeyPair(PrivateKey=node.private_key, PublicKey=node.public_key)
+        return node.key_type, key_pair
+
+    def clear(self) -> None:
+        """Drop every cached node, e.g. after the parents are rewrapped."""
+        self._cache.clear()
+
+    def stats(self) -> dict[str, int]:
+        """Cache size and counters."""
+        return self._cache.stats()
@@ -0,0 +1,105 @@
+#
+# (c) Copyright IBM Corp. 2025
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Cached GREP11 health status, refreshed in the background."""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Callable
+
+from oso.framework.data.types import V1_3
+from oso.framework.core.logging import get_logger
+
+
+def _unavailable(message: str) -> V1_3.ComponentStatus:
+    return V1_3.ComponentStatus(
+        status_code=503,
+        status="Service Unavailable",
+        errors=[V1_3.Error(code="2", message=message)],
+    )
+
+
+class HealthCache:
+    """Serve the last health status without waiting for the GREP11 server.
+
+    The status is refreshed every ``ttl / 2`` seconds by a background thread,
+    so that `get` never issues an RPC. When the check raises, its error is
+    cached as a 503 status. When no refresh completed for ``ttl`` seconds,
+    because the server is too slow to answer, `get` reports the status as
+    stale with a 503 status instead.
+
+    Parameters
+    ----------
+    check : Callable[[], V1_3.ComponentStatus]
+        Runs the health check against the GREP11 server.
+    ttl : float
+        Seconds a status is served for.
+    """
+
+    def __init__(self, check: Callable[[], V1_3.ComponentStatus], ttl: float) -> None:
+        self.logger = get_logger("signing_server.health_cache")
+        self._check = check
+        self.ttl = ttl
+
+        # Status and the time it was checked, swapped as a whole
+        self._entry: tuple[V1_3.ComponentStatus, float] | None = None
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="signing-server-health-cache", daemon=True
+        )
+
+    def start(self, status: V1_3.ComponentStatus | None = None) -> None:
+        """Start refreshing in the background, from ``status`` if known."""
+        if status is not None:
+            self._store(status)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop refreshing."""
+        self._stopped.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def get(self) -> V1_3.ComponentStatus:
+        """Last health status, or a 503 status if it is missing or stale."""
+        entry = self._entry
+        if entry is None:
+            return _unavailable("GREP11 health check pending")
+        status, checked_at = entry
+        age = time.monotonic() - checked_at
+        if age > self.ttl:
+            return _unavailable(f"GREP11 health check not answered for {age:.1f}s")
+        return status
+
+    def refresh(self) -> V1_3.ComponentStatus:
+        """Run the health check and cache its result."""
+        try:
+            status = self._check()
+        except Exception as e:
+            self.logger.warning(f"GREP11 health check failed: {e}")
+            status = _unavailable(f"GREP11 health check failed: {e}")
+        self._store(status)
+        return status
+
+    def _store(self, status: V1_3.ComponentStatus) -> None:
+        self._entry = (status, time.monotonic())
+
+    def _run(self) -> None:
+        if self._entry is None:
+            self.refresh()
+        while not self._stopped.wait(self.ttl / 2):
+            self.refresh()
@@ -0,0 +1,196 @@
+#
+# (c) Copyright IBM Corp. 2025
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Hedging of idempotent GREP11 calls."""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Any, Callable, Protocol
+
+
+class AttemptFuture(Protocol):
+    """Outcome of an attempt started without blocking, e.g. a `grpc.Future`."""
+
+    def add_done_callback(self, fn: Callable[[Any], None]) -> None: ...
+
+    def cancel(self) -> bool: ...
+
+    def cancelled(self) -> bool: ...
+
+    def exception(self) -> BaseException | None: ...
+
+    def result(self) -> Any: ...
+
+
+class _MethodStats:
+    """Recent latencies and hedge counters of one method."""
+
+    def __init__(self, window: int) -> None:
+        self.latencies: deque[float] = deque(maxlen=window)
+        self.issued = 0
+        self.won = 0
+
+
+class _Race:
+    """First successful attempt of a hedged call."""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.winner: AttemptFuture | None = None
+        self.started = 0
+        self.failed = 0
+        self._lock = threading.Lock()
+
+    def add(self, future: AttemptFuture, on_success: Callable[[], None]) -> None:
+        with self._lock:
+            self.started += 1
+
+        def _done(future: AttemptFuture) -> None:
+            with self._lock:
+                if future.cancelled() or future.exception() is not None:
+                    self.failed += 1
+                    if self.failed == self.started:
+                        self.done.set()
+                    return
+                if self.winner is None:
+                    self.winner = future
+                    self.done.set()
+            on_success()
+
+        future.add_done_callback(_done)
+
+
+class Hedger:
+    """Issue a second attempt of a slow call and keep the first result.
+
+    A call that has not completed after the ``percentile`` of its recent
+    latencies is attempted once more, and whichever attempt succeeds first is
+    returned. Attempts are started without blocking from the calling thread,
+    so calls that complete in time cost no thread hop. The losing attempt is
+    cancelled.
+
+    The latency of every successful attempt is recorded from its own start,
+    so that the hedging delay does not inflate the latencies the delay is
+    computed from.
+
+    Parameters
+    ----------
+    percentile : float
+        Percentile of the recent latencies of a method after which a hedge is
+        issued.
+    min_delay : float
+        Lower bound of the hedging delay, in seconds.
+    initial_delay : float
+        Hedging delay used until ``min_samples`` latencies are recorded.
+    window : int
+        Number of recent latencies kept per method.
+    min_samples : int
+        Number of latencies needed before the percentile is used.
+    """
+
+    def __init__(
+        self,
+        percentile: float,
+        min_delay: float,
+        initial_delay: float,
+        window: int = 1000,
+        min_samples: int = 20,
+    ) -> None:
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.initial_delay = initial_delay
+        self.min_samples = min_samples
+        self._stats: defaultdict[str, _MethodStats] = defaultdict(
+            lambda: _MethodStats(window)
+        )
+        self._lock = threading.Lock()
+
+    def delay(self, method: str) -> float:
+        """Seconds to wait for an attempt of a method before hedging it."""
+        with self._lock:
+            latencies = sorted(self._stats[method].latencies)
+        if len(latencies) < self.min_samples:
+            return max(self.initial_delay, self.min_delay)
+        index = min(int(len(latencies) * self.percentile / 100), len(latencies) - 1)
+        return max(latencies[index], self.min_delay)
+
+    def _record(self, method: str, latency: float) -> None:
+        with self._lock:
+            self._stats[method].latencies.append(latency)
+
+    def _start(
+        self, method: str, race: _Race, attempt: Callable[[], AttemptFuture]
+    ) -> AttemptFuture:
+        start = time.monotonic()
+        future = attempt()
+        race.add(future, lambda: self._record(method, time.monotonic() - start))
+        return future
+
+    def call(self, method: str, attempt: Callable[[], AttemptFuture]) -> Any:
+        """Run ``attempt``, hedged with a second run if it is slow.
+
+        Parameters
+        ----------
+        method : str
+            Name of the method, whose latencies set the hedging delay.
+        attempt : Callable[[], AttemptFuture]
+            Starts one attempt without waiting for it to complete.
+
+        Raises
+        ------
+        Exception
+            The error of the first attempt if every attempt fails.
+        """
+        race = _Race()
+        primary = self._start(method, race, attempt)
+        if race.done.wait(self.delay(method)):
+            if race.winner is None:
+                raise primary.exception()  # type: ignore[misc]
+            return race.winner.result()
+
+        try:
+            hedge = self._start(method, race, attempt)
+        except Exception:
+            # The hedge could not be started, e.g. every circuit is open
+            race.done.wait()
+            hedge = None
+        with self._lock:
+            self._stats[method].issued += hedge is not None
+        race.done.wait()
+
+        for future in (primary, hedge):
+            if future is not None and future is not race.winner:
+                future.cancel()
+        if race.winner is None:
+            raise primary.exception()  # type: ignore[misc]
+        if race.winner is hedge:
+            with self._lock:
+                self._stats[method].won += 1
+        return race.winner.result()
+
+    def stats(self) -> dict[str, dict[str, float]]:
+        """Hedges issued and won, and the current delay, per method."""
+        with self._lock:
+            counters = {
+                method: (stats.issued, stats.won)
+                for method, stats in self._stats.items()
+            }
+        return {
+            method: {"issued": issued, "won": won, "delay": self.delay(method)}
+            for method, (issued, won) in counters.items()
+        }
@@ -14,6 +14,8 @@
 # limitations under the License.
 #
 
+import base64
+import textwrap
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from enum import Enum, IntEnum, StrEnum
@@ -28,6 +30,18 @@ class SupportedMechanism(IntEnum):
     ED25519_SHA512 = Mechanism._VENDOR_DEFINED + 0x1001C
 
 
+class StreamingMechanism(IntEnum):
+    """Mechanisms used to sign a payload in multiple parts."""
+
+    ECDSA_SHA256 = Mechanism.ECDSA_SHA256
+
+
+class DerivationMechanism(IntEnum):
+    """Mechanisms used to derive child keys."""
+
+    BTC_DERIVE = Mechanism._VENDOR_DEFINED + 0x70001
+
+
 class SupportedOID(StrEnum):
     SECP256K1 = "06052b8104000a"
     ED25519 = "06032b6570"
@@ -36,6 +50,8 @@ class SupportedOID(StrEnum):
 class Key(ABC):
     Oid: ClassVar[SupportedOID]
     Mechanism: ClassVar[SupportedMechanism]
+    #: Mechanism used to sign in multiple parts, None if not supported
+    StreamMechanism: ClassVar[StreamingMechanism | None] = None
 
     @abstractmethod
     def LoadPubKeyFn(self, encoded_point: bytes):
@@ -45,6 +61,7 @@ class Key(ABC):
 class SECP256K1_Key(Key):
     Oid = SupportedOID.SECP256K1
     Mechanism = SupportedMechanism.ECDSA
+    StreamMechanism = StreamingMechanism.ECDSA_SHA256
 
     def LoadPubKeyFn(self, ec_point: bytes):
         return ec.EllipticCurvePublicKey.from_encoded_point(ec.SECP256K1(), ec_point)
@@ -82,3 +99,10 @@ class KeyPair:
             PrivateKey=bytes.fromhex(private_key_hex),
             PublicKey=bytes.fromhex(public_key_hex),
         )
+
+
+def public_key_to_pem(pub_key_bytes: bytes) -> str:
+    """Wrap a DER encoded SubjectPublicKeyInfo in a PEM envelope."""
+    b64_encoded = base64.b64encode(pub_key_bytes).decode("ascii")
+    wrapped = "\n".join(textwrap.wrap(b64_encoded, 64))
+    return f"-----BEGIN PUBLIC KEY-----\n{wrapped}\n-----END PUBLIC KEY-----\n"
@@ -0,0 +1,180 @@
+#
+# (c) Copyright IBM Corp. 2025
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Background refill of the pre-generated key pool."""
+
+from __future__ import annotations
+
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+from ._batch import bounded_map
+from ._key import KeyPair, KeyType
+from ._keystore import Keystore
+
+from oso.framework.core.logging import get_logger
+
+
+class KeyPoolRefiller:
+    """Keep a pool of unassigned key pairs per key type topped up.
+
+    Whenever the pool of a key type drops below ``low_water``, key pairs are
+    generated and stored in the keystore's pool until it holds ``high_water``
+    keys. The pool is checked every ``interval`` seconds, and right away when
+    `notify` is called.
+
+    Every worker process runs its own refiller against the shared keystore.
+    The pool depth is read again before each chunk of generations, and the
+    chunk is only stored up to ``high_water`` in the same transaction that
+    reads the depth, so concurrent refillers never overshoot the pool.
+
+    Parameters
+    ----------
+    keystore : Keystore
+        Keystore holding the pool.
+    generate : Callable[[KeyType], KeyPair]
+        Generates a single key pair, called concurrently.
+    key_types : list[KeyType]
+        Key types to keep a pool of.
+    low_water : int
+        Pool depth below which a refill starts.
+    high_water : int
+        Pool depth a refill stops at.
+    concurrency : int
+        Number of concurrent key generations during a refill.
+    interval : float
+        Seconds between two checks of the pool depth.
+    """
+
+    def __init__(
+        self,
+        keystore: Keystore,
+        generate: Callable[[KeyType], KeyPair],
+        key_types: list[KeyType],
+        low_water: int,
+        high_water: int,
+        concurrency: int,
+        interval: float,
+    ) -> None:
+        self.logger = get_logger("signing_server.key_pool")
+        self._keystore = keystore
+        self._generate = generate
+        self.key_types = key_types
+        self.low_water = low_water
+        self.high_water = high_water
+        self.concurrency = concurrency
+        self.interval = interval
+
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._executor = ThreadPoolExecutor(
+            max_workers=concurrency, thread_name_prefix="signing-server-key-pool"
+        )
+        self._thread = threading.Thread(
+            target=self._run, name="signing-server-key-pool", daemon=True
+        )
+
+    def start(self) -> None:
+        """Start refilling in the background."""
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop refilling and wait for the refill in progress to finish."""
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread.is_alive():
+            self._thread.join()
+        self._executor.shutdown()
+
+    def notify(self) -> None:
+        """Check the pool depth without waiting for the next interval."""
+        self._wakeup.set()
+
+    def depth(self) -> dict[str, int]:
+        """Return the number of pooled keys per key type."""
+        return {
+            key_type.name: self._keystore.pool_depth(key_type.name)
+            for key_type in self.key_types
+        }
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            for key_type in self.key_types:
+                if self._stopped.is_set():
+                    break
+                try:
+                    self.refill(key_type)
+                except Exception as e:
+                    self.logger.error(f"Key pool refill of {key_type.name} failed: {e}")
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+
+    def refill(self, key_type: KeyType) -> int:
+        """Top up the pool of a key type if it is below the low-water mark.
+
+        Returns
+        -------
+        int
+            Number of key pairs added to the pool.
+        """
+        depth = self._keystore.pool_depth(key_type.name)
+        if depth >= self.low_water:
+            return 0
+
+        self.logger.info(
+            f"Refilling {key_type.name} key pool from {depth} to {self.high_water}"
+        )
+
+        added = 0
+        while not self._stopped.is_set():
+            # Refillers of other processes sharing the keystore fill the same
+            # pool, the depth is read again so that they split the work
+            missing = self.high_water - self._keystore.pool_depth(key_type.name)
+            if missing <= 0:
+                break
+            # Persist in chunks so that pooled keys become available early
+            chunk = min(missing, self.concurrency * 4)
+            outcomes = bounded_map(
+                self._executor,
+                lambda _: self._generate(key_type),
+                range(chunk),
+                self.concurrency,
+            )
+            key_pairs = [o for o in outcomes if not isinstance(o, Exception)]
+            for outcome in outcomes:
+                if isinstance(outcome, Exception):
+                    self.logger.error(f"Key pair generation failed: {outcome}")
+            if not key_pairs:
+                break
+
+            stored = self._keystore.add_to_pool(
+                (
+                    (str(uuid.uuid4()), key_type.name, kp.PrivateKey, kp.PublicKey)
+                    for kp in key_pairs
+                ),
+                max_depth=self.high_water,
+            )
+            added += stored
+            if stored < len(key_pairs):
+                self.logger.debug(
+                    f"Dropped {len(key_pairs) - stored} key pair(s), the "
+                    f"{key_type.name} key pool is full"
+                )
+                break
+
+        self.logger.info(f"Added {added} key pair(s) to the {key_type.name} key pool")
+        return added
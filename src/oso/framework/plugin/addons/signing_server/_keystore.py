@@ -0,0 +1,632 @@
+#
+# (c) Copyright IBM Corp. 2025
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""SQLite keystore."""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+import uuid
+import weakref
+from pathlib import Path
+from typing import Iterable, Literal, get_args
+
+from ._key import public_key_to_pem
+
+from oso.framework.core.logging import get_logger
+
+#: Current layout of the keystore tables, stored in ``PRAGMA user_version``.
+SCHEMA_VERSION = 6
+
+KeyRow = tuple[str, str, bytes, bytes]
+"""Key ID, key type name, private key blob and public key blob."""
+
+KeyTable = Literal["keys", "key_pool", "hd_parents"]
+"""Tables holding private key blobs."""
+
+
+#: Tag of key IDs stored as the raw bytes of a UUID.
+_UUID_TAG = b"\x01"
+#: Tag of key IDs stored UTF-8 encoded.
+_TEXT_TAG = b"\x00"
+
+
+def encode_key_id(key_id: str) -> bytes:
+    """Encode a key ID to its stored form.
+
+    Key IDs generated by the addon are UUIDs in canonical form and are stored
+    as their 16 raw bytes. Any other ID, e.g. from a legacy keystore or a UUID
+    in another spelling, is stored UTF-8 encoded so that it reads back
+    unchanged. A one byte tag tells the two encodings apart.
+    """
+    try:
+        parsed = uuid.UUID(key_id)
+    except ValueError:
+        parsed = None
+    if parsed is not None and str(parsed) == key_id:
+        return _UUID_TAG + parsed.bytes
+    return _TEXT_TAG + key_id.encode()
+
+
+def decode_key_id(raw: bytes) -> str:
+    """Decode a stored key ID, see `encode_key_id`."""
+    if raw[:1] == _UUID_TAG:
+        return str(uuid.UUID(bytes=raw[1:]))
+    return raw[1:].decode()
+
+
+def _check_table(table: str) -> None:
+    # Table names are interpolated in the queries
+    if table not in get_args(KeyTable):
+        raise ValueError(f"Unknown key table: '{table}'")
+
+
+class _ThreadConnection:
+    """Connection of a single thread, closed once the thread is gone.
+
+    Only the thread-local storage of its thread refers to it, so it is
+    released, and the connection closed, when the thread exits.
+    """
+
+    def __init__(self, conn: sqlite3.Connection) -> None:
+        self.conn = conn
+
+    def __del__(self) -> None:
+        self.conn.close()
+
+
+class Keystore:
+    """Persistent store of key blobs.
+
+    Keys are stored in a ``WITHOUT ROWID`` table with binary key IDs and blobs.
+    Keystores created with the original hex encoded layout are migrated in place
+    when opened. Pre-generated keys that are not handed out yet are kept in the
+    separate ``key_pool`` table with the same layout.
+
+    The PEM encoded public key is computed once when a key is stored. Keys stored
+    before the ``public_key_pem`` column existed are backfilled when read.
+
+    Parents of hierarchical deterministic (HD) keys are kept in the
+    ``hd_parents`` table with their chain code. Their children are derived
+    when used and never stored.
+
+    Jobs rewrapping the private key blobs record how far they got in the
+    ``rewrap_checkpoint`` table: the last stored ID handled per table, and the
+    number of keys rewrapped and failed so far.
+
+    The keystore is safe to share between threads: every thread gets its own
+    connection, closed when the thread exits, and the database runs in WAL mode
+    so readers are not blocked by a writer.
+
+    Parameters
+    ----------
+    db_file : pathlib.Path
+        SQLite database file.
+    migration_batch_size : int
+        Number of rows read and copied at a time when migrating the schema,
+        the whole migration runs in a single transaction.
+    synchronous : {"OFF", "NORMAL", "FULL", "EXTRA"}
+        SQLite ``synchronous`` pragma.
+    cache_size : int
+        SQLite ``cache_size`` pragma, negative values are in KiB.
+    mmap_size : int
+        SQLite ``mmap_size`` pragma in bytes, ``0`` disables memory mapping.
+    busy_timeout : float
+        Seconds a connection waits for a lock held by another connection.
+    """
+
+    def __init__(
+        self,
+        db_file: Path,
+        migration_batch_size: int = 10_000,
+        synchronous: Literal["OFF", "NORMAL", "FULL", "EXTRA"] = "NORMAL",
+        cache_size: int = -2000,
+        mmap_size: int = 0,
+        busy_timeout: float = 5.0,
+    ) -> None:
+        self.logger = get_logger("signing_server.keystore")
+        self._db_file = db_file
+        self._pragmas = {
+            "synchronous": synchronous,
+            "cache_size": cache_size,
+            "mmap_size": mmap_size,
+        }
+        self._busy_timeout = busy_timeout
+        self._local = threading.local()
+        self._connections: weakref.WeakSet[_ThreadConnection] = weakref.WeakSet()
+        self._lock = threading.Lock()
+
+        conn = self._connection()
+        journal_mode = conn.execute("PRAGMA journal_mode = WAL").fetchone()[0]
+        if journal_mode.lower() != "wal":
+            self.logger.warning(f"Keystore is using '{journal_mode}' journal mode")
+
+        self._init_schema(migration_batch_size)
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return the connection owned by the calling thread."""
+        owned = getattr(self._local, "conn", None)
+        if owned is None:
+            # Only used by this thread, the check is disabled so that `close`
+            # can be called from any thread
+            conn = sqlite3.connect(
+                str(self._db_file),
+                timeout=self._busy_timeout,
+                check_same_thread=False,
+            )
+            for pragma, value in self._pragmas.items():
+                conn.execute(f"PRAGMA {pragma} = {value}")
+            owned = _ThreadConnection(conn)
+            self._local.conn = owned
+            with self._lock:
+                self._connections.add(owned)
+        return owned.conn
+
+    def close(self) -> None:
+        """Close the connections of every thread."""
+        with self._lock:
+            for owned in list(self._connections):
+                owned.conn.close()
+            self._connections.clear()
+        self._local = threading.local()
+
+    def _init_schema(self, migration_batch_size: int) -> None:
+        conn = self._connection()
+        if conn.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+            return
+
+        # Every step commits together, including the v1 migration whose DDL
+        # would otherwise commit on its own. The write lock is taken upfront
+        # so that processes opening the keystore at the same time wait for
+        # the first one and then find the schema up to date.
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            migrated = self._upgrade_schema(migration_batch_size)
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+
+        if migrated:
+            conn.execute("VACUUM")
+
+    def _upgrade_schema(self, migration_batch_size: int) -> bool:
+        conn = self._connection()
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version >= SCHEMA_VERSION:
+            return False
+
+        migrated = False
+        if version < 2:
+            columns = {
+                row[1]: row[2]
+                for row in conn.execute("PRAGMA table_info(keys)").fetchall()
+            }
+            if columns.get("id") == "TEXT":
+                self._migrate_v1(migration_batch_size)
+                migrated = True
+            else:
+                self._create_table("keys")
+
+        if version < 3:
+            self._create_table("key_pool")
+        if version < 4:
+            for table in ("keys", "key_pool"):
+                self._add_column(table, "public_key_pem", "TEXT")
+        if version < 5:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS rewrap_checkpoint (
+                    job TEXT NOT NULL,
+                    key_table TEXT NOT NULL,
+                    last_id BLOB NOT NULL,
+                    rewrapped INTEGER NOT NULL,
+                    failed INTEGER NOT NULL,
+                    PRIMARY KEY (job, key_table)
+                )
+            """)
+        if version < 6:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS hd_parents (
+                    id BLOB PRIMARY KEY,
+                    key_type TEXT NOT NULL,
+                    private_key BLOB NOT NULL,
+                    chain_code BLOB NOT NULL
+                ) WITHOUT ROWID
+            """)
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        return migrated
+
+    def _create_table(self, name: str) -> None:
+        self._connection().execute(f"""
+            CREATE TABLE IF NOT EXISTS {name} (
+                id BLOB PRIMARY KEY,
+                key_type TEXT NOT NULL,
+                private_key BLOB NOT NULL,
+                public_key BLOB NOT NULL,
+                public_key_pem TEXT
+            ) WITHOUT ROWID
+        """)
+
+    def _add_column(self, table: str, column: str, column_type: str) -> None:
+        conn = self._connection()
+        columns = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+        if column not in columns:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}")
+
+    def _migrate_v1(self, batch_size: int) -> None:
+        """Migrate the hex encoded v1 table in batches.
+
+        Rows are read and copied into ``keys_v2`` one batch at a time, so that
+        memory use stays bounded, and the tables are swapped once every row is
+        copied. The caller holds the whole migration in one transaction, an
+        interrupted migration leaves the v1 table untouched.
+        """
+        self.logger.info("Migrating keystore to schema version 2")
+        conn = self._connection()
+        self._create_table("keys_v2")
+
+        migrated = 0
+        last_rowid = 0
+        while True:
+            rows = conn.execute(
+                "SELECT rowid, id, key_type, private_key, public_key FROM keys "
+                "WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                (last_rowid, batch_size),
+            ).fetchall()
+            if not rows:
+                break
+
+            conn.executemany(
+                "INSERT OR IGNORE INTO keys_v2 "
+                "(id, key_type, private_key, public_key) VALUES (?, ?, ?, ?)",
+                (
+                    (
+                        encode_key_id(key_id),
+                        key_type,
+                        bytes.fromhex(priv_hex),
+                        bytes.fromhex(pub_hex),
+                    )
+                    for _, key_id, key_type, priv_hex, pub_hex in rows
+                ),
+            )
+            last_rowid = rows[-1][0]
+            migrated += len(rows)
+            self.logger.debug(f"Copied {migrated} key(s) to schema version 2")
+
+        conn.execute("DROP TABLE keys")
+        conn.execute("ALTER TABLE keys_v2 RENAME TO keys")
+        self.logger.info(f"Migrated {migrated} key(s) to schema version 2")
+
+    def get(self, key_id: str) -> tuple[str, bytes, bytes] | None:
+        """Key type name, private and public key blob of a key."""
+        return self._connection().execute(
+            "SELECT key_type, private_key, public_key FROM keys WHERE id = ?",
+            (encode_key_id(key_id),),
+        ).fetchone()
+
+    def get_many(self, key_ids: list[str]) -> list[tuple[str, bytes, bytes] | None]:
+        """Key type name, private and public key blob of many keys.
+
+        Keys are fetched with one query per 500 IDs.
+
+        Returns
+        -------
+        list[tuple[str, bytes, bytes] | None]
+            The row of every key, in input order, None for unknown keys.
+        """
+        conn = self._connection()
+        encoded = [encode_key_id(key_id) for key_id in key_ids]
+        found: dict[bytes, tuple[str, bytes, bytes]] = {}
+
+        for start in range(0, len(encoded), 500):
+            chunk = encoded[start : start + 500]
+            placeholders = ", ".join("?" * len(chunk))
+            cur = conn.execute(
+                "SELECT id, key_type, private_key, public_key FROM keys "
+                f"WHERE id IN ({placeholders})",
+                chunk,
+            )
+            for raw_id, key_type, private_key, public_key in cur.fetchall():
+                found[raw_id] = (key_type, private_key, public_key)
+
+        return [found.get(raw_id) for raw_id in encoded]
+
+    def exists(self, key_id: str) -> bool:
+        """Whether a key is stored."""
+        cur = self._connection().execute(
+            "SELECT 1 FROM keys WHERE id = ?", (encode_key_id(key_id),)
+        )
+        return cur.fetchone() is not None
+
+    def _insert(self, table: str, rows: Iterable[KeyRow]) -> None:
+        conn = self._connection()
+        with conn:
+            self._insert_rows(table, rows)
+
+    def _insert_rows(self, table: str, rows: Iterable[KeyRow]) -> None:
+        self._connection().executemany(
+            f"INSERT INTO {table} "
+            "(id, key_type, private_key, public_key, public_key_pem) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (
+                (
+                    encode_key_id(key_id),
+                    key_type,
+                    private_key,
+                    public_key,
+                    public_key_to_pem(public_key),
+                )
+                for key_id, key_type, private_key, public_key in rows
+            ),
+        )
+
+    def insert_many(self, rows: Iterable[KeyRow]) -> None:
+        """Store keys in a single transaction."""
+        self._insert("keys", rows)
+
+    def get_pems(self, key_ids: list[str]) -> list[str | None]:
+        """PEM encoded public keys of many keys.
+
+        Keys are fetched with one query per 500 IDs, and keys without a stored
+        PEM are backfilled in a single transaction.
+
+        Returns
+        -------
+        list[str | None]
+            The PEM of every key, in input order, None for unknown keys.
+        """
+        conn = self._connection()
+        encoded = [encode_key_id(key_id) for key_id in key_ids]
+        found: dict[bytes, str] = {}
+        backfill: list[tuple[str, bytes]] = []
+
+        for start in range(0, len(encoded), 500):
+            chunk = encoded[start : start + 500]
+            placeholders = ", ".join("?" * len(chunk))
+            cur = conn.execute(
+                "SELECT id, public_key, public_key_pem FROM keys "
+                f"WHERE id IN ({placeholders})",
+                chunk,
+            )
+            for raw_id, public_key, pem in cur.fetchall():
+                if pem is None:
+                    pem = public_key_to_pem(public_key)
+                    backfill.append((pem, raw_id))
+                found[raw_id] = pem
+
+        if backfill:
+            with conn:
+                conn.executemany(
+                    "UPDATE keys SET public_key_pem = ? WHERE id = ?", backfill
+                )
+
+        return [found.get(raw_id) for raw_id in encoded]
+
+    def size(self, table: KeyTable) -> int:
+        """Return the number of keys in a table."""
+        _check_table(table)
+        return self._connection().execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+    def private_keys_after(
+        self, table: KeyTable, after: bytes | None, limit: int
+    ) -> list[tuple[bytes, bytes]]:
+        """Return the stored ID and private key blob of the keys after an ID.
+
+        Keys are returned in stored ID order, so that a table can be walked
+        page by page from the last ID of the previous page.
+
+        Parameters
+        ----------
+        table : {"keys", "key_pool"}
+            Table to read.
+        after : bytes | None
+            Stored ID the page starts after, None for the first page.
+        limit : int
+            Maximum number of keys returned.
+        """
+        _check_table(table)
+        cur = self._connection().execute(
+            f"SELECT id, private_key FROM {table} WHERE id > ? ORDER BY id LIMIT ?",
+            (after or b"", limit),
+        )
+        return cur.fetchall()
+
+    def rewrap_checkpoint(
+        self, job: str, table: KeyTable
+    ) -> tuple[bytes, int, int] | None:
+        """Last stored ID, rewrapped and failed counts of a rewrap job."""
+        return self._connection().execute(
+            "SELECT last_id, rewrapped, failed FROM rewrap_checkpoint "
+            "WHERE job = ? AND key_table = ?",
+            (job, table),
+        ).fetchone()
+
+    def save_rewrapped(
+        self,
+        job: str,
+        table: KeyTable,
+        blobs: list[tuple[bytes, bytes]],
+        last_id: bytes,
+        rewrapped: int,
+        failed: int,
+    ) -> None:
+        """Replace private key blobs and move the job checkpoint, atomically.
+
+        Parameters
+        ----------
+        job : str
+            Name of the rewrap job.
+        table : {"keys", "key_pool", "hd_parents"}
+            Table the blobs belong to.
+        blobs : list[tuple[bytes, bytes]]
+            Stored ID and new private key blob of every rewrapped key.
+        last_id : bytes
+            Stored ID the job resumes after.
+        rewrapped, failed : int
+            Number of keys of the table rewrapped, and failed, so far.
+        """
+        _check_table(table)
+        conn = self._connection()
+        with conn:
+            conn.executemany(
+                f"UPDATE {table} SET private_key = ? WHERE id = ?",
+                ((blob, raw_id) for raw_id, blob in blobs),
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO rewrap_checkpoint "
+                "(job, key_table, last_id, rewrapped, failed) VALUES (?, ?, ?, ?, ?)",
+                (job, table, last_id, rewrapped, failed),
+            )
+
+    def clear_rewrap_checkpoint(self, job: str) -> None:
+        """Forget the checkpoints of a finished rewrap job."""
+        conn = self._connection()
+        with conn:
+            conn.execute("DELETE FROM rewrap_checkpoint WHERE job = ?", (job,))
+
+    def insert_hd_parent(
+        self, key_id: str, key_type: str, private_key: bytes, chain_code: bytes
+    ) -> None:
+        """Store the private key blob and chain code of an HD parent."""
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                "INSERT INTO hd_parents (id, key_type, private_key, chain_code) "
+                "VALUES (?, ?, ?, ?)",
+                (encode_key_id(key_id), key_type, private_key, chain_code),
+            )
+
+    def get_hd_parent(self, key_id: str) -> tuple[str, bytes, bytes] | None:
+        """Key type name, private key blob and chain code of an HD parent."""
+        return self._connection().execute(
+            "SELECT key_type, private_key, chain_code FROM hd_parents WHERE id = ?",
+            (encode_key_id(key_id),),
+        ).fetchone()
+
+    def list_ids(self, key_type: str) -> list[str]:
+        """IDs of the keys of a type."""
+        cur = self._connection().execute(
+            "SELECT id FROM keys WHERE key_type = ?", (key_type,)
+        )
+        return [decode_key_id(row[0]) for row in cur.fetchall()]
+
+    def count(self, key_type: str | None = None) -> int:
+        """Return the number of keys, optionally of a single type."""
+        conn = self._connection()
+        if key_type is not None:
+            cur = conn.execute(
+                "SELECT COUNT(*) FROM keys WHERE key_type = ?", (key_type,)
+            )
+        else:
+            cur = conn.execute("SELECT COUNT(*) FROM keys")
+        row = cur.fetchone()
+        return row[0] if row else 0
+
+    def add_to_pool(self, rows: Iterable[KeyRow], max_depth: int | None = None) -> int:
+        """Store unassigned keys in the pool in a single transaction.
+
+        Parameters
+        ----------
+        rows : Iterable[KeyRow]
+            Keys to store.
+        max_depth : int | None
+            Pool depth per key type not to exceed. The depth is read in the
+            same immediate transaction as the insert, so that processes
+            filling the pool concurrently never overshoot it. Keys that do
+            not fit are dropped.
+
+        Returns
+        -------
+        int
+            Number of keys stored.
+        """
+        rows = list(rows)
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if max_depth is not None:
+                room: dict[str, int] = {}
+                kept: list[KeyRow] = []
+                for row in rows:
+                    if row[1] not in room:
+                        room[row[1]] = max_depth - self.pool_depth(row[1])
+                    if room[row[1]] > 0:
+                        room[row[1]] -= 1
+                        kept.append(row)
+                rows = kept
+            self._insert_rows("key_pool", rows)
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        return len(rows)
+
+    def claim_from_pool(self, key_type: str) -> KeyRow | None:
+        """Move a pooled key of a type to the keys table.
+
+        Returns
+        -------
+        KeyRow | None
+            The claimed key, or None if the pool is empty.
+        """
+        claimed = self.claim_many_from_pool(key_type, 1)
+        return claimed[0] if claimed else None
+
+    def claim_many_from_pool(self, key_type: str, n: int) -> list[KeyRow]:
+        """Move up to ``n`` pooled keys of a type to the keys table.
+
+        The keys are removed from the pool and stored as regular keys in one
+        immediate transaction, so concurrent claims never hand out the same key.
+
+        Returns
+        -------
+        list[KeyRow]
+            The claimed keys, fewer than ``n`` if the pool runs dry.
+        """
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            rows = conn.execute(
+                "SELECT id, key_type, private_key, public_key, public_key_pem "
+                "FROM key_pool WHERE key_type = ? LIMIT ?",
+                (key_type, n),
+            ).fetchall()
+            if rows:
+                conn.executemany(
+                    "DELETE FROM key_pool WHERE id = ?", ((row[0],) for row in rows)
+                )
+                conn.executemany(
+                    "INSERT INTO keys "
+                    "(id, key_type, private_key, public_key, public_key_pem) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    rows,
+                )
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+
+        return [
+            (decode_key_id(raw_id), key_type, private_key, public_key)
+            for raw_id, key_type, private_key, public_key, _ in rows
+        ]
+
+    def pool_depth(self, key_type: str) -> int:
+        """Return the number of pooled keys of a type."""
+        cur = self._connection().execute(
+            "SELECT COUNT(*) FROM key_pool WHERE key_type = ?", (key_type,)
+        )
+        return cur.fetchone()[0]
@@ -0,0 +1,196 @@
+#
+# (c) Copyright IBM Corp. 2025
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Adaptive limit on the number of in-flight GREP11 calls."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Iterator
+
+import grpc
+
+#: Status codes showing that the server is overloaded
+_OVERLOADED = frozenset(
+    {grpc.StatusCode.RESOURCE_EXHAUSTED, grpc.StatusCode.DEADLINE_EXCEEDED}
+)
+
+
+class AdaptiveLimiter:
+    """Bound in-flight calls with a limit adapted to the observed latency.
+
+    The limit follows an AIMD scheme: it grows by one for every ``limit``
+    sampled calls that complete within ``tolerance`` times the lowest recent
+    latency while the limit is in use, and is multiplied by ``backoff`` when a
+    sampled call is slower, or fails with ``RESOURCE_EXHAUSTED`` or
+    ``DEADLINE_EXCEEDED``.
+
+    Callers beyond the limit wait for a slot in `slot`, or in `slot_async`
+    without blocking their event loop. Both share the same limit.
+
+    Parameters
+    ----------
+    initial_limit : int
+        Limit before any call completes.
+    min_limit : int
+        Lowest limit.
+    max_limit : int
+        Highest limit.
+    tolerance : float
+        Latency, relative to the lowest recent latency, above which a call is
+        considered slow.
+    backoff : float
+        Factor applied to the limit after a slow call, between 0 and 1.
+    window : int
+        Number of recent latencies the lowest latency is taken from.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int,
+        min_limit: int = 1,
+        max_limit: int = 256,
+        tolerance: float = 2.0,
+        backoff: float = 0.9,
+        window: int = 100,
+    ) -> None:
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.tolerance = tolerance
+        self.backoff = backoff
+
+        self._limit = float(min(max(initial_limit, min_limit), max_limit))
+        self._in_flight = 0
+        self._waiting = 0
+        self._latencies: deque[float] = deque(maxlen=window)
+        self._condition = threading.Condition()
+        self._async_waiters: list[
+            tuple[asyncio.AbstractEventLoop, asyncio.Future[None]]
+        ] = []
+
+    @property
+    def limit(self) -> int:
+        """Current number of calls allowed in flight."""
+        return int(self._limit)
+
+    def stats(self) -> dict[str, int]:
+        """Return the current limit, in-flight calls and calls waiting for a slot."""
+        with self._condition:
+            return {
+                "limit": self.limit,
+                "in_flight": self._in_flight,
+                "queued": self._waiting,
+            }
+
+    @contextmanager
+    def slot(self, sample: bool = True) -> Iterator[None]:
+        """Hold a slot for the duration of one call.
+
+        Parameters
+        ----------
+        sample : bool
+            Whether the latency of the call adapts the limit. Calls with a
+            different latency profile should not be sampled.
+        """
+        with self._condition:
+            self._waiting += 1
+            try:
+                self._condition.wait_for(lambda: self._in_flight < self.limit)
+            finally:
+                self._waiting -= 1
+            busy = self._take()
+
+        with self._measure(sample, busy):
+            yield
+
+    @asynccontextmanager
+    async def slot_async(self, sample: bool = True) -> AsyncIterator[None]:
+        """Hold a slot for the duration of one call made from an event loop.
+
+        See `slot`, the event loop keeps running while waiting for a slot.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._condition:
+                if self._in_flight < self.limit:
+                    busy = self._take()
+                    break
+                waiter = loop.create_future()
+                self._async_waiters.append((loop, waiter))
+                self._waiting += 1
+            try:
+                await waiter
+            finally:
+                with self._condition:
+                    self._waiting -= 1
+                    if (loop, waiter) in self._async_waiters:
+                        self._async_waiters.remove((loop, waiter))
+
+        with self._measure(sample, busy):
+            yield
+
+    def _take(self) -> bool:
+        self._in_flight += 1
+        return self._in_flight * 2 >= self.limit
+
+    @contextmanager
+    def _measure(self, sample: bool, busy: bool) -> Iterator[None]:
+        start = time.monotonic()
+        # Other failures say nothing about the load, they are not sampled
+        outcome: bool | None = None
+        try:
+            yield
+            outcome = False
+        except grpc.RpcError as e:
+            if e.code() in _OVERLOADED:
+                outcome = True
+            raise
+        finally:
+            latency = time.monotonic() - start
+            with self._condition:
+                self._in_flight -= 1
+                if sample and outcome is not None:
+                    self._adapt(latency, outcome, busy)
+                self._condition.notify_all()
+                self._wake_async_waiters()
+
+    def _wake_async_waiters(self) -> None:
+        for loop, waiter in self._async_waiters:
+            try:
+                loop.call_soon_threadsafe(_wake, waiter)
+            except RuntimeError:
+                # The loop is closed, nobody waits on it anymore
+                pass
+        self._async_waiters.clear()
+
+    def _adapt(self, latency: float, overloaded: bool, busy: bool) -> None:
+        if not overloaded:
+            self._latencies.append(latency)
+        baseline = min(self._latencies, default=latency)
+
+        if overloaded or latency > baseline * self.tolerance:
+            self._limit = max(self.min_limit, self._limit * self.backoff)
+        elif busy:
+            # Only grow while the limit is actually used
+            self._limit = min(self.max_limit, self._limit + 1 / self._limit)
+
+
+def _wake(waiter: asyncio.Future) -> None:
+    if not waiter.done():
+        waiter.set_result(None)
@@ -0,0 +1,103 @@
+#
+# (c) Copyright IBM Corp. 2025
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Retry of GREP11 calls failing with a transient error."""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from typing import Awaitable, Callable, TypeVar
+
+import grpc
+
+from oso.framework.core.logging import get_logger
+
+T = TypeVar("T")
+
+#: Status codes of errors worth retrying
+RETRYABLE_CODES = frozenset({grpc.StatusCode.UNAVAILABLE})
+
+
+class RetryPolicy:
+    """Retry calls with exponential backoff and full jitter.
+
+    The delay before retry ``n``, counting from ``0``, is drawn uniformly
+    between ``0`` and ``min(max_backoff, initial_backoff * multiplier ** n)``.
+
+    Parameters
+    ----------
+    max_attempts : int
+        Maximum number of attempts, including the first one.
+    initial_backoff : float
+        Upper bound of the first delay, in seconds.
+    max_backoff : float
+        Upper bound of any delay, in seconds.
+    multiplier : float
+        Growth of the delay bound after every retry.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        initial_backoff: float = 0.05,
+        max_backoff: float = 1.0,
+        multiplier: float = 2.0,
+    ) -> None:
+        self.logger = get_logger("grep11-retry")
+        self.max_attempts = max_attempts
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.multiplier = multiplier
+
+    def backoff(self, retry: int) -> float:
+        """Seconds to wait before a retry."""
+        bound = min(self.max_backoff, self.initial_backoff * self.multiplier**retry)
+        return random.uniform(0, bound)
+
+    def _delay(self, rpc: str, retry: int, error: grpc.RpcError) -> float:
+        """Delay before the next attempt, re-raising errors not worth retrying."""
+        if error.code() not in RETRYABLE_CODES or retry + 1 >= self.max_attempts:
+            raise error
+        delay = self.backoff(retry)
+        self.logger.warning(f"Retrying {rpc} in {delay:.3f}s after {error.code().name}")
+        return delay
+
+    def call(self, rpc: str, attempt: Callable[[], T]) -> T:
+        """Run ``attempt``, again after a retryable error.
+
+        Raises
+        ------
+        grpc.RpcError
+            The error of the last attempt, or any error that is not retryable.
+        """
+        retry = 0
+        while True:
+            try:
+                return attempt()
+            except grpc.RpcError as e:
+                time.sleep(self._delay(rpc, retry, e))
+            retry += 1
+
+    async def call_async(self, rpc: str, attempt: Callable[[], Awaitable[T]]) -> T:
+        """Await ``attempt``, again after a retryable error, see `call`."""
+        retry = 0
+        while True:
+            try:
+                return await attempt()
+            except grpc.RpcError as e:
+                await asyncio.sleep(self._delay(rpc, retry, e))
+            retry += 1
@@ -0,0 +1,208 @@
+#
+# (c) Copyright IBM Corp. 2025
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Rewrap of every stored private key blob after a wrapping key rotation."""
+
+from __future__ import annotations
+
+import time
+from concurrent.futures import Executor
+from dataclasses import dataclass, field
+from typing import Callable
+
+from ._batch import bounded_map
+from ._keystore import KeyTable, Keystore, decode_key_id
+
+from oso.framework.core.logging import get_logger
+
+#: Tables in rewrap order. Pooled keys go first, a key claimed from the pool
+#: while they are rewrapped then moves to ``keys`` before that table is walked.
+REWRAP_TABLES: tuple[KeyTable, ...] = ("key_pool", "keys", "hd_parents")
+
+
+@dataclass
+class RewrapProgress:
+    """Progress of a rewrap job.
+
+    Attributes
+    ----------
+    total : int
+        Number of keys stored when the job started.
+    rewrapped : int
+        Number of keys rewrapped, including by the interrupted runs resumed.
+    failed : int
+        Number of keys that could not be rewrapped, and keep their old blob.
+    resumed : int
+        Number of keys handled by the interrupted runs resumed.
+    elapsed : float
+        Seconds spent by this run.
+    failed_key_ids : list[str]
+        IDs of the keys that failed during this run.
+    """
+
+    total: int
+    rewrapped: int = 0
+    failed: int = 0
+    resumed: int = 0
+    elapsed: float = 0.0
+    failed_key_ids: list[str] = field(default_factory=list)
+
+    @property
+    def done(self) -> int:
+        """Number of keys handled."""
+        return self.rewrapped + self.failed
+
+    @property
+    def rate(self) -> float:
+        """Keys handled per second by this run."""
+        return (self.done - self.resumed) / self.elapsed if self.elapsed else 0.0
+
+
+class KeyRewrapper:
+    """Rewrap every stored private key blob with the current wrapping key.
+
+    Keys are read from the keystore page by page in ID order. The blobs of a
+    page are rewrapped concurrently, then written back together with the job
+    checkpoint in a single transaction, so that a job interrupted at any point
+    resumes after the last page written when it is run again under the same
+    name. The checkpoints are cleared once every table is done.
+
+    Keys that fail to rewrap keep their old blob, they are logged, counted and
+    the job moves on. Only the count is checkpointed: keys that failed before
+    an interruption lie behind the checkpoint and are not retried when the
+    job resumes. Starting the job again once it has finished, which clears its
+    checkpoints, or under a new name walks every table again and picks them
+    up.
+
+    Parameters
+    ----------
+    keystore : Keystore
+        Keystore holding the keys.
+    rewrap : Callable[[bytes], bytes]
+        Rewraps a single blob, called concurrently.
+    executor : concurrent.futures.Executor
+        Executor the rewrap calls run on.
+    max_in_flight : int
+        Maximum number of concurrent rewrap calls.
+    batch_size : int
+        Number of keys per page, and per transaction.
+    job : str
+        Name of the job, under which its checkpoints are stored.
+    on_rewrapped : Callable[[list[str]], None] | None
+        Called with the IDs of the keys of every page written.
+    on_progress : Callable[[RewrapProgress], None] | None
+        Called after every page written.
+    """
+
+    def __init__(
+        self,
+        keystore: Keystore,
+        rewrap: Callable[[bytes], bytes],
+        executor: Executor,
+        max_in_flight: int,
+        batch_size: int,
+        job: str,
+        on_rewrapped: Callable[[list[str]], None] | None = None,
+        on_progress: Callable[[RewrapProgress], None] | None = None,
+    ) -> None:
+        self.logger = get_logger("signing_server.rewrap")
+        self._keystore = keystore
+        self._rewrap = rewrap
+        self._executor = executor
+        self.max_in_flight = max_in_flight
+        self.batch_size = batch_size
+        self.job = job
+        self._on_rewrapped = on_rewrapped
+        self._on_progress = on_progress
+
+    def run(self) -> RewrapProgress:
+        """Rewrap every key not rewrapped yet by this job.
+
+        Returns
+        -------
+        RewrapProgress
+            Final progress of the job.
+        """
+        start = time.monotonic()
+        progress = RewrapProgress(
+            total=sum(self._keystore.size(table) for table in REWRAP_TABLES)
+        )
+        self.logger.info(f"Rewrap job '{self.job}' started for {progress.total} key(s)")
+
+        for table in REWRAP_TABLES:
+            self._run_table(table, progress, start)
+
+        self._keystore.clear_rewrap_checkpoint(self.job)
+        progress.elapsed = time.monotonic() - start
+        self.logger.info(
+            f"Rewrap job '{self.job}' finished: {progress.rewrapped} rewrapped, "
+            f"{progress.failed} failed, {progress.rate:.1f} keys/s"
+        )
+        return progress
+
+    def _run_table(
+        self, table: KeyTable, progress: RewrapProgress, start: float
+    ) -> None:
+        last_id: bytes | None = None
+        rewrapped = failed = 0
+        checkpoint = self._keystore.rewrap_checkpoint(self.job, table)
+        if checkpoint is not None:
+            last_id, rewrapped, failed = checkpoint
+            progress.rewrapped += rewrapped
+            progress.failed += failed
+            progress.resumed += rewrapped + failed
+            self.logger.info(
+                f"Resuming rewrap job '{self.job}' of {table} after "
+                f"{rewrapped + failed} key(s)"
+            )
+
+        while True:
+            page = self._keystore.private_keys_after(table, last_id, self.batch_size)
+            if not page:
+                return
+
+            outcomes = bounded_map(
+                self._executor,
+                lambda row: self._rewrap(row[1]),
+                page,
+                self.max_in_flight,
+            )
+            blobs: list[tuple[bytes, bytes]] = []
+            for (raw_id, _), outcome in zip(page, outcomes):
+                if isinstance(outcome, Exception):
+                    key_id = decode_key_id(raw_id)
+                    self.logger.error(f"Rewrap of key '{key_id}' failed: {outcome}")
+                    progress.failed_key_ids.append(key_id)
+                else:
+                    blobs.append((raw_id, outcome))
+
+            last_id = page[-1][0]
+            rewrapped += len(blobs)
+            failed += len(page) - len(blobs)
+            self._keystore.save_rewrapped(
+                self.job, table, blobs, last_id, rewrapped, failed
+            )
+            if self._on_rewrapped is not None:
+                self._on_rewrapped([decode_key_id(raw_id) for raw_id, _ in blobs])
+
+            progress.rewrapped += len(blobs)
+            progress.failed += len(page) - len(blobs)
+            progress.elapsed = time.monotonic() - start
+            self.logger.info(
+                f"Rewrapped {progress.done}/{progress.total} key(s), "
+                f"{progress.rate:.1f} keys/s"
+            )
+            if self._on_progress is not None:
+                self._on_progress(progress)
@@ -0,0 +1,595 @@
+#
+# (c) Copyright IBM Corp. 2025
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Signing sidecar shared by the workers of a component over a Unix socket.
+
+Every message is a frame made of its length as a big endian 32 bit integer,
+followed by a one byte header and a list of fields, each one prefixed by its
+own 32 bit length. The header of a request is its operation, the header of a
+response is ``0`` on success, or ``1`` with the error message as single field.
+A connection carries one request at a time.
+
+`Operation.SIGN_STREAM` is followed by one frame per chunk of the payload, and
+an empty frame once the payload is sent. `Operation.REWRAP_KEYS` is answered by
+one frame with header ``2`` per progress report, before its response.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import dataclasses
+import json
+import os
+import queue
+import socket
+import socketserver
+import struct
+import threading
+from contextlib import contextmanager
+from enum import IntEnum
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator
+
+from ._batch import SignResult
+from ._key import KeyType
+from ._rewrap import RewrapProgress
+from ._stream import Payload, iter_chunks
+from oso.framework.data.types import V1_3
+from oso.framework.core.logging import get_logger
+
+if TYPE_CHECKING:
+    from . import SigningServerAddon
+
+_LENGTH = struct.Struct("!I")
+
+#: Largest frame accepted, in bytes
+MAX_FRAME_SIZE = 64 << 20
+
+#: Largest chunk of a streamed payload sent per frame, in bytes
+STREAM_FRAME_SIZE = 1 << 20
+
+_OK = 0
+_ERROR = 1
+_PROGRESS = 2
+
+
+class Operation(IntEnum):
+    """Operations served by the sidecar."""
+
+    SIGN = 1
+    VERIFY = 2
+    GENERATE_KEY_PAIR = 3
+    GET_KEY_PEM = 4
+    LIST_KEYS = 5
+    HEALTH_CHECK = 6
+    GENERATE_HD_PARENT = 7
+    DERIVE_KEY = 8
+    GENERATE_KEY_PAIRS = 9
+    GET_KEY_PEMS = 10
+    SIGN_MANY = 11
+    VERIFY_MANY = 12
+    COUNT_KEYS = 13
+    SIGN_STREAM = 14
+    REWRAP_KEYS = 15
+
+
+class SidecarError(Exception):
+    """Error raised by the sidecar while serving a request."""
+
+
+class _StreamError(ConnectionError):
+    """The connection closed before the end of a streamed payload."""
+
+
+def _encode(header: int, fields: Iterable[bytes]) -> bytes:
+    parts = [bytes([header])]
+    for field in fields:
+        parts += [_LENGTH.pack(len(field)), field]
+    return b"".join(parts)
+
+
+def _decode(body: bytes) -> tuple[int, list[bytes]]:
+    fields = []
+    offset = 1
+    while offset < len(body):
+        (size,) = _LENGTH.unpack_from(body, offset)
+        offset += _LENGTH.size
+        fields.append(body[offset : offset + size])
+        offset += size
+    return body[0], fields
+
+
+def _encode_pem(pem: str | bytes) -> bytes:
+    return pem.encode() if isinstance(pem, str) else pem
+
+
+def _encode_int(value: int | None) -> bytes:
+    return b"" if value is None else str(value).encode()
+
+
+def _decode_int(field: bytes) -> int | None:
+    return int(field) if field else None
+
+
+def _encode_progress(progress: RewrapProgress) -> bytes:
+    return json.dumps(dataclasses.asdict(progress)).encode()
+
+
+def _decode_progress(field: bytes) -> RewrapProgress:
+    return RewrapProgress(**json.loads(field))
+
+
+def _recv_exactly(sock: socket.socket, size: int) -> bytes:
+    buffer = bytearray()
+    while len(buffer) < size:
+        chunk = sock.recv(size - len(buffer))
+        if not chunk:
+            raise ConnectionError("Connection closed mid-frame")
+        buffer += chunk
+    return bytes(buffer)
+
+
+def read_frame(sock: socket.socket) -> tuple[int, list[bytes]] | None:
+    """Read one frame, None if the peer closed the connection before it.
+
+    Raises
+    ------
+    ConnectionError
+        If the connection closes in the middle of a frame, or the frame is
+        larger than `MAX_FRAME_SIZE`.
+    """
+    head = sock.recv(_LENGTH.size, socket.MSG_WAITALL)
+    if not head:
+        return None
+    if len(head) < _LENGTH.size:
+        head += _recv_exactly(sock, _LENGTH.size - len(head))
+    (size,) = _LENGTH.unpack(head)
+    if not 0 < size <= MAX_FRAME_SIZE:
+        raise ConnectionError(f"Invalid frame size: {size}")
+    return _decode(_recv_exactly(sock, size))
+
+
+def write_frame(sock: socket.socket, header: int, fields: Iterable[bytes]) -> None:
+    """Write one frame.
+
+    Raises
+    ------
+    ValueError
+        If the frame is larger than `MAX_FRAME_SIZE`.
+    """
+    body = _encode(header, fields)
+    if len(body) > MAX_FRAME_SIZE:
+        raise ValueError(f"Frame of {len(body)} bytes exceeds {MAX_FRAME_SIZE}")
+    sock.sendall(_LENGTH.pack(len(body)) + body)
+
+
+class _ChunkReader:
+    """Chunks of a payload streamed after a request, up to an empty frame.
+
+    `SigningServerAddon.sign_stream` reads ahead on a background thread, the
+    lock lets `drain` run while that thread is still reading.
+    """
+
+    def __init__(self, sock: socket.socket) -> None:
+        self._sock = sock
+        self._lock = threading.Lock()
+        self._done = False
+
+    def __iter__(self) -> Iterator[bytes]:
+        return self
+
+    def __next__(self) -> bytes:
+        with self._lock:
+            if self._done:
+                raise StopIteration
+            try:
+                frame = read_frame(self._sock)
+            except ConnectionError as e:
+                raise _StreamError(str(e)) from e
+            if frame is None:
+                raise _StreamError("Connection closed mid-stream")
+            if not frame[1]:
+                self._done = True
+                raise StopIteration
+            return frame[1][0]
+
+    def drain(self) -> None:
+        """Skip the chunks left, so the response follows the empty frame."""
+        for _ in self:
+            pass
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    server: SigningSidecar
+
+    def handle(self) -> None:
+        while True:
+            try:
+                frame = read_frame(self.request)
+            except ConnectionError as e:
+                self.server.logger.warning(f"Dropping sidecar connection: {e}")
+                return
+            if frame is None:
+                return
+            try:
+                fields = self.server.serve(Operation(frame[0]), frame[1], self.request)
+            except _StreamError as e:
+                self.server.logger.warning(f"Dropping sidecar connection: {e}")
+                return
+            except Exception as e:
+                write_frame(self.request, _ERROR, [str(e).encode()])
+            else:
+                write_frame(self.request, _OK, fields)
+
+
+class SigningSidecar(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Serve a `SigningServerAddon` to the workers of a component.
+
+    Every connection is served by its own thread, so the calls of all workers
+    share the GREP11 channels, keystore connections, caches and sign batching
+    of a single addon.
+
+    Parameters
+    ----------
+    addon : SigningServerAddon
+        The addon requests are served by.
+    path : str
+        Path of the Unix socket, replaced if it exists. Only the owner of the
+        process can connect to it.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, addon: SigningServerAddon, path: str) -> None:
+        self.logger = get_logger("signing_server.sidecar")
+        self.addon = addon
+        if os.path.exists(path):
+            os.unlink(path)
+        super().__init__(path, _Handler)
+        os.chmod(path, 0o600)
+        self.logger.info(f"Signing sidecar listening on '{path}'")
+
+    def serve(
+        self, operation: Operation, fields: list[bytes], sock: socket.socket
+    ) -> list[bytes]:
+        """Run an operation on the addon, with its encoded arguments and result.
+
+        Streamed operations read their chunks from, and write their progress
+        reports to, ``sock``, the connection of the request.
+        """
+        match operation:
+            case Operation.SIGN:
+                key_id, data = fields
+                return [self.addon.sign(key_id.decode(), data).encode()]
+            case Operation.VERIFY:
+                key_id, data, signature = fields
+                verified = self.addon.verify(key_id.decode(), data, signature.decode())
+                return [b"\x01" if verified else b""]
+            case Operation.GENERATE_KEY_PAIR:
+                (key_type,) = fields
+                key_id, pem = self.addon.generate_key_pair(KeyType[key_type.decode()])
+                return [key_id.encode(), _encode_pem(pem)]
+            case Operation.GET_KEY_PEM:
+                (key_id,) = fields
+                pem = self.addon.get_key_pem(key_id.decode())
+                return [] if pem is None else [_encode_pem(pem)]
+            case Operation.LIST_KEYS:
+                (key_type,) = fields
+                key_ids = self.addon.list_keys(KeyType[key_type.decode()])
+                return [key_id.encode() for key_id in key_ids]
+            case Operation.HEALTH_CHECK:
+                return [self.addon.health_check().model_dump_json().encode()]
+            case Operation.GENERATE_HD_PARENT:
+                (key_type,) = fields
+                parent_id = self.addon.generate_hd_parent(KeyType[key_type.decode()])
+                return [parent_id.encode()]
+            case Operation.DERIVE_KEY:
+                parent_id, path = fields
+                key_id, pem = self.addon.derive_key(parent_id.decode(), path.decode())
+                return [key_id.encode(), _encode_pem(pem)]
+            case Operation.GENERATE_KEY_PAIRS:
+                key_type, n, max_in_flight = fields
+                pairs = self.addon.generate_key_pairs(
+                    KeyType[key_type.decode()], int(n), _decode_int(max_in_flight)
+                )
+                return [
+                    field
+                    for key_id, pem in pairs
+                    for field in (key_id.encode(), _encode_pem(pem))
+                ]
+            case Operation.GET_KEY_PEMS:
+                pems = self.addon.get_key_pems(key_id.decode() for key_id in fields)
+                # A PEM is never empty, an empty field stands for a missing key
+                return [b"" if pem is None else _encode_pem(pem) for pem in pems]
+            case Operation.SIGN_MANY:
+                max_in_flight, *items = fields
+                results = self.addon.sign_many(
+                    zip((key_id.decode() for key_id in items[::2]), items[1::2]),
+                    _decode_int(max_in_flight),
+                )
+                return [
+                    bytes([_OK]) + result.signature.encode()
+                    if result.ok
+                    else bytes([_ERROR]) + str(result.error).encode()
+                    for result in results
+                ]
+            case Operation.VERIFY_MANY:
+                max_in_flight, *items = fields
+                verified = self.addon.verify_many(
+                    zip(
+                        (key_id.decode() for key_id in items[::3]),
+                        items[1::3],
+                        (signature.decode() for signature in items[2::3]),
+                    ),
+                    _decode_int(max_in_flight),
+                )
+                return [b"\x01" if ok else b"" for ok in verified]
+            case Operation.COUNT_KEYS:
+                (key_type,) = fields
+                count = self.addon.count_keys(
+                    KeyType[key_type.decode()] if key_type else None
+                )
+                return [_encode_int(count)]
+            case Operation.SIGN_STREAM:
+                key_id, chunk_size = fields
+                chunks = _ChunkReader(sock)
+                try:
+                    signature = self.addon.sign_stream(
+                        key_id.decode(), chunks, _decode_int(chunk_size)
+                    )
+                finally:
+                    chunks.drain()
+                return [signature.encode()]
+            case Operation.REWRAP_KEYS:
+                job, max_in_flight = fields
+                progress = self.addon.rewrap_keys(
+                    job.decode(),
+                    _decode_int(max_in_flight),
+                    lambda progress: write_frame(
+                        sock, _PROGRESS, [_encode_progress(progress)]
+                    ),
+                )
+                return [_encode_progress(progress)]
+
+    def server_close(self) -> None:
+        """Stop listening and remove the socket."""
+        super().server_close()
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)
+
+
+class SidecarClient:
+    """Thin client of a `SigningSidecar`, used in place of the addon.
+
+    Holds no GREP11 channel, keystore or cache, only a pool of connections to
+    the sidecar, opened on demand. The ``*_async`` methods run the blocking
+    call on the default executor of the event loop, so `sign_many_async` is
+    capped by ``max_in_flight`` of the sidecar like `sign_many`. The requests
+    of a batch call must fit in a frame of `MAX_FRAME_SIZE` bytes.
+
+    Parameters
+    ----------
+    path : str
+        Path of the Unix socket of the sidecar.
+    timeout : float | None
+        Seconds to wait for any socket operation, None to wait forever.
+    """
+
+    def __init__(self, path: str, timeout: float | None = None) -> None:
+        self.path = path
+        self.timeout = timeout
+        self._idle: queue.LifoQueue[socket.socket] = queue.LifoQueue()
+
+    @contextmanager
+    def _connection(self) -> Iterator[socket.socket]:
+        try:
+            sock = self._idle.get_nowait()
+        except queue.Empty:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            sock.connect(self.path)
+        try:
+            yield sock
+        except BaseException:
+            # The connection may hold a partial frame, it cannot be reused
+            sock.close()
+            raise
+        self._idle.put(sock)
+
+    @staticmethod
+    def _result(frame: tuple[int, list[bytes]] | None) -> list[bytes]:
+        if frame is None:
+            raise ConnectionError("Signing sidecar closed the connection")
+        status, result = frame
+        if status != _OK:
+            raise SidecarError(result[0].decode())
+        return result
+
+    def _call(self, operation: Operation, *fields: bytes) -> list[bytes]:
+        with self._connection() as sock:
+            write_frame(sock, operation, fields)
+            frame = read_frame(sock)
+        return self._result(frame)
+
+    def sign(self, key_id: str, data: bytes) -> str:
+        """See `SigningServerAddon.sign`."""
+        return self._call(Operation.SIGN, key_id.encode(), data)[0].decode()
+
+    def verify(self, key_id: str, data: bytes, signature: str) -> bool:
+        """See `SigningServerAddon.verify`."""
+        result = self._call(Operation.VERIFY, key_id.encode(), data, signature.encode())
+        return result[0] == b"\x01"
+
+    def generate_key_pair(self, key_type: KeyType) -> tuple[str, str]:
+        """See `SigningServerAddon.generate_key_pair`."""
+        key_id, pem = self._call(Operation.GENERATE_KEY_PAIR, key_type.name.encode())
+        return key_id.decode(), pem.decode()
+
+    def generate_key_pairs(
+        self, key_type: KeyType, n: int, max_in_flight: int | None = None
+    ) -> list[tuple[str, str]]:
+        """See `SigningServerAddon.generate_key_pairs`."""
+        result = self._call(
+            Operation.GENERATE_KEY_PAIRS,
+            key_type.name.encode(),
+            _encode_int(n),
+            _encode_int(max_in_flight),
+        )
+        return [
+            (key_id.decode(), pem.decode())
+            for key_id, pem in zip(result[::2], result[1::2])
+        ]
+
+    def rewrap_keys(
+        self,
+        job: str = "rewrap",
+        max_in_flight: int | None = None,
+        on_progress: Callable[[RewrapProgress], None] | None = None,
+    ) -> RewrapProgress:
+        """See `SigningServerAddon.rewrap_keys`."""
+        with self._connection() as sock:
+            write_frame(
+                sock, Operation.REWRAP_KEYS, [job.encode(), _encode_int(max_in_flight)]
+            )
+            while (frame := read_frame(sock)) is not None and frame[0] == _PROGRESS:
+                if on_progress is not None:
+                    on_progress(_decode_progress(frame[1][0]))
+        return _decode_progress(self._result(frame)[0])
+
+    def generate_hd_parent(self, key_type: KeyType) -> str:
+        """See `SigningServerAddon.generate_hd_parent`."""
+        result = self._call(Operation.GENERATE_HD_PARENT, key_type.name.encode())
+        return result[0].decode()
+
+    def derive_key(self, parent_id: str, path: str) -> tuple[str, str]:
+        """See `SigningServerAddon.derive_key`."""
+        key_id, pem = self._call(
+            Operation.DERIVE_KEY, parent_id.encode(), path.encode()
+        )
+        return key_id.decode(), pem.decode()
+
+    def get_key_pem(self, key_id: str) -> str | None:
+        """See `SigningServerAddon.get_key_pem`."""
+        result = self._call(Operation.GET_KEY_PEM, key_id.encode())
+        return result[0].decode() if result else None
+
+    def get_key_pems(self, key_ids: Iterable[str]) -> list[str | None]:
+        """See `SigningServerAddon.get_key_pems`."""
+        result = self._call(
+            Operation.GET_KEY_PEMS, *(key_id.encode() for key_id in key_ids)
+        )
+        return [pem.decode() if pem else None for pem in result]
+
+    def sign_stream(
+        self, key_id: str, payload: Payload, chunk_size: int | None = None
+    ) -> str:
+        """See `SigningServerAddon.sign_stream`.
+
+        The payload is sent in frames of at most `STREAM_FRAME_SIZE` bytes, or
+        ``chunk_size`` if given, and split again by the sidecar.
+        """
+        with self._connection() as sock:
+            write_frame(
+                sock, Operation.SIGN_STREAM, [key_id.encode(), _encode_int(chunk_size)]
+            )
+            for chunk in iter_chunks(payload, chunk_size or STREAM_FRAME_SIZE):
+                write_frame(sock, _OK, [chunk])
+            write_frame(sock, _OK, [])
+            frame = read_frame(sock)
+        return self._result(frame)[0].decode()
+
+    def sign_many(
+        self,
+        requests: Iterable[tuple[str, bytes]],
+        max_in_flight: int | None = None,
+    ) -> list[SignResult]:
+        """See `SigningServerAddon.sign_many`."""
+        requests = list(requests)
+        result = self._call(
+            Operation.SIGN_MANY,
+            _encode_int(max_in_flight),
+            *(field for key_id, data in requests for field in (key_id.encode(), data)),
+        )
+        return [
+            SignResult(key_id=key_id, signature=outcome[1:].decode())
+            if outcome[0] == _OK
+            else SignResult(key_id=key_id, error=SidecarError(outcome[1:].decode()))
+            for (key_id, _), outcome in zip(requests, result)
+        ]
+
+    def verify_many(
+        self,
+        requests: Iterable[tuple[str, bytes, str]],
+        max_in_flight: int | None = None,
+    ) -> list[bool]:
+        """See `SigningServerAddon.verify_many`."""
+        result = self._call(
+            Operation.VERIFY_MANY,
+            _encode_int(max_in_flight),
+            *(
+                field
+                for key_id, data, signature in requests
+                for field in (key_id.encode(), data, signature.encode())
+            ),
+        )
+        return [verified == b"\x01" for verified in result]
+
+    def count_keys(self, key_type: KeyType | None = None) -> int:
+        """See `SigningServerAddon.count_keys`."""
+        key_type_name = b"" if key_type is None else key_type.name.encode()
+        return int(self._call(Operation.COUNT_KEYS, key_type_name)[0])
+
+    def list_keys(self, key_type: KeyType) -> list[str]:
+        """See `SigningServerAddon.list_keys`."""
+        return [
+            key_id.decode()
+            for key_id in self._call(Operation.LIST_KEYS, key_type.name.encode())
+        ]
+
+    def health_check(self) -> V1_3.ComponentStatus:
+        """See `SigningServerAddon.health_check`."""
+        (status,) = self._call(Operation.HEALTH_CHECK)
+        return V1_3.ComponentStatus.model_validate_json(status)
+
+    async def generate_key_pair_async(self, key_type: KeyType) -> tuple[str, str]:
+        """See `SigningServerAddon.generate_key_pair_async`."""
+        return await asyncio.to_thread(self.generate_key_pair, key_type)
+
+    async def sign_async(self, key_id: str, data: bytes) -> str:
+        """See `SigningServerAddon.sign_async`."""
+        return await asyncio.to_thread(self.sign, key_id, data)
+
+    async def sign_many_async(
+        self,
+        requests: Iterable[tuple[str, bytes]],
+        max_in_flight: int | None = None,
+    ) -> list[SignResult]:
+        """See `SigningServerAddon.sign_many_async`."""
+        return await asyncio.to_thread(self.sign_many, list(requests), max_in_flight)
+
+    async def verify_async(self, key_id: str, data: bytes, signature: str) -> bool:
+        """See `SigningServerAddon.verify_async`."""
+        return await asyncio.to_thread(self.verify, key_id, data, signature)
+
+    async def health_check_async(self) -> V1_3.ComponentStatus:
+        """See `SigningServerAddon.health_check_async`."""
+        return await asyncio.to_thread(self.health_check)
+
+    def close(self) -> None:
+        """Close the idle connections to the sidecar."""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
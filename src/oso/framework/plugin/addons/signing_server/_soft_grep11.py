@@ -0,0 +1,375 @@
+#
+# (c) Copyright IBM Corp. 2025
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Software stand-in of a GREP11 server, to benchmark without an HSM.
+
+Implements the subset of the ``Crypto`` service used by the signing server
+addon with ``cryptography``: key pair generation, single and multi-part
+signing, verification and the mechanism list. Private keys never leave the
+server in the clear, their blobs are encrypted with a wrapping key held in
+memory, like the blobs of an HSM domain. Nothing here is meant to protect
+real keys.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import random
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent import futures
+from functools import lru_cache
+from typing import Any, NoReturn
+
+import grpc
+from asn1crypto import core as asn1_core
+from cryptography.exceptions import InvalidSignature, InvalidTag
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+from cryptography.hazmat.primitives.asymmetric.utils import (
+    Prehashed,
+    decode_dss_signature,
+    encode_dss_signature,
+)
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from pkcs11 import Attribute, Mechanism
+
+from ._key import StreamingMechanism, SupportedMechanism, SupportedOID
+from ._verifier import _spki, ecdsa_digest
+from .generated import server_pb2, server_pb2_grpc
+
+from oso.framework.core.logging import get_logger
+
+_NONCE_SIZE = 12
+_BLOB_LABEL = b"soft-grep11"
+_SECP256K1_SIZE = 32
+
+#: Mechanisms reported by ``GetMechanismList``
+MECHANISMS = [
+    Mechanism.EC_KEY_PAIR_GEN,
+    *SupportedMechanism,
+    *StreamingMechanism,
+]
+
+PrivateKey = ec.EllipticCurvePrivateKey | ed25519.Ed25519PrivateKey
+
+
+def _raw_signature(der_signature: bytes) -> bytes:
+    r, s = decode_dss_signature(der_signature)
+    return r.to_bytes(_SECP256K1_SIZE, "big") + s.to_bytes(_SECP256K1_SIZE, "big")
+
+
+class SoftCryptoServicer(server_pb2_grpc.CryptoServicer):
+    """``Crypto`` service backed by ``cryptography``.
+
+    Every call first waits for ``latency`` plus an exponentially distributed
+    delay of mean ``jitter``, which gives the long tail of a busy HSM, then
+    fails with ``error_code`` for a share ``error_rate`` of the calls.
+
+    Multi-part signing sessions are kept in memory until their ``SignFinal``,
+    the state sent to the client only identifies them. Sessions idle for
+    ``session_ttl`` seconds are dropped, and so is the least recently used one
+    once ``max_sessions`` are open, so abandoned streams do not pile up.
+
+    Parameters
+    ----------
+    latency : float
+        Seconds every call takes at least.
+    jitter : float
+        Mean of the extra delay of every call, in seconds.
+    error_rate : float
+        Share of the calls failing, between ``0`` and ``1``.
+    error_code : grpc.StatusCode
+        Status of the failing calls.
+    wrapping_key : bytes | None
+        256 bit AES key encrypting the private key blobs, random if None. Set
+        it to keep the blobs of a keystore usable across restarts.
+    session_ttl : float
+        Seconds a multi-part signing session is kept without a call.
+    max_sessions : int
+        Number of multi-part signing sessions kept at most.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        error_code: grpc.StatusCode = grpc.StatusCode.UNAVAILABLE,
+        wrapping_key: bytes | None = None,
+        session_ttl: float = 300.0,
+        max_sessions: int = 10_000,
+    ) -> None:
+        self.logger = get_logger("soft_grep11")
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_code = error_code
+        self._wrapping_key = AESGCM(
+            wrapping_key or AESGCM.generate_key(bit_length=256)
+        )
+        self._unwrap = lru_cache(maxsize=4096)(self._unwrap_key)
+        self.session_ttl = session_ttl
+        self.max_sessions = max_sessions
+        # Sessions by state, least recently used first, with their last use
+        self._sessions: OrderedDict[bytes, tuple[PrivateKey, Any, float]] = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    def _simulate(self, context: grpc.ServicerContext) -> None:
+        delay = self.latency
+        if self.jitter:
+            delay += random.expovariate(1 / self.jitter)
+        if delay:
+            time.sleep(delay)
+        if self.error_rate and random.random() < self.error_rate:
+            context.abort(self.error_code, "Injected error")
+
+    @staticmethod
+    def _abort(context: grpc.ServicerContext, message: str) -> NoReturn:
+        # Raises, like the CK_RV errors of GREP11
+        context.abort(grpc.StatusCode.INVALID_ARGUMENT, message)
+
+    def _wrap(self, private_key: PrivateKey) -> bytes:
+        der = private_key.private_bytes(
+            encoding=serialization.Encoding.DER,
+            format=serialization.PrivateFormat.PKCS8,
+            encryption_algorithm=serialization.NoEncryption(),
+        )
+        nonce = os.urandom(_NONCE_SIZE)
+        return nonce + self._wrapping_key.encrypt(nonce, der, _BLOB_LABEL)
+
+    def _unwrap_key(self, blob: bytes) -> PrivateKey:
+        der = self._wrapping_key.decrypt(
+            blob[:_NONCE_SIZE], blob[_NONCE_SIZE:], _BLOB_LABEL
+        )
+        return serialization.load_der_private_key(der, password=None)  # type: ignore
+
+    def _private_key(
+        self, context: grpc.ServicerContext, key: server_pb2.KeyBlob, mechanism: int
+    ) -> PrivateKey:
+        try:
+            private_key = self._unwrap(key.KeyBlobs[0] if key.KeyBlobs else b"")
+        except (InvalidTag, ValueError):
+            self._abort(context, "CKR_WRAPPED_KEY_INVALID")
+        expected = (
+            ed25519.Ed25519PrivateKey
+            if mechanism == SupportedMechanism.ED25519_SHA512
+            else ec.EllipticCurvePrivateKey
+        )
+        if not isinstance(private_key, expected):
+            self._abort(context, "CKR_KEY_TYPE_INCONSISTENT")
+        return private_key
+
+    def GetMechanismList(self, request, context):
+        self._simulate(context)
+        return server_pb2.GetMechanismListResponse(Mechs=MECHANISMS)
+
+    def GenerateKeyPair(self, request, context):
+        self._simulate(context)
+        if request.Mech.Mechanism != Mechanism.EC_KEY_PAIR_GEN:
+            self._abort(context, "CKR_MECHANISM_INVALID")
+
+        match request.PubKeyTemplate[Attribute.EC_PARAMS].AttributeB.hex():
+            case SupportedOID.SECP256K1:
+                private_key: PrivateKey = ec.generate_private_key(ec.SECP256K1())
+                ec_point = private_key.public_key().public_bytes(
+                    encoding=serialization.Encoding.X962,
+                    format=serialization.PublicFormat.UncompressedPoint,
+                )
+            case SupportedOID.ED25519:
+                private_key = ed25519.Ed25519PrivateKey.generate()
+                ec_point = private_key.public_key().public_bytes(
+                    encoding=serialization.Encoding.Raw,
+                    format=serialization.PublicFormat.Raw,
+                )
+            case _:
+                self._abort(context, "CKR_CURVE_NOT_SUPPORTED")
+
+        spki = private_key.public_key().public_bytes(
+            encoding=serialization.Encoding.DER,
+            format=serialization.PublicFormat.SubjectPublicKeyInfo,
+        )
+        blob = self._wrap(private_key)
+        ec_point_attribute = server_pb2.AttributeValue(
+            AttributeB=asn1_core.OctetString(ec_point).dump()
+        )
+        return server_pb2.GenerateKeyPairResponse(
+            PrivKeyBytes=blob,
+            PubKeyBytes=spki,
+            PrivKey=server_pb2.KeyBlob(KeyBlobs=[blob]),
+            PubKey=server_pb2.KeyBlob(
+                KeyBlobs=[spki], Attributes={Attribute.EC_POINT: ec_point_attribute}
+            ),
+        )
+
+    def SignSingle(self, request, context):
+        self._simulate(context)
+        mechanism = request.Mech.Mechanism
+        private_key = self._private_key(context, request.PrivKey, mechanism)
+
+        match mechanism:
+            case SupportedMechanism.ECDSA:
+                signature = _raw_signature(
+                    private_key.sign(  # type: ignore[call-arg]
+                        ecdsa_digest(request.Data),
+                        ec.ECDSA(Prehashed(hashes.SHA256())),
+                    )
+                )
+            case SupportedMechanism.ED25519_SHA512:
+                signature = private_key.sign(request.Data)  # type: ignore[call-arg]
+            case _:
+                self._abort(context, "CKR_MECHANISM_INVALID")
+
+        return server_pb2.SignSingleResponse(Signature=signature)
+
+    def SignInit(self, request, context):
+        self._simulate(context)
+        if request.Mech.Mechanism != StreamingMechanism.ECDSA_SHA256:
+            self._abort(context, "CKR_MECHANISM_INVALID")
+        private_key = self._private_key(
+            context, request.PrivKey, request.Mech.Mechanism
+        )
+        state = uuid.uuid4().bytes
+        now = time.monotonic()
+        with self._lock:
+            self._evict_sessions(now)
+            self._sessions[state] = (private_key, hashlib.sha256(), now)
+        return server_pb2.SignInitResponse(State=state)
+
+    def _evict_sessions(self, now: float) -> None:
+        """Drop the expired sessions, and the oldest ones beyond the cap.
+
+        Must be called with the lock held.
+        """
+        expired = 0
+        while self._sessions:
+            state, (_, _, last_used) = next(iter(self._sessions.items()))
+            if now - last_used < self.session_ttl:
+                break
+            del self._sessions[state]
+            expired += 1
+        if expired:
+            self.logger.debug(f"Dropped {expired} expired signing session(s)")
+        while len(self._sessions) >= self.max_sessions:
+            self._sessions.popitem(last=False)
+            self.logger.warning("Dropped the least recently used signing session")
+
+    def _session(
+        self, context: grpc.ServicerContext, state: bytes, final: bool = False
+    ) -> tuple[PrivateKey, Any]:
+        now = time.monotonic()
+        with self._lock:
+            session = self._sessions.pop(state, None)
+            if session is not None and now - session[2] >= self.session_ttl:
+                session = None
+            if session is not None and not final:
+                # Re-inserted last, as the most recently used session
+                self._sessions[state] = (*session[:2], now)
+        if session is None:
+            self._abort(context, "CKR_OPERATION_NOT_INITIALIZED")
+        return session[:2]
+
+    def SignUpdate(self, request, context):
+        self._simulate(context)
+        _, digest = self._session(context, request.State)
+        digest.update(request.Data)
+        return server_pb2.SignUpdateResponse(State=request.State)
+
+    def SignFinal(self, request, context):
+        self._simulate(context)
+        private_key, digest = self._session(context, request.State, final=True)
+        signature = _raw_signature(
+            private_key.sign(  # type: ignore[call-arg]
+                digest.digest(), ec.ECDSA(Prehashed(hashes.SHA256()))
+            )
+        )
+        return server_pb2.SignFinalResponse(Signature=signature)
+
+    def VerifySingle(self, request, context):
+        self._simulate(context)
+        try:
+            public_key = serialization.load_der_public_key(
+                _spki(request.PubKey.KeyBlobs[0] if request.PubKey.KeyBlobs else b"")
+            )
+        except ValueError:
+            self._abort(context, "CKR_PUBLIC_KEY_INVALID")
+
+        signature = request.Signature
+        try:
+            match request.Mech.Mechanism:
+                case SupportedMechanism.ECDSA if isinstance(
+                    public_key, ec.EllipticCurvePublicKey
+                ):
+                    public_key.verify(
+                        encode_dss_signature(
+                            int.from_bytes(signature[:_SECP256K1_SIZE], "big"),
+                            int.from_bytes(signature[_SECP256K1_SIZE:], "big"),
+                        ),
+                        ecdsa_digest(request.Data),
+                        ec.ECDSA(Prehashed(hashes.SHA256())),
+                    )
+                case SupportedMechanism.ED25519_SHA512 if isinstance(
+                    public_key, ed25519.Ed25519PublicKey
+                ):
+                    public_key.verify(signature, request.Data)
+                case _:
+                    self._abort(context, "CKR_KEY_TYPE_INCONSISTENT")
+        except InvalidSignature:
+            self._abort(context, "CKR_SIGNATURE_INVALID")
+        return server_pb2.VerifySingleResponse()
+
+
+def serve(
+    address: str,
+    credentials: grpc.ServerCredentials | None,
+    servicer: SoftCryptoServicer,
+    max_workers: int = 32,
+    options: list[tuple[str, Any]] | None = None,
+) -> tuple[grpc.Server, int]:
+    """Start a server, over TLS unless ``credentials`` is None.
+
+    Parameters
+    ----------
+    address : str
+        Address to listen on, e.g. ``localhost:0`` for any free port.
+    credentials : grpc.ServerCredentials | None
+        TLS credentials of the server, None to listen in plain text.
+    servicer : SoftCryptoServicer
+        The service to serve.
+    max_workers : int
+        Number of threads serving the calls.
+    options : list[tuple[str, Any]] | None
+        gRPC server options.
+
+    Returns
+    -------
+    tuple[grpc.Server, int]
+        The started server and the port it listens on.
+    """
+    server = grpc.server(
+        futures.ThreadPoolExecutor(max_workers=max_workers), options=options
+    )
+    server_pb2_grpc.add_CryptoServicer_to_server(servicer, server)
+    if credentials is None:
+        port = server.add_insecure_port(address)
+    else:
+        port = server.add_secure_port(address, credentials)
+    server.start()
+    return server, port
@@ -0,0 +1,85 @@
+#
+# (c) Copyright IBM Corp. 2025
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Chunked reading of payloads signed in multiple parts."""
+
+from __future__ import annotations
+
+import queue
+import threading
+from typing import BinaryIO, Iterable, Iterator
+
+Payload = Iterable[bytes] | BinaryIO
+"""An iterable of byte chunks, or a binary file-like object."""
+
+_END = object()
+
+
+def iter_chunks(payload: Payload, chunk_size: int) -> Iterator[bytes]:
+    """Split a payload in chunks of at most ``chunk_size`` bytes.
+
+    File-like objects are read ``chunk_size`` bytes at a time. Chunks of an
+    iterable larger than ``chunk_size`` are split, empty chunks are skipped.
+    """
+    read = getattr(payload, "read", None)
+    if read is not None:
+        while chunk := read(chunk_size):
+            yield chunk
+        return
+
+    for chunk in payload:  # type: ignore[union-attr]
+        for start in range(0, len(chunk), chunk_size):
+            yield bytes(chunk[start : start + chunk_size])
+
+
+def prefetch(chunks: Iterable[bytes], depth: int = 2) -> Iterator[bytes]:
+    """Read ahead of the consumer on a background thread.
+
+    At most ``depth`` chunks are buffered, so reading the next chunk overlaps
+    with sending the current one while memory stays bounded. An exception
+    raised while reading is re-raised to the consumer.
+    """
+    buffer: queue.Queue = queue.Queue(maxsize=depth)
+    stopped = threading.Event()
+
+    def _put(item) -> bool:
+        while not stopped.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _read() -> None:
+        try:
+            for chunk in chunks:
+                if not _put(chunk):
+                    return
+        except BaseException as e:
+            _put(e)
+            return
+        _put(_END)
+
+    reader = threading.Thread(target=_read, name="signing-server-prefetch", daemon=True)
+    reader.start()
+    try:
+        while (item := buffer.get()) is not _END:
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stopped.set()
+        reader.join()
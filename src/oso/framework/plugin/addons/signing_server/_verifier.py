@@ -0,0 +1,118 @@
+#
+# (c) Copyright IBM Corp. 2025
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Local signature verification with stored public keys."""
+
+from __future__ import annotations
+
+from functools import lru_cache
+
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+from cryptography.hazmat.primitives.asymmetric.utils import (
+    Prehashed,
+    encode_dss_signature,
+)
+
+from ._key import KeyType
+
+#: Byte length of a SECP256K1 scalar, and of each half of a raw signature.
+_SECP256K1_SIZE = 32
+
+
+def _spki(pub_key_bytes: bytes) -> bytes:
+    """Strip anything trailing the DER SubjectPublicKeyInfo.
+
+    GREP11 public key blobs may carry data, like a MAC, after the SPKI sequence.
+    """
+    if len(pub_key_bytes) < 2 or pub_key_bytes[0] != 0x30:
+        raise ValueError("Public key is not a DER sequence")
+    length = pub_key_bytes[1]
+    offset = 2
+    if length & 0x80:
+        count = length & 0x7F
+        length = int.from_bytes(pub_key_bytes[2 : 2 + count], "big")
+        offset += count
+    return pub_key_bytes[: offset + length]
+
+
+@lru_cache(maxsize=4096)
+def _load_public_key(pub_key_bytes: bytes):
+    return serialization.load_der_public_key(_spki(pub_key_bytes))
+
+
+def ecdsa_digest(data: bytes) -> bytes:
+    """Value signed by ``CKM_ECDSA`` on a 256-bit curve.
+
+    ``CKM_ECDSA`` treats the data as the hash to sign: its leftmost 256 bits are
+    used, and shorter data is an integer of fewer bits, i.e. left padded.
+    """
+    return data[:_SECP256K1_SIZE].rjust(_SECP256K1_SIZE, b"\x00")
+
+
+class LocalVerifier:
+    """Verify signatures made by the GREP11 server without calling it.
+
+    Stored public keys are DER encoded SubjectPublicKeyInfo, which are loaded
+    with ``cryptography`` and kept in a bounded cache.
+    """
+
+    def verify(
+        self, key_type: KeyType, pub_key_bytes: bytes, data: bytes, signature: str
+    ) -> bool:
+        """Verify a hex encoded signature.
+
+        Returns
+        -------
+        bool
+            True if the signature is valid, False otherwise.
+
+        Raises
+        ------
+        ValueError
+            If the public key cannot be loaded.
+        """
+        public_key = _load_public_key(pub_key_bytes)
+
+        try:
+            signature_bytes = bytes.fromhex(signature)
+        except ValueError:
+            return False
+
+        try:
+            match key_type.name:
+                case KeyType.SECP256K1.name:
+                    if not isinstance(public_key, ec.EllipticCurvePublicKey):
+                        raise ValueError("Public key is not an EC key")
+                    if len(signature_bytes) != 2 * _SECP256K1_SIZE:
+                        return False
+                    r = int.from_bytes(signature_bytes[:_SECP256K1_SIZE], "big")
+                    s = int.from_bytes(signature_bytes[_SECP256K1_SIZE:], "big")
+                    public_key.verify(
+                        encode_dss_signature(r, s),
+                        ecdsa_digest(data),
+                        ec.ECDSA(Prehashed(hashes.SHA256())),
+                    )
+                case KeyType.ED25519.name:
+                    if not isinstance(public_key, ed25519.Ed25519PublicKey):
+                        raise ValueError("Public key is not an Ed25519 key")
+                    public_key.verify(signature_bytes, data)
+                case _:
+                    raise ValueError(f"Unsupported key type {key_type.name}")
+        except InvalidSignature:
+            return False
+
+        return True
@@ -1,3 +1,7 @@
+import asyncio
+import hashlib
+import uuid
+
 import pkcs11
 import pytest
 import datetime
@@ -10,6 +14,11 @@ from cryptography.x509.oid import NameOID
 from cryptography.hazmat.primitives import hashes, serialization
 from cryptography.hazmat.primitives.asymmetric import rsa, ec
 from cryptography.hazmat.primitives.asymmetric import ed25519
+from cryptography.hazmat.primitives.asymmetric.utils import (
+    Prehashed,
+    decode_dss_signature,
+    encode_dss_signature,
+)
 
 from oso.framework.plugin.addons.signing_server.generated import server_pb2
 from oso.framework.plugin.addons.signing_server._key import SECP256K1_Key, ED25519_Key
@@ -127,24 +136,40 @@ def ed25519_key_pair():
 
 @pytest.fixture
 def grpc_stub_mock(secp256k1_key_pair, ed25519_key_pair):
+    # Multi-part signing sessions, shared by the stubs of every channel
+    sessions = {}
+    btc_derive = server_pb2.BTCDeriveParm
+
     # Create a class to mock the stub
     class MockCryptoStub:
+        # DeriveKey requests, shared by the stubs of every channel
+        derive_requests = []
+
         def __init__(self, _=None):
             pass
 
-        def GenerateKeyPair(self, request: server_pb2.GenerateKeyPairRequest):
+        def GenerateKeyPair(
+            self,
+            request: server_pb2.GenerateKeyPairRequest,
+            timeout=None,
+            compression=None,
+        ):
             priv_key = server_pb2.KeyBlob()
 
-            ec_point_bytes = None
-
             match request.PubKeyTemplate[pkcs11.Attribute.EC_PARAMS].AttributeB.hex():
                 case SECP256K1_Key.Oid:
-                    ec_point_bytes = secp256k1_key_pair["ec_point_bytes"]
+                    key_pair = secp256k1_key_pair
                 case ED25519_Key.Oid:
-                    ec_point_bytes = ed25519_key_pair["ec_point_bytes"]
+                    key_pair = ed25519_key_pair
                 case _:
                     raise Exception("Unsupported Key OID")
 
+            ec_point_bytes = key_pair["ec_point_bytes"]
+            spki_bytes = key_pair["public_key"].public_bytes(
+                encoding=serialization.Encoding.DER,
+                format=serialization.PublicFormat.SubjectPublicKeyInfo,
+            )
+
             octet_string = asn1_core.OctetString(ec_point_bytes)
 
             der_encoded_ec_point = octet_string.dump()
@@ -158,12 +183,129 @@ def grpc_stub_mock(secp256k1_key_pair, ed25519_key_pair):
             )
 
             response = server_pb2.GenerateKeyPairResponse(
-                PrivKey=priv_key, PubKey=pub_key
+                PrivKey=priv_key, PubKey=pub_key, PubKeyBytes=spki_bytes
             )
 
             return response
 
-        def GetMechanismList(self, _):
+        def SignSingle(
+            self, request: server_pb2.SignSingleRequest, timeout=None, compression=None
+        ):
+            if request.Data == b"fail":
+                raise Exception("Signing failed")
+
+            match request.Mech.Mechanism:
+                case SECP256K1_Key.Mechanism:
+                    digest = request.Data[:32].rjust(32, b"\x00")
+                    der_signature = secp256k1_key_pair["private_key"].sign(
+                        digest, ec.ECDSA(Prehashed(hashes.SHA256()))
+                    )
+                    r, s = decode_dss_signature(der_signature)
+                    signature = r.to_bytes(32, "big") + s.to_bytes(32, "big")
+                case ED25519_Key.Mechanism:
+                    signature = ed25519_key_pair["private_key"].sign(request.Data)
+                case _:
+                    raise Exception("Unsupported Mechanism")
+
+            return server_pb2.SignSingleResponse(Signature=signature)
+
+        def SignInit(
+            self, request: server_pb2.SignInitRequest, timeout=None, compression=None
+        ):
+            if request.Mech.Mechanism != SECP256K1_Key.StreamMechanism:
+                raise Exception("Unsupported Mechanism")
+            state = uuid.uuid4().bytes
+            sessions[state] = hashlib.sha256()
+            return server_pb2.SignInitResponse(State=state)
+
+        def SignUpdate(
+            self, request: server_pb2.SignUpdateRequest, timeout=None, compression=None
+        ):
+            sessions[request.State].update(request.Data)
+            return server_pb2.SignUpdateResponse(State=request.State)
+
+        def SignFinal(
+            self, request: server_pb2.SignFinalRequest, timeout=None, compression=None
+        ):
+            digest = sessions.pop(request.State).digest()
+            der_signature = secp256k1_key_pair["private_key"].sign(
+                digest, ec.ECDSA(Prehashed(hashes.SHA256()))
+            )
+            r, s = decode_dss_signature(der_signature)
+            signature = r.to_bytes(32, "big") + s.to_bytes(32, "big")
+            return server_pb2.SignFinalResponse(Signature=signature)
+
+        def VerifySingle(
+            self,
+            request: server_pb2.VerifySingleRequest,
+            timeout=None,
+            compression=None,
+        ):
+            match request.Mech.Mechanism:
+                case SECP256K1_Key.Mechanism:
+                    digest = request.Data[:32].rjust(32, b"\x00")
+                    r = int.from_bytes(request.Signature[:32], "big")
+                    s = int.from_bytes(request.Signature[32:], "big")
+                    secp256k1_key_pair["public_key"].verify(
+                        encode_dss_signature(r, s),
+                        digest,
+                        ec.ECDSA(Prehashed(hashes.SHA256())),
+                    )
+                case ED25519_Key.Mechanism:
+                    ed25519_key_pair["public_key"].verify(
+                        request.Signature, request.Data
+                    )
+                case _:
+                    raise Exception("Unsupported Mechanism")
+
+            return server_pb2.VerifySingleResponse()
+
+        def GenerateKey(
+            self, request: server_pb2.GenerateKeyRequest, timeout=None, compression=None
+        ):
+            seed = b"seed:" + uuid.uuid4().bytes
+            return server_pb2.GenerateKeyResponse(KeyBytes=seed)
+
+        def DeriveKey(
+            self, request: server_pb2.DeriveKeyRequest, timeout=None, compression=None
+        ):
+            self.derive_requests.append(request)
+            parameter = request.Mech.BTCDeriveParameter
+
+            match parameter.Type:
+                case btc_derive.CkBIP0032PRV2PUB:
+                    public_key = secp256k1_key_pair["public_key"]
+                case btc_derive.CkSLIP0010PRV2PUB:
+                    public_key = ed25519_key_pair["public_key"]
+                case _:
+                    # Deterministic child blob and chain code
+                    digest = hashlib.sha256(
+                        request.BaseKey.KeyBlobs[0]
+                        + parameter.ChainCode
+                        + parameter.ChildKeyIndex.to_bytes(4, "big")
+                    ).digest()
+                    return server_pb2.DeriveKeyResponse(
+                        NewKeyBytes=b"derived:" + digest,
+                        CheckSum=hashlib.sha256(digest).digest(),
+                    )
+
+            spki_bytes = public_key.public_bytes(
+                encoding=serialization.Encoding.DER,
+                format=serialization.PublicFormat.SubjectPublicKeyInfo,
+            )
+            return server_pb2.DeriveKeyResponse(NewKeyBytes=spki_bytes)
+
+        def RewrapKeyBlob(
+            self,
+            request: server_pb2.RewrapKeyBlobRequest,
+            timeout=None,
+            compression=None,
+        ):
+            return server_pb2.RewrapKeyBlobResponse(
+                RewrappedKeyBytes=b"rewrapped:" + request.WrappedKeyBytes
+            )
+
+        def GetMechanismList(self, _, timeout=None, compression=None):
             return server_pb2.GetMechanismListResponse(
                 Mechs=[
                     pkcs11.Mechanism.ECDSA,
@@ -174,6 +316,25 @@ def grpc_stub_mock(secp256k1_key_pair, ed25519_key_pair):
     return MockCryptoStub
 
 
+@pytest.fixture
+def grpc_aio_stub_mock(grpc_stub_mock):
+    # Wrap the synchronous mock so every RPC is awaitable, like grpc.aio stubs
+    class MockAsyncCryptoStub:
+        def __init__(self, channel=None):
+            self._stub = grpc_stub_mock(channel)
+
+        def __getattr__(self, name):
+            method = getattr(self._stub, name)
+
+            async def _call(request, **kwargs):
+                await asyncio.sleep(0)
+                return method(request, **kwargs)
+
+            return _call
+
+    return MockAsyncCryptoStub
+
+
 @pytest.fixture(autouse=True)
 def _env(set_grep11_certs, monkeypatch, tmp_path):
     monkeypatch.setenv("APP__NAME", "test-app")
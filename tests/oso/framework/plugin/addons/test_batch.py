@@ -0,0 +1,69 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from oso.framework.plugin.addons.signing_server._batch import MicroBatcher
+
+
+def _echo(batches):
+    def _handler(batch):
+        batches.append([item for item, _ in batch])
+        for item, future in batch:
+            future.set_result(item * 2)
+
+    return _handler
+
+
+def test_micro_batcher():
+    batches = []
+    batcher = MicroBatcher(_echo(batches), window=0.2, max_size=100)
+
+    with ThreadPoolExecutor(max_workers=10) as executor:
+        results = list(executor.map(lambda i: batcher.submit(i).result(), range(10)))
+    batcher.close()
+
+    assert results == [i * 2 for i in range(10)]
+    assert sorted(item for batch in batches for item in batch) == list(range(10))
+    assert len(batches) < 10
+
+
+def test_micro_batcher_max_size():
+    batches = []
+    batcher = MicroBatcher(_echo(batches), window=60, max_size=3)
+
+    futures = [batcher.submit(i) for i in range(6)]
+
+    assert [future.result(timeout=5) for future in futures] == [0, 2, 4, 6, 8, 10]
+    assert batches == [[0, 1, 2], [3, 4, 5]]
+    batcher.close()
+
+
+def test_micro_batcher_handler_error():
+    def _handler(batch):
+        raise RuntimeError("keystore locked")
+
+    batcher = MicroBatcher(_handler, window=0.01, max_size=10)
+
+    with pytest.raises(RuntimeError, match="keystore locked"):
+        batcher.submit(1).result(timeout=5)
+    batcher.close()
+
+
+def test_micro_batcher_close():
+    handled = threading.Event()
+
+    def _handler(batch):
+        handled.set()
+        for _, future in batch:
+            future.set_result(None)
+
+    batcher = MicroBatcher(_handler, window=60, max_size=10)
+    future = batcher.submit(1)
+    batcher.close()
+
+    # Items already submitted are handled on close
+    assert handled.is_set()
+    assert future.result(timeout=0) is None
+    with pytest.raises(RuntimeError):
+        batcher.submit(2)
@@ -0,0 +1,63 @@
+import grpc
+
+from oso.framework.plugin.addons.signing_server._channel_pool import ChannelPool
+
+
+def _pool(**kwargs) -> ChannelPool:
+    return ChannelPool(
+        endpoint="localhost:9876",
+        credentials=grpc.ssl_channel_credentials(),
+        **kwargs,
+    )
+
+
+def test_round_robin():
+    pool = _pool(size=3)
+
+    stubs = []
+    for _ in range(6):
+        with pool.stub() as stub:
+            stubs.append(stub)
+
+    assert len(set(map(id, stubs))) == 3
+    assert stubs[:3] == stubs[3:]
+    assert pool.in_flight == [0, 0, 0]
+    pool.close()
+
+
+def test_least_loaded():
+    pool = _pool(size=3, strategy="least_loaded")
+
+    with pool.stub() as first, pool.stub() as second, pool.stub() as third:
+        assert len({id(first), id(second), id(third)}) == 3
+        assert pool.in_flight == [1, 1, 1]
+
+    with pool.stub() as first:
+        with pool.stub() as second:
+            assert first is not second
+    pool.close()
+
+
+def test_reconnect_transient_failure():
+    pool = _pool(size=2, reconnect_interval=0)
+    failing = pool._channels[0]
+    old_channel = failing.channel
+
+    failing._on_state_change(grpc.ChannelConnectivity.TRANSIENT_FAILURE)
+
+    with pool.stub():
+        pass
+
+    assert failing.channel is not old_channel
+    assert not failing.failing
+    pool.close()
+
+
+def test_skip_failing_channel():
+    pool = _pool(size=2, reconnect_interval=60)
+    pool._channels[0]._on_state_change(grpc.ChannelConnectivity.TRANSIENT_FAILURE)
+
+    for _ in range(4):
+        with pool.stub() as stub:
+            assert stub is pool._channels[1].stub
+    pool.close()
@@ -0,0 +1,79 @@
+import time
+
+from oso.framework.plugin.addons.signing_server._circuit_breaker import CircuitBreaker
+
+
+def _breaker(**kwargs) -> CircuitBreaker:
+    settings = {
+        "failure_rate": 0.5,
+        "window": 4,
+        "min_calls": 4,
+        "open_duration": 60,
+        "half_open_calls": 2,
+    } | kwargs
+    return CircuitBreaker(**settings)
+
+
+def _call(breaker: CircuitBreaker, success: bool | None, duration: float = 0.0) -> bool:
+    if not breaker.acquire():
+        return False
+    breaker.record(success, duration)
+    return True
+
+
+def test_opens_on_failure_rate():
+    breaker = _breaker()
+
+    for success in (True, False, True):
+        assert _call(breaker, success)
+    assert breaker.state == "closed"
+
+    assert _call(breaker, False)
+    assert breaker.state == "open"
+    assert not breaker.available()
+    assert not _call(breaker, True)
+
+
+def test_ignores_neutral_outcomes():
+    breaker = _breaker()
+
+    for _ in range(10):
+        assert _call(breaker, None)
+
+    assert breaker.state == "closed"
+
+
+def test_slow_calls_count_as_failures():
+    breaker = _breaker(slow_call_duration=1.0)
+
+    for _ in range(4):
+        assert _call(breaker, True, duration=2.0)
+
+    assert breaker.state == "open"
+
+
+def test_half_open():
+    breaker = _breaker(open_duration=0.01)
+    for _ in range(4):
+        _call(breaker, False)
+    assert breaker.state == "open"
+
+    time.sleep(0.02)
+    assert breaker.state == "half_open"
+    assert breaker.acquire() and breaker.acquire()
+    # Only the configured number of trial calls is let through
+    assert not breaker.acquire()
+    breaker.record(True)
+    breaker.record(True)
+    assert breaker.state == "closed"
+
+
+def test_half_open_failure_reopens():
+    breaker = _breaker(open_duration=0.01)
+    for _ in range(4):
+        _call(breaker, False)
+    time.sleep(0.02)
+
+    assert _call(breaker, False)
+
+    assert breaker.state == "open"
@@ -0,0 +1,130 @@
+import collections
+
+import grpc
+import pytest
+
+from oso.framework.plugin.addons.signing_server._channel_pool import ChannelPool
+from oso.framework.plugin.addons.signing_server._circuit_breaker import (
+    CircuitBreaker,
+    CircuitOpenError,
+)
+from oso.framework.plugin.addons.signing_server._endpoint_router import EndpointRouter
+
+
+class _Unavailable(grpc.RpcError):
+    def code(self):
+        return grpc.StatusCode.UNAVAILABLE
+
+    def details(self):
+        return "connection refused"
+
+
+def _router(n: int = 2, **kwargs) -> EndpointRouter:
+    return EndpointRouter(
+        pools=[
+            ChannelPool(
+                endpoint=f"endpoint-{i}:9876",
+                credentials=grpc.ssl_channel_credentials(),
+            )
+            for i in range(n)
+        ],
+        **kwargs,
+    )
+
+
+def _endpoint_of(router: EndpointRouter, stub) -> str:
+    for pool in router.pools:
+        if any(channel.stub is stub for channel in pool._channels):
+            return pool.endpoint
+    raise AssertionError("Unknown stub")
+
+
+def test_least_outstanding():
+    router = _router(3)
+
+    with router.stub() as first, router.stub() as second, router.stub() as third:
+        endpoints = {_endpoint_of(router, stub) for stub in (first, second, third)}
+        assert len(endpoints) == 3
+    router.close()
+
+
+def test_weighted_round_robin():
+    router = _router(2, strategy="weighted_round_robin", weights=[3, 1])
+
+    picks = collections.Counter()
+    for _ in range(8):
+        with router.stub() as stub:
+            picks[_endpoint_of(router, stub)] += 1
+
+    assert picks == {"endpoint-0:9876": 6, "endpoint-1:9876": 2}
+    router.close()
+
+
+def test_unavailable_endpoint_is_skipped():
+    router = _router(2)
+
+    with pytest.raises(_Unavailable):
+        with router.stub():
+            raise _Unavailable()
+
+    assert router.status() == {
+        "endpoint-0:9876": "unhealthy",
+        "endpoint-1:9876": "healthy",
+    }
+    for _ in range(4):
+        with router.stub() as stub:
+            assert _endpoint_of(router, stub) == "endpoint-1:9876"
+
+    # A successful probe brings the endpoint back
+    results = router.probe(lambda stub: "ok")
+    assert results == {"endpoint-0:9876": "ok", "endpoint-1:9876": "ok"}
+    assert router.healthy_endpoints() == {"endpoint-0:9876", "endpoint-1:9876"}
+    router.close()
+
+
+def test_all_endpoints_unhealthy():
+    router = _router(2)
+
+    def _fail(stub):
+        raise RuntimeError("down")
+
+    results = router.probe(_fail)
+
+    assert all(isinstance(result, RuntimeError) for result in results.values())
+    assert router.healthy_endpoints() == set()
+    # Calls are still routed rather than failing without trying
+    with router.stub() as stub:
+        assert stub is not None
+    router.close()
+
+
+def test_unavailable_single_endpoint_recovers_on_success():
+    router = _router(1)
+
+    with pytest.raises(_Unavailable):
+        with router.stub():
+            raise _Unavailable()
+    assert router.status() == {"endpoint-0:9876": "unhealthy"}
+
+    # No probe runs for a single endpoint, the next successful call is enough
+    with router.stub():
+        pass
+    assert router.status() == {"endpoint-0:9876": "healthy"}
+    router.close()
+
+
+def test_endpoint_without_trial_slots_is_skipped(mocker):
+    router = _router(2, circuit_breaker=CircuitBreaker)
+    first, second = router._endpoints
+
+    # Half-open with its trial calls taken by concurrent calls meanwhile
+    mocker.patch.object(first.breaker, "acquire", return_value=False)
+    for _ in range(3):
+        with router.stub() as stub:
+            assert _endpoint_of(router, stub) == "endpoint-1:9876"
+
+    mocker.patch.object(second.breaker, "acquire", return_value=False)
+    with pytest.raises(CircuitOpenError):
+        with router.stub():
+            pass
+    router.close()
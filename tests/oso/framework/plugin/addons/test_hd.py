@@ -0,0 +1,99 @@
+import pytest
+
+from oso.framework.plugin.addons.signing_server._hd import (
+    HARDENED,
+    HDKeyDeriver,
+    HDNode,
+    derived_key_id,
+    format_path,
+    parse_path,
+    split_key_id,
+)
+from oso.framework.plugin.addons.signing_server._key import KeyType
+
+
+def test_parse_path():
+    assert parse_path("m/44'/60'/0'/0/7") == (
+        44 + HARDENED,
+        60 + HARDENED,
+        HARDENED,
+        0,
+        7,
+    )
+    assert parse_path("0h/1") == parse_path("m/0'/1")
+    assert format_path(parse_path("m/44h/0H/3")) == "44'/0'/3"
+    assert split_key_id("parent/1/2'") == ("parent", (1, 2 + HARDENED))
+    assert split_key_id("parent") is None
+    assert derived_key_id("parent", (1, 2 + HARDENED)) == "parent/1/2'"
+
+    for path in ["m", "", "m/", "1//2", "-1", "x", "2147483648", "1''"]:
+        with pytest.raises(ValueError):
+            parse_path(path)
+
+
+@pytest.fixture
+def derivations():
+    return []
+
+
+@pytest.fixture
+def deriver(derivations):
+    parents = {"parent": HDNode(KeyType.SECP256K1, b"m", b"c")}
+
+    def _derive(node: HDNode, index: int) -> HDNode:
+        derivations.append(("private", node.private_key, index))
+        return HDNode(node.key_type, node.private_key + b"/%d" % index, b"c")
+
+    def _derive_public(node: HDNode, index: int) -> bytes:
+        derivations.append(("public", node.private_key, index))
+        return b"pub:" + node.private_key + b"/%d" % index
+
+    return HDKeyDeriver(parents.get, _derive, _derive_public, cache_size=16)
+
+
+def test_derive(deriver, derivations):
+    key_type, key_pair = deriver.key_pair("parent", (0, 1))
+
+    assert key_type == KeyType.SECP256K1
+    assert key_pair.PrivateKey == b"m/0/1"
+    assert key_pair.PublicKey == b"pub:m/0/1"
+    assert derivations == [
+        ("private", b"m", 0),
+        ("private", b"m/0", 1),
+        ("public", b"m/0", 1),
+    ]
+
+    # Cached key, then a sibling derived from the cached intermediate node
+    derivations.clear()
+    deriver.key_pair("parent", (0, 1))
+    assert derivations == []
+    assert deriver.key_pair("parent", (0, 2))[1].PrivateKey == b"m/0/2"
+    assert derivations == [("private", b"m/0", 2), ("public", b"m/0", 2)]
+
+    # Intermediate nodes only need their public key derived
+    derivations.clear()
+    assert deriver.key_pair("parent", (0,))[1].PublicKey == b"pub:m/0"
+    assert derivations == [("public", b"m", 0)]
+
+    deriver.clear()
+    derivations.clear()
+    deriver.key_pair("parent", (0, 1))
+    assert len(derivations) == 3
+
+
+def test_unknown_parent(deriver):
+    assert deriver.key_pair("unknown", (0,)) is None
+
+
+def test_ed25519_hardened_only(derivations):
+    parents = {"parent": HDNode(KeyType.ED25519, b"m", b"c")}
+    deriver = HDKeyDeriver(
+        parents.get,
+        lambda node, index: HDNode(node.key_type, b"child", b"c"),
+        lambda node, index: b"pub",
+        cache_size=16,
+    )
+
+    assert deriver.key_pair("parent", (HARDENED,)) is not None
+    with pytest.raises(ValueError, match="hardened"):
+        deriver.key_pair("parent", (HARDENED, 1))
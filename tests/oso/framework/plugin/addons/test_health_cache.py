@@ -0,0 +1,64 @@
+import time
+
+from oso.framework.data.types import V1_3
+from oso.framework.plugin.addons.signing_server._health_cache import HealthCache
+
+OK = V1_3.ComponentStatus(status_code=200, status="OK", errors=[])
+
+
+def test_pending():
+    cache = HealthCache(check=lambda: OK, ttl=10)
+
+    status = cache.get()
+
+    assert status.status_code == 503
+    assert status.errors[0].message == "GREP11 health check pending"
+
+
+def test_refresh():
+    calls = []
+    cache = HealthCache(check=lambda: calls.append(1) or OK, ttl=10)
+
+    cache.refresh()
+
+    assert cache.get() is OK
+    assert cache.get() is OK
+    assert len(calls) == 1
+
+
+def test_refresh_error():
+    def _check():
+        raise RuntimeError("connection refused")
+
+    cache = HealthCache(check=_check, ttl=10)
+    cache.refresh()
+
+    status = cache.get()
+    assert status.status_code == 503
+    assert "connection refused" in status.errors[0].message
+
+
+def test_stale():
+    cache = HealthCache(check=lambda: OK, ttl=0.05)
+    cache.refresh()
+
+    time.sleep(0.1)
+
+    status = cache.get()
+    assert status.status_code == 503
+    assert "not answered" in status.errors[0].message
+
+
+def test_background_refresh():
+    failing = V1_3.ComponentStatus(status_code=500, status="Internal Server Error")
+    cache = HealthCache(check=lambda: failing, ttl=0.1)
+
+    cache.start(OK)
+    try:
+        assert cache.get() is OK
+        deadline = time.monotonic() + 5
+        while cache.get() is not failing and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert cache.get() is failing
+    finally:
+        cache.stop()
@@ -0,0 +1,122 @@
+import itertools
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError
+
+import pytest
+
+from oso.framework.plugin.addons.signing_server._hedging import Hedger
+
+
+def _hedger(**kwargs) -> Hedger:
+    settings = {
+        "percentile": 90,
+        "min_delay": 0.0,
+        "initial_delay": 0.05,
+        "min_samples": 10,
+    } | kwargs
+    return Hedger(**settings)
+
+
+def _start(fn):
+    """Run ``fn`` in the background, like a call started as a grpc future."""
+    future = Future()
+
+    def _run():
+        try:
+            result = fn()
+        except Exception as e:
+            result, error = None, e
+        else:
+            error = None
+        try:
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
+        except InvalidStateError:
+            pass  # Cancelled meanwhile
+
+    threading.Thread(target=_run, daemon=True).start()
+    return future
+
+
+def test_fast_call_is_not_hedged():
+    hedger = _hedger()
+    threads = []
+
+    def _attempt():
+        future = Future()
+        # Started from the calling thread
+        threads.append(threading.current_thread())
+        future.set_result("signature")
+        return future
+
+    assert hedger.call("SignSingle", _attempt) == "signature"
+
+    assert threads == [threading.current_thread()]
+    assert hedger.stats()["SignSingle"]["issued"] == 0
+
+
+def test_slow_call_is_hedged():
+    hedger = _hedger(initial_delay=0.01)
+    attempts = itertools.count()
+    release = threading.Event()
+    futures = []
+
+    def _attempt():
+        if next(attempts) == 0:
+            futures.append(_start(lambda: release.wait(5) and "primary"))
+        else:
+            futures.append(_start(lambda: "hedge"))
+        return futures[-1]
+
+    assert hedger.call("SignSingle", _attempt) == "hedge"
+    release.set()
+
+    stats = hedger.stats()["SignSingle"]
+    assert stats["issued"] == 1
+    assert stats["won"] == 1
+    # The losing attempt is cancelled
+    assert futures[0].cancelled()
+
+
+def test_failed_attempts():
+    hedger = _hedger(initial_delay=0.0)
+
+    def _fail():
+        time.sleep(0.01)
+        raise RuntimeError("unavailable")
+
+    with pytest.raises(RuntimeError, match="unavailable"):
+        hedger.call("SignSingle", lambda: _start(_fail))
+    assert hedger.stats()["SignSingle"] == {"issued": 1, "won": 0, "delay": 0.0}
+
+
+def test_attempt_latency_excludes_hedge_delay():
+    hedger = _hedger(initial_delay=0.05)
+    attempts = itertools.count()
+
+    def _attempt():
+        if next(attempts) == 0:
+            return _start(lambda: time.sleep(1) or "primary")
+        return _start(lambda: "hedge")
+
+    assert hedger.call("SignSingle", _attempt) == "hedge"
+
+    # Only the hedge completed, its latency is measured from its own start
+    latencies = list(hedger._stats["SignSingle"].latencies)
+    assert len(latencies) == 1
+    assert latencies[0] < 0.05
+
+
+def test_percentile_delay():
+    hedger = _hedger(min_delay=0.002)
+    assert hedger.delay("VerifySingle") == 0.05
+
+    for latency in range(1, 11):
+        hedger._record("VerifySingle", latency / 1000)
+
+    assert hedger.delay("VerifySingle") == 0.010
+    hedger.min_delay = 0.5
+    assert hedger.delay("VerifySingle") == 0.5
@@ -0,0 +1,49 @@
+from oso.framework.plugin.addons.signing_server._key import KeyPair, KeyType
+from oso.framework.plugin.addons.signing_server._key_cache import KeyCache
+
+
+def _entry(i: int) -> tuple[KeyType, KeyPair]:
+    return KeyType.SECP256K1, KeyPair(PrivateKey=bytes([i]), PublicKey=bytes([i]))
+
+
+def test_lru_eviction():
+    cache = KeyCache(max_size=2)
+    cache.put("a", _entry(1))
+    cache.put("b", _entry(2))
+
+    assert cache.get("a") == _entry(1)
+
+    cache.put("c", _entry(3))
+
+    assert cache.get("b") is None
+    assert cache.get("a") == _entry(1)
+    assert cache.get("c") == _entry(3)
+    assert cache.stats() == {
+        "size": 2,
+        "max_size": 2,
+        "hits": 3,
+        "misses": 1,
+        "evictions": 1,
+    }
+
+
+def test_invalidate_and_clear():
+    cache = KeyCache(max_size=4)
+    cache.put("a", _entry(1))
+    cache.put("b", _entry(2))
+
+    cache.invalidate("a")
+    assert cache.get("a") is None
+    assert len(cache) == 1
+
+    cache.clear()
+    assert cache.get("b") is None
+    assert len(cache) == 0
+
+
+def test_disabled():
+    cache = KeyCache(max_size=0)
+    cache.put("a", _entry(1))
+
+    assert cache.get("a") is None
+    assert len(cache) == 0
@@ -0,0 +1,336 @@
+import gc
+import sqlite3
+import subprocess
+import sys
+import threading
+import uuid
+
+import pytest
+
+from oso.framework.plugin.addons.signing_server._keystore import (
+    SCHEMA_VERSION,
+    Keystore,
+    decode_key_id,
+    encode_key_id,
+)
+
+
+def _create_v1(db_file, rows):
+    conn = sqlite3.connect(str(db_file))
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS keys (
+            id TEXT PRIMARY KEY,
+            key_type TEXT NOT NULL,
+            private_key TEXT NOT NULL,
+            public_key TEXT NOT NULL
+        )
+    """)
+    conn.executemany(
+        "INSERT INTO keys (id, key_type, private_key, public_key) VALUES (?, ?, ?, ?)",
+        [
+            (key_id, key_type, priv.hex(), pub.hex())
+            for key_id, key_type, priv, pub in rows
+        ],
+    )
+    conn.commit()
+    conn.close()
+
+
+def test_key_id_encoding():
+    key_id = str(uuid.uuid4())
+    assert len(encode_key_id(key_id)) == 17
+    assert decode_key_id(encode_key_id(key_id)) == key_id
+    assert decode_key_id(encode_key_id("legacy-key")) == "legacy-key"
+
+
+def test_key_id_encoding_16_byte_legacy_id(tmp_path):
+    # Exactly as long as the raw bytes of a UUID
+    key_id = "legacy-key-00001"
+    assert decode_key_id(encode_key_id(key_id)) == key_id
+
+    keystore = Keystore(tmp_path / "keystore.db")
+    keystore.insert_many([(key_id, "SECP256K1", b"\x01", b"\x02")])
+    assert keystore.list_ids("SECP256K1") == [key_id]
+    assert keystore.exists(key_id)
+
+
+def test_key_id_encoding_uppercase_uuid(tmp_path):
+    key_id = str(uuid.uuid4()).upper()
+    assert decode_key_id(encode_key_id(key_id)) == key_id
+
+    keystore = Keystore(tmp_path / "keystore.db")
+    keystore.insert_many([(key_id, "SECP256K1", b"\x01", b"\x02")])
+    assert keystore.list_ids("SECP256K1") == [key_id]
+    assert keystore.get(key_id) == ("SECP256K1", b"\x01", b"\x02")
+    assert not keystore.exists(key_id.lower())
+
+
+def test_new_keystore(tmp_path):
+    keystore = Keystore(tmp_path / "keystore.db")
+    key_id = str(uuid.uuid4())
+
+    keystore.insert_many([(key_id, "SECP256K1", b"\x01\x02", b"\x03\x04")])
+
+    assert keystore.get(key_id) == ("SECP256K1", b"\x01\x02", b"\x03\x04")
+    assert keystore.exists(key_id)
+    assert keystore.list_ids("SECP256K1") == [key_id]
+    assert keystore.count() == 1
+    assert keystore.count("ED25519") == 0
+
+
+def test_migrate_v1(tmp_path):
+    db_file = tmp_path / "keystore.db"
+    rows = [
+        (
+            str(uuid.uuid4()),
+            "SECP256K1" if i % 2 else "ED25519",
+            bytes([i] * 8),
+            bytes([i] * 4),
+        )
+        for i in range(25)
+    ]
+    rows.append(("legacy-key", "ED25519", b"\xff" * 8, b"\xee" * 4))
+    _create_v1(db_file, rows)
+
+    keystore = Keystore(db_file, migration_batch_size=7)
+
+    for key_id, key_type, priv, pub in rows:
+        assert keystore.get(key_id) == (key_type, priv, pub)
+    assert keystore.count() == len(rows)
+
+    conn = sqlite3.connect(str(db_file))
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+    columns = {row[1]: row[2] for row in conn.execute("PRAGMA table_info(keys)")}
+    assert columns["id"] == "BLOB"
+    assert columns["private_key"] == "BLOB"
+    table_sql = conn.execute(
+        "SELECT sql FROM sqlite_master WHERE name = 'keys'"
+    ).fetchone()[0]
+    assert "WITHOUT ROWID" in table_sql
+    conn.close()
+
+    # Reopening a migrated keystore is a no-op
+    assert Keystore(db_file).count() == len(rows)
+
+
+_KILL_MIGRATION = """
+import os
+import sys
+from pathlib import Path
+
+from oso.framework.plugin.addons.signing_server._keystore import Keystore
+
+_connection = Keystore._connection
+
+
+def _killing_connection(self):
+    conn = _connection(self)
+    conn.set_trace_callback(
+        lambda sql: os._exit(3) if sys.argv[2] in sql else None
+    )
+    return conn
+
+
+Keystore._connection = _killing_connection
+Keystore(Path(sys.argv[1]), migration_batch_size=7)
+"""
+
+
+@pytest.mark.parametrize(
+    "statement",
+    ["INSERT OR IGNORE INTO keys_v2", "DROP TABLE keys", "ALTER TABLE keys_v2"],
+)
+def test_migrate_v1_killed(tmp_path, statement):
+    db_file = tmp_path / "keystore.db"
+    rows = [
+        (str(uuid.uuid4()), "SECP256K1", bytes([i] * 8), bytes([i] * 4))
+        for i in range(25)
+    ]
+    _create_v1(db_file, rows)
+
+    proc = subprocess.run(
+        [sys.executable, "-c", _KILL_MIGRATION, str(db_file), statement]
+    )
+    assert proc.returncode == 3
+
+    # The next start migrates from the untouched v1 table
+    keystore = Keystore(db_file, migration_batch_size=7)
+    for key_id, key_type, priv, pub in rows:
+        assert keystore.get(key_id) == (key_type, priv, pub)
+    assert keystore.count() == len(rows)
+
+
+def test_migrate_v1_concurrent_open(tmp_path):
+    db_file = tmp_path / "keystore.db"
+    rows = [
+        (str(uuid.uuid4()), "SECP256K1", bytes([i] * 8), bytes([i] * 4))
+        for i in range(100)
+    ]
+    _create_v1(db_file, rows)
+    errors = []
+    counts = []
+
+    def _open():
+        try:
+            counts.append(Keystore(db_file, migration_batch_size=7).count())
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=_open) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert not errors
+    assert counts == [len(rows)] * 4
+
+
+def test_wal_mode(tmp_path):
+    db_file = tmp_path / "keystore.db"
+    Keystore(db_file, synchronous="FULL", mmap_size=1 << 20)
+
+    conn = sqlite3.connect(str(db_file))
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    conn.close()
+
+
+def test_concurrent_access(tmp_path):
+    keystore = Keystore(tmp_path / "keystore.db")
+    threads_count, keys_per_thread = 16, 50
+    errors = []
+    written: dict[int, list[str]] = {}
+
+    def _worker(n: int):
+        try:
+            ids = []
+            for i in range(keys_per_thread):
+                key_id = str(uuid.uuid4())
+                keystore.insert_many(
+                    [(key_id, "SECP256K1", bytes([n, i]), bytes([i, n]))]
+                )
+                ids.append(key_id)
+                # Readers see their own writes and every committed key
+                assert keystore.get(key_id) == (
+                    "SECP256K1",
+                    bytes([n, i]),
+                    bytes([i, n]),
+                )
+                assert keystore.count() >= len(ids)
+            written[n] = ids
+        except Exception as e:  # pragma: no cover
+            errors.append(e)
+
+    threads = [
+        threading.Thread(target=_worker, args=(n,)) for n in range(threads_count)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert keystore.count() == threads_count * keys_per_thread
+    assert sorted(keystore.list_ids("SECP256K1")) == sorted(
+        key_id for ids in written.values() for key_id in ids
+    )
+    keystore.close()
+
+
+def test_thread_connections_released(tmp_path):
+    keystore = Keystore(tmp_path / "keystore.db")
+
+    def _worker():
+        keystore.count()
+
+    for _ in range(50):
+        thread = threading.Thread(target=_worker)
+        thread.start()
+        thread.join()
+    gc.collect()
+
+    # Only the connection of the main thread is left open
+    assert len(keystore._connections) == 1
+    assert keystore.count() == 0
+    keystore.close()
+    assert len(keystore._connections) == 0
+
+
+def test_stored_pem(tmp_path):
+    from oso.framework.plugin.addons.signing_server._key import public_key_to_pem
+
+    keystore = Keystore(tmp_path / "keystore.db")
+    key_ids = [str(uuid.uuid4()) for _ in range(3)]
+    keystore.insert_many(
+        (key_id, "ED25519", b"\x01", bytes([i]) * 44)
+        for i, key_id in enumerate(key_ids)
+    )
+
+    # Keys stored without a PEM are backfilled on read
+    keystore._connection().execute(
+        "UPDATE keys SET public_key_pem = NULL WHERE id = ?",
+        (encode_key_id(key_ids[1]),),
+    )
+    keystore._connection().commit()
+
+    pems = keystore.get_pems([key_ids[2], "unknown-key", key_ids[1], key_ids[0]])
+    assert pems == [
+        public_key_to_pem(bytes([2]) * 44),
+        None,
+        public_key_to_pem(bytes([1]) * 44),
+        public_key_to_pem(bytes([0]) * 44),
+    ]
+    stored = keystore._connection().execute(
+        "SELECT public_key_pem FROM keys WHERE id = ?", (encode_key_id(key_ids[1]),)
+    ).fetchone()[0]
+    assert stored == pems[2]
+
+
+def test_get_many(tmp_path):
+    keystore = Keystore(tmp_path / "keystore.db")
+    key_ids = [str(uuid.uuid4()) for _ in range(600)]
+    keystore.insert_many(
+        (key_id, "ED25519", bytes([i % 256]), b"\x02")
+        for i, key_id in enumerate(key_ids)
+    )
+
+    rows = keystore.get_many([key_ids[599], "unknown-key", *key_ids[:550]])
+
+    assert rows[0] == ("ED25519", bytes([599 % 256]), b"\x02")
+    assert rows[1] is None
+    assert rows[2:] == [keystore.get(key_id) for key_id in key_ids[:550]]
+    keystore.close()
+
+
+def test_rewrap_checkpoint(tmp_path):
+    keystore = Keystore(tmp_path / "keystore.db")
+    key_ids = [str(uuid.uuid4()) for _ in range(5)]
+    keystore.insert_many((key_id, "ED25519", b"old", b"\x02") for key_id in key_ids)
+
+    first = keystore.private_keys_after("keys", None, 3)
+    rest = keystore.private_keys_after("keys", first[-1][0], 3)
+    assert keystore.size("keys") == 5
+    assert keystore.size("key_pool") == 0
+    assert len(first) == 3 and len(rest) == 2
+    assert sorted(raw_id for raw_id, _ in first + rest) == [
+        raw_id for raw_id, _ in first + rest
+    ]
+
+    keystore.save_rewrapped(
+        "rotation",
+        "keys",
+        [(raw_id, b"new") for raw_id, _ in first],
+        first[-1][0],
+        3,
+        0,
+    )
+
+    assert keystore.rewrap_checkpoint("rotation", "keys") == (first[-1][0], 3, 0)
+    assert keystore.rewrap_checkpoint("rotation", "key_pool") is None
+    assert sorted(keystore.get(key_id)[1] for key_id in key_ids) == [b"new"] * 3 + [
+        b"old"
+    ] * 2
+
+    keystore.clear_rewrap_checkpoint("rotation")
+    assert keystore.rewrap_checkpoint("rotation", "keys") is None
+    keystore.close()
@@ -0,0 +1,126 @@
+import asyncio
+import threading
+import time
+
+import grpc
+import pytest
+
+from oso.framework.plugin.addons.signing_server._limiter import AdaptiveLimiter
+
+
+class _ResourceExhausted(grpc.RpcError):
+    def code(self):
+        return grpc.StatusCode.RESOURCE_EXHAUSTED
+
+
+def test_bounds_in_flight_calls():
+    limiter = AdaptiveLimiter(initial_limit=2)
+    entered = threading.Semaphore(0)
+    release = threading.Event()
+
+    def _call():
+        with limiter.slot(sample=False):
+            entered.release()
+            release.wait(5)
+
+    threads = [threading.Thread(target=_call) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    entered.acquire()
+    entered.acquire()
+    while limiter.stats()["queued"] != 1:
+        time.sleep(0.001)
+
+    assert limiter.stats() == {"limit": 2, "in_flight": 2, "queued": 1}
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert limiter.stats() == {"limit": 2, "in_flight": 0, "queued": 0}
+
+
+def test_async_slots():
+    limiter = AdaptiveLimiter(initial_limit=2)
+
+    async def _run():
+        release = asyncio.Event()
+
+        async def _call():
+            async with limiter.slot_async(sample=False):
+                await release.wait()
+
+        tasks = [asyncio.create_task(_call()) for _ in range(3)]
+        while limiter.stats()["queued"] != 1:
+            await asyncio.sleep(0.001)
+
+        assert limiter.stats() == {"limit": 2, "in_flight": 2, "queued": 1}
+        release.set()
+        await asyncio.gather(*tasks)
+
+    asyncio.run(_run())
+    assert limiter.stats() == {"limit": 2, "in_flight": 0, "queued": 0}
+
+
+def test_async_slot_released_by_thread():
+    limiter = AdaptiveLimiter(initial_limit=1)
+    entered = threading.Event()
+    release = threading.Event()
+
+    def _hold():
+        with limiter.slot(sample=False):
+            entered.set()
+            release.wait(5)
+
+    thread = threading.Thread(target=_hold)
+    thread.start()
+    entered.wait(5)
+
+    async def _run():
+        async def _call():
+            async with limiter.slot_async(sample=False):
+                return limiter.stats()["in_flight"]
+
+        task = asyncio.create_task(_call())
+        while limiter.stats()["queued"] != 1:
+            await asyncio.sleep(0.001)
+        # The slot freed by the thread wakes up the event loop
+        release.set()
+        return await asyncio.wait_for(task, 5)
+
+    assert asyncio.run(_run()) == 1
+    thread.join()
+
+
+def test_additive_increase():
+    limiter = AdaptiveLimiter(initial_limit=1, max_limit=3, tolerance=1e6)
+
+    for _ in range(20):
+        with limiter.slot():
+            pass
+
+    assert limiter.limit == 3
+
+
+def test_multiplicative_decrease():
+    limiter = AdaptiveLimiter(initial_limit=10, backoff=0.5)
+
+    with pytest.raises(_ResourceExhausted):
+        with limiter.slot():
+            raise _ResourceExhausted()
+    assert limiter.limit == 5
+
+    # Calls slower than the tolerance lower the limit too
+    limiter._latencies.append(0.001)
+    with limiter.slot():
+        time.sleep(0.01)
+    assert limiter.limit == 2
+
+
+def test_other_failures_are_not_sampled():
+    limiter = AdaptiveLimiter(initial_limit=4, backoff=0.5)
+
+    with pytest.raises(ValueError):
+        with limiter.slot():
+            raise ValueError("Invalid request")
+
+    assert limiter.limit == 4
+    assert not limiter._latencies
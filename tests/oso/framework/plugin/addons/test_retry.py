@@ -0,0 +1,71 @@
+import asyncio
+
+import grpc
+import pytest
+
+from oso.framework.plugin.addons.signing_server._retry import RetryPolicy
+
+
+class _RpcError(grpc.RpcError):
+    def __init__(self, code):
+        self._code = code
+
+    def code(self):
+        return self._code
+
+
+def _attempts(*outcomes):
+    calls = []
+
+    def _attempt():
+        outcome = outcomes[len(calls)]
+        calls.append(outcome)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    return _attempt, calls
+
+
+def test_retry_unavailable():
+    policy = RetryPolicy(initial_backoff=0)
+    attempt, calls = _attempts(_RpcError(grpc.StatusCode.UNAVAILABLE), "ok")
+
+    assert policy.call("SignSingle", attempt) == "ok"
+    assert len(calls) == 2
+
+
+def test_retry_gives_up():
+    policy = RetryPolicy(max_attempts=2, initial_backoff=0)
+    attempt, calls = _attempts(*[_RpcError(grpc.StatusCode.UNAVAILABLE)] * 2, "ok")
+
+    with pytest.raises(grpc.RpcError):
+        policy.call("SignSingle", attempt)
+    assert len(calls) == 2
+
+
+def test_retry_not_retryable():
+    policy = RetryPolicy(initial_backoff=0)
+    attempt, calls = _attempts(_RpcError(grpc.StatusCode.INVALID_ARGUMENT), "ok")
+
+    with pytest.raises(grpc.RpcError):
+        policy.call("SignSingle", attempt)
+    assert len(calls) == 1
+
+
+def test_retry_async():
+    policy = RetryPolicy(initial_backoff=0)
+    attempt, calls = _attempts(_RpcError(grpc.StatusCode.UNAVAILABLE), "ok")
+
+    async def _attempt():
+        return attempt()
+
+    assert asyncio.run(policy.call_async("SignSingle", _attempt)) == "ok"
+    assert len(calls) == 2
+
+
+def test_backoff_bounds():
+    policy = RetryPolicy(initial_backoff=0.1, max_backoff=0.3, multiplier=2.0)
+
+    for retry, bound in enumerate([0.1, 0.2, 0.3, 0.3]):
+        assert all(0 <= policy.backoff(retry) <= bound for _ in range(100))
@@ -0,0 +1,102 @@
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from oso.framework.plugin.addons.signing_server._keystore import Keystore
+from oso.framework.plugin.addons.signing_server._rewrap import KeyRewrapper
+
+
+class _Crash(Exception):
+    pass
+
+
+@pytest.fixture
+def keystore(tmp_path):
+    keystore = Keystore(tmp_path / "keystore.db")
+    keystore.insert_many(
+        (str(uuid.uuid4()), "ED25519", b"key-%d" % i, b"\x02") for i in range(25)
+    )
+    keystore.add_to_pool(
+        (str(uuid.uuid4()), "ED25519", b"pooled-%d" % i, b"\x02") for i in range(5)
+    )
+    yield keystore
+    keystore.close()
+
+
+def _blobs(keystore, table):
+    return [blob for _, blob in keystore.private_keys_after(table, None, 1000)]
+
+
+def _rewrapper(keystore, executor, rewrap, **kwargs):
+    return KeyRewrapper(
+        keystore=keystore,
+        rewrap=rewrap,
+        executor=executor,
+        max_in_flight=4,
+        batch_size=10,
+        job="rotation",
+        **kwargs,
+    )
+
+
+def test_rewrap(keystore):
+    progresses = []
+    rewrapped_ids = []
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        progress = _rewrapper(
+            keystore,
+            executor,
+            lambda blob: b"new:" + blob,
+            on_rewrapped=rewrapped_ids.extend,
+            on_progress=lambda p: progresses.append(p.done),
+        ).run()
+
+    assert (progress.total, progress.rewrapped, progress.failed) == (30, 30, 0)
+    assert progress.rate > 0
+    assert progresses == [5, 15, 25, 30]
+    assert len(rewrapped_ids) == 30
+    assert all(blob.startswith(b"new:key-") for blob in _blobs(keystore, "keys"))
+    assert all(blob.startswith(b"new:pooled-") for blob in _blobs(keystore, "key_pool"))
+    assert keystore.rewrap_checkpoint("rotation", "keys") is None
+
+
+def test_rewrap_failures(keystore):
+    def _rewrap(blob):
+        if blob in (b"key-3", b"key-17"):
+            raise RuntimeError("CKR_IBM_WK_NOT_INITIALIZED")
+        return b"new:" + blob
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        progress = _rewrapper(keystore, executor, _rewrap).run()
+
+    assert (progress.rewrapped, progress.failed) == (28, 2)
+    assert len(progress.failed_key_ids) == 2
+    blobs = _blobs(keystore, "keys")
+    assert b"key-3" in blobs and b"key-17" in blobs
+
+
+def test_rewrap_resume(keystore):
+    calls = []
+
+    def _rewrap(blob):
+        calls.append(blob)
+        return b"new:" + blob
+
+    def _crash(progress):
+        if progress.done >= 15:
+            raise _Crash()
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        with pytest.raises(_Crash):
+            _rewrapper(keystore, executor, _rewrap, on_progress=_crash).run()
+        assert keystore.rewrap_checkpoint("rotation", "keys")[1:] == (10, 0)
+
+        calls.clear()
+        progress = _rewrapper(keystore, executor, _rewrap).run()
+
+    # Only the keys after the checkpoint are sent again
+    assert len(calls) == 15
+    assert not any(blob.startswith(b"new:") for blob in calls)
+    assert (progress.rewrapped, progress.resumed) == (30, 15)
+    assert all(blob.count(b"new:") == 1 for blob in _blobs(keystore, "keys"))
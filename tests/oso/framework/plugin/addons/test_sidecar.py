@@ -0,0 +1,46 @@
+import socket
+import struct
+
+import pytest
+
+from oso.framework.plugin.addons.signing_server._sidecar import (
+    MAX_FRAME_SIZE,
+    Operation,
+    read_frame,
+    write_frame,
+)
+
+
+def test_frame_round_trip():
+    left, right = socket.socketpair()
+
+    write_frame(left, Operation.SIGN, [b"key-id", b"", b"\x00" * 100_000])
+    header, fields = read_frame(right)
+
+    assert header == Operation.SIGN
+    assert fields == [b"key-id", b"", b"\x00" * 100_000]
+    left.close()
+    assert read_frame(right) is None
+    right.close()
+
+
+def test_frame_truncated():
+    left, right = socket.socketpair()
+
+    left.sendall(struct.pack("!I", 10) + b"\x01abc")
+    left.close()
+
+    with pytest.raises(ConnectionError):
+        read_frame(right)
+    right.close()
+
+
+def test_frame_too_large():
+    left, right = socket.socketpair()
+
+    left.sendall(struct.pack("!I", MAX_FRAME_SIZE + 1))
+
+    with pytest.raises(ConnectionError, match="Invalid frame size"):
+        read_frame(right)
+    left.close()
+    right.close()
@@ -1,25 +1,52 @@
+import asyncio
+import hashlib
+import io
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import grpc
 import pytest
 
 from typing import Counter
 
 from oso.framework.plugin.addons.signing_server import SigningServerAddon
 from oso.framework.plugin.addons.signing_server._key import KeyType
+from oso.framework.plugin.addons.signing_server.generated import server_pb2
 
 
 @pytest.fixture
-def signing_server(_env, monkeypatch, grpc_stub_mock):  # noqa: F401
+def make_signing_server(_env, monkeypatch, grpc_stub_mock):  # noqa: F401
     monkeypatch.setattr(
         "oso.framework.plugin.addons.signing_server.generated.server_pb2_grpc.CryptoStub",
         grpc_stub_mock,
     )
-    from oso.framework.plugin.extension import PluginConfig  # noqa: F401
-    from oso.framework.plugin.extension import PluginExtension
-    from oso.framework.config import ConfigManager
+    created = []
+
+    def _make(**settings) -> SigningServerAddon:
+        for key, value in settings.items():
+            monkeypatch.setenv(f"PLUGIN__ADDONS__0__{key.upper()}", str(value))
+
+        from oso.framework.plugin.extension import PluginConfig  # noqa: F401
+        from oso.framework.plugin.extension import PluginExtension
+        from oso.framework.config import ConfigManager
+
+        config = ConfigManager.reload()
+        ext = PluginExtension(config.plugin)
+        assert ext.addons
+        created.append(ext.addons["SigningServer"])
+        return ext.addons["SigningServer"]
 
-    config = ConfigManager.reload()
-    ext = PluginExtension(config.plugin)
-    assert ext.addons
-    return ext.addons["SigningServer"]
+    yield _make
+
+    for addon in created:
+        addon.close()
+
+
+@pytest.fixture
+def signing_server(make_signing_server):
+    return make_signing_server()
 
 
 def test_init(signing_server: SigningServerAddon):
@@ -111,3 +138,907 @@ def test_gen_key_pair(signing_server: SigningServerAddon):
     assert Counter(signing_server.list_keys(KeyType.SECP256K1)) == Counter(
         secp256k1_list
     )
+
+
+def test_sign(signing_server: SigningServerAddon):
+    key_id, _ = signing_server.generate_key_pair(key_type=KeyType.SECP256K1)
+
+    signature = signing_server.sign(key_id, b"data")
+    assert len(bytes.fromhex(signature)) == 64
+
+
+def test_sign_many(signing_server: SigningServerAddon):
+    secp256k1_key_id, _ = signing_server.generate_key_pair(key_type=KeyType.SECP256K1)
+    ed25519_key_id, _ = signing_server.generate_key_pair(key_type=KeyType.ED25519)
+
+    requests = [
+        (secp256k1_key_id, b"first"),
+        ("unknown-key-id", b"second"),
+        (ed25519_key_id, b"third"),
+        (secp256k1_key_id, b"fail"),
+    ] + [(ed25519_key_id, str(i).encode()) for i in range(50)]
+
+    results = signing_server.sign_many(iter(requests), max_in_flight=4)
+
+    assert [result.key_id for result in results] == [r[0] for r in requests]
+    assert [result.ok for result in results[:4]] == [True, False, True, False]
+    assert all(result.ok for result in results[4:])
+
+    for (key_id, data), result in zip(requests, results):
+        if result.ok:
+            assert len(bytes.fromhex(result.signature)) == 64
+            if key_id == ed25519_key_id:
+                # Ed25519 signatures are deterministic
+                assert result.signature == signing_server.sign(key_id, data)
+        else:
+            assert result.signature is None
+            assert isinstance(result.error, Exception)
+
+
+def test_sign_stream(signing_server: SigningServerAddon, mocker):
+    key_id, _ = signing_server.generate_key_pair(key_type=KeyType.SECP256K1)
+    stub = signing_server._grep11_client._router.pools[0]._channels[0].stub
+    sign_update = mocker.spy(stub, "SignUpdate")
+    payload = bytes(range(256)) * 40
+
+    signature = signing_server.sign_stream(key_id, io.BytesIO(payload), chunk_size=1000)
+
+    assert sign_update.call_count == 11
+    assert max(len(call.args[0].Data) for call in sign_update.call_args_list) == 1000
+    assert signing_server.verify(key_id, hashlib.sha256(payload).digest(), signature)
+
+    # Chunks of an iterable are split to the configured size
+    chunks = [payload[:5000], b"", payload[5000:]]
+    signature = signing_server.sign_stream(key_id, iter(chunks), chunk_size=4096)
+    assert signing_server.verify(key_id, hashlib.sha256(payload).digest(), signature)
+
+
+def test_sign_stream_unsupported(signing_server: SigningServerAddon):
+    key_id, _ = signing_server.generate_key_pair(key_type=KeyType.ED25519)
+
+    with pytest.raises(ValueError):
+        signing_server.sign_stream(key_id, io.BytesIO(b"data"))
+
+
+def test_sign_stream_read_error(signing_server: SigningServerAddon):
+    key_id, _ = signing_server.generate_key_pair(key_type=KeyType.SECP256K1)
+
+    def _chunks():
+        yield b"data"
+        raise OSError("Read failed")
+
+    with pytest.raises(OSError, match="Read failed"):
+        signing_server.sign_stream(key_id, _chunks())
+
+
+def test_sign_digests(make_signing_server, mocker):
+    signing_server = make_signing_server(sign_digests__secp256k1="SHA256")
+    assert signing_server._config.sign_digests == {"SECP256K1": "sha256"}
+    key_id, _ = signing_server.generate_key_pair(key_type=KeyType.SECP256K1)
+    stub = signing_server._grep11_client._router.pools[0]._channels[0].stub
+    sign_single = mocker.spy(stub, "SignSingle")
+    payload = b"x" * 100_000
+
+    signature = signing_server.sign(key_id, payload)
+
+    assert sign_single.call_args.args[0].Data == hashlib.sha256(payload).digest()
+    assert signing_server.verify(key_id, payload, signature)
+    # The whole payload is signed, not only its first 32 bytes
+    assert not signing_server.verify(key_id, payload + b"!", signature)
+
+    results = signing_server.sign_many([(key_id, payload)])
+    assert signing_server.verify(key_id, payload, results[0].signature)
+
+
+@pytest.mark.parametrize("algorithm", ["unknown", "shake_256"])
+def test_sign_digests_invalid(make_signing_server, algorithm):
+    with pytest.raises(Exception, match=algorithm):
+        make_signing_server(sign_digests__secp256k1=algorithm)
+
+
+def test_sign_digests_ed25519(make_signing_server):
+    with pytest.raises(Exception, match="Ed25519"):
+        make_signing_server(sign_digests__ed25519="sha512")
+
+
+def test_multiple_endpoints(make_signing_server, mocker):
+    signing_server = make_signing_server(
+        grep11_endpoint="first:9876, second:9876", grep11_probe_interval=0
+    )
+    first, second = signing_server._grep11_client._router.pools
+    assert [first.endpoint, second.endpoint] == ["first:9876", "second:9876"]
+
+    mocker.patch.object(
+        second._channels[0].stub, "GetMechanismList", side_effect=Exception("down")
+    )
+    status = signing_server.health_check()
+    assert status.status_code == 200
+    assert status.endpoints == {"first:9876": "healthy", "second:9876": "unhealthy"}
+
+    sign_single = mocker.spy(second._channels[0].stub, "SignSingle")
+    key_id, _ = signing_server.generate_key_pair(key_type=KeyType.ED25519)
+    for result in signing_server.sign_many((key_id, b"data") for _ in range(20)):
+        assert result.ok
+    assert sign_single.call_count == 0
+
+
+def test_multiple_endpoints_down(make_signing_server, mocker):
+    signing_server = make_signing_server(grep11_endpoint="first:9876,second:9876")
+    for pool in signing_server._grep11_client._router.pools:
+        mocker.patch.object(
+            pool._channels[0].stub, "GetMechanismList", side_effect=Exception("down")
+        )
+
+    with pytest.raises(Exception, match="down"):
+        signing_server.health_check()
+
+
+def test_endpoint_weights_mismatch(make_signing_server):
+    with pytest.raises(Exception, match="grep11_endpoint_weights"):
+        make_signing_server(grep11_endpoint="first,second", grep11_endpoint_weights="1")
+
+
+class _FutureMethod:
+    """Stub method that can also be started as a future, like grpc ones."""
+
+    def __init__(self, fn):
+        self._fn = fn
+        self.futures = []
+
+    def __call__(self, request, **kwargs):
+        return self._fn(request, **kwargs)
+
+    def future(self, request, **kwargs):
+        future = Future()
+        self.futures.append(future)
+
+        def _run():
+            try:
+                result = self._fn(request, **kwargs)
+                if not future.cancelled():
+                    future.set_result(result)
+            except Exception as e:  # pragma: no cover
+                if not future.cancelled():
+                    future.set_exception(e)
+
+        threading.Thread(target=_run, daemon=True).start()
+        return future
+
+
+def test_hedging(make_signing_server, mocker):
+    signing_server = make_signing_server(
+        hedging="true", hedge_initial_delay="0.01", channel_pool_size=2
+    )
+    key_id, _ = signing_server.generate_key_pair(key_type=KeyType.ED25519)
+    release = threading.Event()
+
+    # The first attempt hangs, the hedge goes to the other channel
+    slow_stub, fast_stub = (
+        channel.stub
+        for channel in signing_server._grep11_client._router.pools[0]._channels
+    )
+    sign_single = slow_stub.SignSingle
+    slow = _FutureMethod(lambda request, **_: release.wait(5) and sign_single(request))
+    fast = _FutureMethod(fast_stub.SignSingle)
+    mocker.patch.object(slow_stub, "SignSingle", slow)
+    mocker.patch.object(fast_stub, "SignSingle", fast)
+
+    signature = signing_server.sign(key_id, b"data")
+    release.set()
+
+    assert signing_server.verify(key_id, b"data", signature)
+    hedging = signing_server.health_check().hedging
+    assert hedging["SignSingle"]["issued"] == 1
+    assert hedging["SignSingle"]["won"] == 1
+    assert slow.futures[0].cancelled()
+    assert signing_server._grep11_client._router._endpoints[0].in_flight == 0
+
+
+class _Unavailable(grpc.RpcError):
+    def code(self):
+        return grpc.StatusCode.UNAVAILABLE
+
+    def details(self):
+        return "connection refused"
+
+
+def test_circuit_breaker(make_signing_server, mocker):
+    signing_server = make_signing_server(
+        circuit_window=4, circuit_min_calls=4, retry_max_attempts=1
+    )
+    key_id, _ = signing_server.generate_key_pair(key_type=KeyType.ED25519)
+    stub = signing_server._grep11_client._router.pools[0]._channels[0].stub
+    sign_single = mocker.patch.object(stub, "SignSingle", side_effect=_Unavailable())
+    get_mechanism_list = mocker.spy(stub, "GetMechanismList")
+
+    # With the key generation, 3 failures out of 4 calls open the circuit
+    for _ in range(3):
+        with pytest.raises(_Unavailable):
+            signing_server.sign(key_id, b"data")
+
+    # Rejected without calling the GREP11 server
+    with pytest.raises(Exception, match="Circuit open"):
+        signing_server.sign(key_id, b"data")
+    assert sign_single.call_count == 3
+
+    status = signing_server.health_check()
+    assert status.status_code == 503
+    assert status.circuit_breakers == {"localhost": "open"}
+    assert get_mechanism_list.call_count == 0
+
+
+def test_async_shares_routing_and_limits(
+    make_signing_server, monkeypatch, grpc_aio_stub_mock, mocker
+):
+    signing_server = make_signing_server(
+        circuit_window=4,
+        circuit_min_calls=4,
+        retry_max_attempts=1,
+        channel_pool_size=2,
+        adaptive_concurrency="true",
+    )
+    monkeypatch.setattr(
+        "oso.framework.plugin.addons.signing_server.generated.server_pb2_grpc.CryptoStub",
+        grpc_aio_stub_mock,
+    )
+    key_id, _ = signing_server.generate_key_pair(key_type=KeyType.ED25519)
+    slot_async = mocker.spy(signing_server._grep11_client.limiter, "slot_async")
+
+    async def _unavailable(request, **kwargs):
+        raise _Unavailable()
+
+    async def _run():
+        client = await signing_server._get_aio_client()
+        channels = client._endpoints["localhost"].channels
+        assert len(channels) == 2
+
+        await signing_server.sign_async(key_id, b"data")
+        assert slot_async.call_count == 1
+
+        for channel in channels:
+            channel.stub.SignSingle = _unavailable
+        # With the key generation and the first signature, 2 failures out of 4
+        # calls open the circuit shared with the synchronous calls
+        for _ in range(2):
+            with pytest.raises(_Unavailable):
+                await signing_server.sign_async(key_id, b"data")
+        with pytest.raises(Exception, match="Circuit open"):
+            await signing_server.sign_async(key_id, b"data")
+
+    asyncio.run(_run())
+    assert signing_server.health_check().circuit_breakers == {"localhost": "open"}
+    with pytest.raises(Exception, match="Circuit open"):
+        signing_server.sign(key_id, b"data")
+
+
+def test_rpc_timeouts(make_signing_server, mocker):
+    signing_server = make_signing_server(sign_timeout=2.5, generate_key_pair_timeout=0)
+    stub = signing_server._grep11_client._router.pools[0]._channels[0].stub
+    generate_key_pair = mocker.spy(stub, "GenerateKeyPair")
+    sign_single = mocker.spy(stub, "SignSingle")
+
+    key_id, _ = signing_server.generate_key_pair(key_type=KeyType.ED25519)
+    signing_server.sign(key_id, b"data")
+
+    assert generate_key_pair.call_args.kwargs["timeout"] is None
+    assert sign_single.call_args.kwargs["timeout"] == 2.5
+
+
+def test_retry(make_signing_server, mocker):
+    signing_server = make_signing_server(retry_initial_backoff=0)
+    key_id, _ = signing_server.generate_key_pair(key_type=KeyType.ED25519)
+    stub = signing_server._grep11_client._router.pools[0]._channels[0].stub
+    failures = iter([_Unavailable(), _Unavailable()])
+    sign_single = stub.SignSingle
+
+    def _flaky(request, timeout=None, compression=None):
+        for failure in failures:
+            raise failure
+        return sign_single(request)
+
+    patched = mocker.patch.object(stub, "SignSingle", side_effect=_flaky)
+
+    signature = signing_server.sign(key_id, b"data")
+
+    assert signing_server.verify(key_id, b"data", signature)
+    assert patched.call_count == 3
+
+
+def test_health_check_cache(make_signing_server, mocker):
+    signing_server = make_signing_server(health_check_cache_ttl=60)
+    stub = signing_server._grep11_client._router.pools[0]._channels[0].stub
+    get_mechanism_list = mocker.spy(stub, "GetMechanismList")
+
+    for _ in range(5):
+        assert signing_server.health_check().status_code == 200
+    assert get_mechanism_list.call_count == 0
+
+
+class _ReadyFuture:
+    def cancel(self):
+        return False
+
+    def cancelled(self):
+        return False
+
+    def add_done_callback(self, fn):
+        fn(self)
+
+
+def test_background_startup(make_signing_server, mocker):
+    connect = mocker.patch("grpc.channel_ready_future", return_value=_ReadyFuture())
+    signing_server = make_signing_server(startup_mode="background")
+
+    assert signing_server._warmed_up.wait(5)
+    assert connect.call_count == 1
+    assert signing_server.health_check().status_code == 200
+
+
+def test_background_startup_warming_up(make_signing_server, mocker):
+    pending = mocker.Mock()
+    pending.cancelled.return_value = False
+    mocker.patch("grpc.channel_ready_future", return_value=pending)
+    signing_server = make_signing_server(startup_mode="background")
+
+    status = signing_server.health_check()
+
+    assert status.status_code == 503
+    assert status.status == "Warming up"
+    # Calls do not wait for the warm-up
+    key_id, _ = signing_server.generate_key_pair(key_type=KeyType.ED25519)
+    assert signing_server.sign(key_id, b"data")
+
+
+def test_sign_batching(make_signing_server, mocker):
+    signing_server = make_signing_server(sign_batch_window=0.05, key_cache_size=0)
+    key_ids = [
+        signing_server.generate_key_pair(key_type=KeyType.ED25519)[0] for _ in range(8)
+    ]
+    get_many = mocker.spy(signing_server._keystore, "get_many")
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        signatures = list(
+            executor.map(lambda key_id: signing_server.sign(key_id, b"data"), key_ids)
+        )
+
+    for key_id, signature in zip(key_ids, signatures):
+        assert signing_server.verify(key_id, b"data", signature)
+    assert 1 <= get_many.call_count < len(key_ids)
+    with pytest.raises(Exception, match="Could not find key pair"):
+        signing_server.sign("unknown-key-id", b"data")
+
+
+def test_hd_derivation(signing_server: SigningServerAddon):
+    stub = signing_server._grep11_client._router.pools[0]._channels[0].stub
+    parent_id = signing_server.generate_hd_parent(KeyType.SECP256K1)
+    master = stub.derive_requests[-1].Mech.BTCDeriveParameter
+    assert master.Type == server_pb2.BTCDeriveParm.CkBIP0032MASTERK
+    # Only the parent is stored
+    assert signing_server.count_keys() == 0
+
+    key_id, pem = signing_server.derive_key(parent_id, "m/44'/60'/0'/0/7")
+    assert key_id == f"{parent_id}/44'/60'/0'/0/7"
+    assert signing_server.get_key_pem(key_id) == pem
+    assert signing_server.get_key_pems([key_id, "unknown-key-id"]) == [pem, None]
+
+    signature = signing_server.sign(key_id, b"data")
+    assert signing_server.verify(key_id, b"data", signature)
+    assert asyncio.run(signing_server.verify_async(key_id, b"data", signature))
+
+    # Siblings are derived from the cached parent node, with their public key
+    stub.derive_requests.clear()
+    signing_server.derive_key(parent_id, "m/44'/60'/0'/0/8")
+    assert [r.Mech.BTCDeriveParameter.Type for r in stub.derive_requests] == [
+        server_pb2.BTCDeriveParm.CkBIP0032PRV2PRV,
+        server_pb2.BTCDeriveParm.CkBIP0032PRV2PUB,
+    ]
+    assert stub.derive_requests[0].Mech.BTCDeriveParameter.ChildKeyIndex == 8
+
+    with pytest.raises(Exception, match="Could not find HD parent"):
+        signing_server.derive_key("unknown-parent", "m/0")
+    with pytest.raises(ValueError, match="Invalid derivation path"):
+        signing_server.derive_key(parent_id, "m/x")
+    assert signing_server.get_key_pem("unknown-parent/0") is None
+
+    ed25519_parent = signing_server.generate_hd_parent(KeyType.ED25519)
+    ed25519_key_id, _ = signing_server.derive_key(ed25519_parent, "m/0'/1'")
+    signature = signing_server.sign(ed25519_key_id, b"data")
+    assert signing_server.verify(ed25519_key_id, b"data", signature)
+
+
+def test_rewrap_keys(signing_server: SigningServerAddon):
+    key_id, _ = signing_server.generate_key_pair(key_type=KeyType.SECP256K1)
+    signature = signing_server.sign(key_id, b"data")
+    parent_id = signing_server.generate_hd_parent(KeyType.SECP256K1)
+    child_id, _ = signing_server.derive_key(parent_id, "m/0")
+    progresses = []
+
+    progress = signing_server.rewrap_keys(on_progress=progresses.append)
+
+    assert (progress.rewrapped, progress.failed) == (2, 0)
+    assert progresses
+    assert signing_server._keystore.get(key_id)[1].startswith(b"rewrapped:")
+    parent_blob = signing_server._keystore.get_hd_parent(parent_id)[1]
+    assert parent_blob.startswith(b"rewrapped:")
+    # Derived keys are derived again from the rewrapped parent
+    stub = signing_server._grep11_client._router.pools[0]._channels[0].stub
+    stub.derive_requests.clear()
+    signing_server.sign(child_id, b"data")
+    assert stub.derive_requests[0].BaseKey.KeyBlobs[0] == parent_blob
+    # The cached blob was dropped, signing uses the rewrapped one
+    assert signing_server._find_keys(key_id)[1].PrivateKey.startswith(b"rewrapped:")
+    assert signing_server.verify(key_id, b"data", signature)
+
+
+@pytest.fixture
+def sidecar(signing_server, tmp_path):
+    from oso.framework.plugin.addons.signing_server._sidecar import SigningSidecar
+
+    server = SigningSidecar(signing_server, str(tmp_path / "signing.sock"))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+def test_sidecar(sidecar, make_signing_server):
+    client = make_signing_server(sidecar_socket=sidecar.server_address)
+    assert type(client).__name__ == "SidecarClient"
+
+    key_id, pem = client.generate_key_pair(KeyType.SECP256K1)
+    signature = client.sign(key_id, b"data")
+
+    assert client.verify(key_id, b"data", signature)
+    assert not client.verify(key_id, b"other", signature)
+    assert client.get_key_pem(key_id) == pem
+    assert client.get_key_pem("unknown-key-id") is None
+    assert key_id in client.list_keys(KeyType.SECP256K1)
+    assert client.health_check().status_code == 200
+    with pytest.raises(Exception, match="Could not find key pair"):
+        client.sign("unknown-key-id", b"data")
+    # The connection is still usable after an error
+    assert client.verify(key_id, b"data", client.sign(key_id, b"data"))
+
+    parent_id = client.generate_hd_parent(KeyType.SECP256K1)
+    child_id, child_pem = client.derive_key(parent_id, "m/0/1")
+    assert client.get_key_pem(child_id) == child_pem
+    assert client.verify(child_id, b"data", client.sign(child_id, b"data"))
+
+
+@pytest.fixture
+def sidecar_client(sidecar):
+    from oso.framework.plugin.addons.signing_server._sidecar import SidecarClient
+
+    client = SidecarClient(sidecar.server_address, timeout=10)
+    yield client
+    client.close()
+
+
+def test_sidecar_batches(sidecar, sidecar_client):
+    pairs = sidecar_client.generate_key_pairs(KeyType.ED25519, 3, max_in_flight=2)
+    key_ids = [key_id for key_id, _ in pairs]
+
+    assert len(pairs) == 3
+    assert sidecar_client.count_keys(KeyType.ED25519) == 3
+    assert sidecar_client.count_keys() == 3
+    assert sidecar_client.get_key_pems(key_ids + ["unknown-key-id"]) == [
+        pem for _, pem in pairs
+    ] + [None]
+
+    results = sidecar_client.sign_many(
+        [(key_ids[0], b"first"), ("unknown-key-id", b"second"), (key_ids[1], b"")]
+    )
+    assert [result.key_id for result in results] == [
+        key_ids[0],
+        "unknown-key-id",
+        key_ids[1],
+    ]
+    assert [result.ok for result in results] == [True, False, True]
+    assert "Could not find key pair" in str(results[1].error)
+    assert results[0].signature == sidecar.addon.sign(key_ids[0], b"first")
+
+    assert sidecar_client.verify_many(
+        [
+            (key_ids[0], b"first", results[0].signature),
+            (key_ids[0], b"other", results[0].signature),
+            (key_ids[1], b"", results[2].signature),
+        ],
+        max_in_flight=2,
+    ) == [True, False, True]
+
+
+def test_sidecar_sign_stream(sidecar, sidecar_client, mocker):
+    from oso.framework.plugin.addons.signing_server._sidecar import SidecarError
+
+    key_id, _ = sidecar_client.generate_key_pair(KeyType.SECP256K1)
+    stub = sidecar.addon._grep11_client._router.pools[0]._channels[0].stub
+    sign_update = mocker.spy(stub, "SignUpdate")
+    payload = bytes(range(256)) * 40
+
+    signature = sidecar_client.sign_stream(key_id, io.BytesIO(payload), chunk_size=1000)
+
+    assert sign_update.call_count == 11
+    digest = hashlib.sha256(payload).digest()
+    assert sidecar_client.verify(key_id, digest, signature)
+
+    # The chunks left by a failure are skipped, the connection stays usable
+    ed25519_key_id, _ = sidecar_client.generate_key_pair(KeyType.ED25519)
+    with pytest.raises(SidecarError):
+        sidecar_client.sign_stream(ed25519_key_id, iter([b"data"] * 100), 1)
+    assert sidecar_client.verify(key_id, digest, signature)
+
+
+def test_sidecar_rewrap_keys(sidecar, sidecar_client):
+    key_id, _ = sidecar_client.generate_key_pair(KeyType.SECP256K1)
+    sidecar_client.generate_key_pair(KeyType.ED25519)
+    progresses = []
+
+    progress = sidecar_client.rewrap_keys(on_progress=progresses.append)
+
+    assert (progress.total, progress.rewrapped, progress.failed) == (2, 2, 0)
+    assert progresses and progresses[-1].done == 2
+    assert sidecar.addon._keystore.get(key_id)[1].startswith(b"rewrapped:")
+
+
+def test_sidecar_async(sidecar_client):
+    async def _run():
+        status = await sidecar_client.health_check_async()
+        assert status.status_code == 200
+
+        key_id, pem = await sidecar_client.generate_key_pair_async(KeyType.ED25519)
+        assert sidecar_client.get_key_pem(key_id) == pem
+
+        signature = await sidecar_client.sign_async(key_id, b"data")
+        assert await sidecar_client.verify_async(key_id, b"data", signature)
+        assert not await sidecar_client.verify_async(key_id, b"other", signature)
+
+        results = await sidecar_client.sign_many_async(
+            [(key_id, b"data"), ("unknown-key-id", b"data")], max_in_flight=2
+        )
+        assert [result.signature for result in results] == [signature, None]
+
+    asyncio.run(_run())
+
+
+def test_channel_options(make_signing_server, mocker):
+    secure_channel = mocker.spy(grpc, "secure_channel")
+    make_signing_server(
+        grpc_keepalive_time=60,
+        grpc_max_receive_message_length=-1,
+        grpc_initial_window_size=1 << 20,
+    )
+
+    options = dict(secure_channel.call_args.kwargs["options"])
+    assert options["grpc.keepalive_time_ms"] == 60_000
+    assert options["grpc.keepalive_timeout_ms"] == 20_000
+    assert options["grpc.keepalive_permit_without_calls"] == 1
+    assert options["grpc.max_receive_message_length"] == -1
+    assert "grpc.max_send_message_length" not in options
+    assert options["grpc.http2.lookahead_bytes"] == 1 << 20
+    assert options["grpc.http2.bdp_probe"] == 0
+
+
+def test_compression(make_signing_server, mocker):
+    signing_server = make_signing_server(
+        grpc_compression="gzip", grpc_compression_min_size=1024
+    )
+    key_id, _ = signing_server.generate_key_pair(key_type=KeyType.ED25519)
+    stub = signing_server._grep11_client._router.pools[0]._channels[0].stub
+    sign_single = mocker.spy(stub, "SignSingle")
+
+    signing_server.sign(key_id, b"data")
+    assert sign_single.call_args.kwargs["compression"] is None
+
+    signing_server.sign(key_id, b"data" * 1024)
+    assert sign_single.call_args.kwargs["compression"] == grpc.Compression.Gzip
+
+
+def test_adaptive_concurrency(make_signing_server):
+    signing_server = make_signing_server(adaptive_concurrency="true", max_in_flight=4)
+    key_id, _ = signing_server.generate_key_pair(key_type=KeyType.ED25519)
+
+    results = signing_server.sign_many((key_id, str(i).encode()) for i in range(50))
+
+    assert all(result.ok for result in results)
+    concurrency = signing_server.health_check().concurrency
+    assert concurrency["in_flight"] == 0
+    assert concurrency["queued"] == 0
+    assert 1 <= concurrency["limit"] <= 64
+
+
+def test_verify(signing_server: SigningServerAddon):
+    key_id, _ = signing_server.generate_key_pair(key_type=KeyType.ED25519)
+    signature = signing_server.sign(key_id, b"data")
+
+    assert signing_server.verify(key_id, b"data", signature)
+    assert not signing_server.verify(key_id, b"other", signature)
+    assert not signing_server.verify("unknown-key-id", b"data", signature)
+
+
+def test_async(signing_server: SigningServerAddon, monkeypatch, grpc_aio_stub_mock):
+    monkeypatch.setattr(
+        "oso.framework.plugin.addons.signing_server.generated.server_pb2_grpc.CryptoStub",
+        grpc_aio_stub_mock,
+    )
+
+    async def _run():
+        status = await signing_server.health_check_async()
+        assert status.status_code == 200
+
+        key_id, pub_key_pem = await signing_server.generate_key_pair_async(
+            KeyType.ED25519
+        )
+        assert signing_server.get_key_pem(key_id) == pub_key_pem
+
+        signature = await signing_server.sign_async(key_id, b"data")
+        assert await signing_server.verify_async(key_id, b"data", signature)
+        assert not await signing_server.verify_async(key_id, b"other", signature)
+
+        requests = [(key_id, str(i).encode()) for i in range(100)]
+        requests.insert(1, ("unknown-key-id", b"data"))
+        results = await signing_server.sign_many_async(requests, max_in_flight=10)
+        assert [result.ok for result in results].count(False) == 1
+        assert not results[1].ok
+        assert results[0].signature == await signing_server.sign_async(key_id, b"0")
+
+    asyncio.run(_run())
+
+
+def test_async_client_per_event_loop(
+    signing_server: SigningServerAddon, monkeypatch, grpc_aio_stub_mock, mocker
+):
+    from oso.framework.plugin.addons.signing_server._aio_grep11_client import (
+        AsyncGrep11Client,
+    )
+
+    monkeypatch.setattr(
+        "oso.framework.plugin.addons.signing_server.generated.server_pb2_grpc.CryptoStub",
+        grpc_aio_stub_mock,
+    )
+    close = mocker.spy(AsyncGrep11Client, "close")
+    key_id, _ = signing_server.generate_key_pair(KeyType.SECP256K1)
+
+    asyncio.run(signing_server.sign_async(key_id, b"data"))
+    first = signing_server._aio_client
+    assert close.call_count == 0
+
+    # A new event loop gets a new client, and the previous one is closed
+    asyncio.run(signing_server.sign_async(key_id, b"data"))
+    second = signing_server._aio_client
+    assert second is not first
+    assert [call.args[0] for call in close.call_args_list] == [first]
+
+    signing_server.close()
+    assert [call.args[0] for call in close.call_args_list] == [first, second]
+    assert signing_server._aio_client is None
+
+
+def test_key_cache(signing_server: SigningServerAddon):
+    key_id, _ = signing_server.generate_key_pair(key_type=KeyType.SECP256K1)
+    signing_server._key_cache.clear()
+
+    signing_server.sign(key_id, b"data")
+    stats = signing_server._key_cache.stats()
+    assert (stats["hits"], stats["misses"]) == (0, 1)
+
+    # Hot keys are served without touching the keystore
+    signing_server._keystore._connection().execute("DELETE FROM keys")
+    signing_server.sign(key_id, b"data")
+    assert signing_server._key_cache.stats()["hits"] == 1
+
+    key_cache = signing_server.health_check().key_cache
+    assert key_cache == signing_server._key_cache.stats()
+    assert (key_cache["hits"], key_cache["misses"], key_cache["size"]) == (1, 1, 1)
+
+
+def test_sign_from_threads(signing_server: SigningServerAddon):
+    from concurrent.futures import ThreadPoolExecutor
+
+    signing_server._key_cache.clear()
+    signing_server._key_cache.max_size = 0
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        key_ids = list(
+            executor.map(
+                lambda _: signing_server.generate_key_pair(KeyType.ED25519)[0],
+                range(32),
+            )
+        )
+        signatures = list(
+            executor.map(lambda key_id: signing_server.sign(key_id, b"data"), key_ids)
+        )
+
+    assert signing_server.count_keys(KeyType.ED25519) == 32
+    assert len(set(signatures)) == 1
+
+
+def test_generate_key_pairs(signing_server: SigningServerAddon, mocker):
+    insert_many = mocker.spy(signing_server._keystore, "insert_many")
+
+    pairs = signing_server.generate_key_pairs(KeyType.SECP256K1, 40, max_in_flight=8)
+
+    assert len(pairs) == 40
+    assert insert_many.call_count == 1
+    assert Counter(signing_server.list_keys(KeyType.SECP256K1)) == Counter(
+        key_id for key_id, _ in pairs
+    )
+    for key_id, pub_key_pem in pairs:
+        assert signing_server.get_key_pem(key_id) == pub_key_pem
+
+
+def test_generate_key_pairs_partial_failure(signing_server: SigningServerAddon, mocker):
+    generate = signing_server._grep11_client.generate_key_pair
+    calls = iter(range(10))
+
+    def _flaky(key_type):
+        if next(calls) % 3 == 0:
+            raise Exception("GREP11 unavailable")
+        return generate(key_type=key_type)
+
+    mocker.patch.object(signing_server._grep11_client, "generate_key_pair", _flaky)
+
+    pairs = signing_server.generate_key_pairs(KeyType.ED25519, 10, max_in_flight=1)
+
+    assert len(pairs) == 6
+    assert signing_server.count_keys(KeyType.ED25519) == 6
+
+
+def test_key_pool(make_signing_server, mocker):
+    signing_server = make_signing_server(
+        key_pool_key_types="secp256k1",
+        key_pool_low_water=5,
+        key_pool_high_water=10,
+        key_pool_refill_interval=0.05,
+    )
+    key_pool = signing_server._key_pool
+    assert key_pool is not None
+
+    deadline = time.monotonic() + 5
+    while key_pool.depth()["SECP256K1"] < 10 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert signing_server.health_check().key_pool == {"SECP256K1": 10}
+
+    generate = mocker.spy(signing_server._grep11_client, "generate_key_pair")
+
+    # Pooled keys are handed out without a GREP11 call
+    key_id, pub_key_pem = signing_server.generate_key_pair(KeyType.SECP256K1)
+    assert generate.call_count == 0
+    assert signing_server.list_keys(KeyType.SECP256K1) == [key_id]
+    assert signing_server.get_key_pem(key_id) == pub_key_pem
+    assert key_pool.depth()["SECP256K1"] == 9
+
+    # Other key types are not pooled
+    signing_server.generate_key_pair(KeyType.ED25519)
+    assert generate.call_count == 1
+
+
+def test_key_pool_claim_is_atomic(signing_server: SigningServerAddon):
+    from concurrent.futures import ThreadPoolExecutor
+
+    keystore = signing_server._keystore
+    keystore.add_to_pool(
+        (str(uuid.uuid4()), "ED25519", bytes([i]), bytes([i])) for i in range(20)
+    )
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        claimed = list(
+            executor.map(lambda _: keystore.claim_from_pool("ED25519"), range(30))
+        )
+
+    key_ids = [row[0] for row in claimed if row is not None]
+    assert len(key_ids) == len(set(key_ids)) == 20
+    assert keystore.pool_depth("ED25519") == 0
+    assert signing_server.count_keys(KeyType.ED25519) == 20
+
+
+def test_key_pool_shared_by_refillers(tmp_path):
+    from oso.framework.plugin.addons.signing_server._key import KeyPair
+    from oso.framework.plugin.addons.signing_server._key_pool import KeyPoolRefiller
+    from oso.framework.plugin.addons.signing_server._keystore import Keystore
+
+    def _generate(key_type):
+        time.sleep(0.001)
+        return KeyPair(PrivateKey=uuid.uuid4().bytes, PublicKey=b"\x04" * 65)
+
+    # One refiller per worker process, all filling the same keystore
+    refillers = [
+        KeyPoolRefiller(
+            keystore=Keystore(tmp_path / "keystore.db"),
+            generate=_generate,
+            key_types=[KeyType.SECP256K1],
+            low_water=5,
+            high_water=20,
+            concurrency=2,
+            interval=60,
+        )
+        for _ in range(4)
+    ]
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        added = list(
+            executor.map(lambda r: r.refill(KeyType.SECP256K1), refillers)
+        )
+
+    assert sum(added) == 20
+    assert refillers[0].depth() == {"SECP256K1": 20}
+    for refiller in refillers:
+        refiller.stop()
+
+
+def test_generate_key_pairs_claims_pooled_keys(make_signing_server, mocker):
+    signing_server = make_signing_server(
+        key_pool_key_types="secp256k1",
+        key_pool_low_water=3,
+        key_pool_high_water=3,
+        key_pool_refill_interval=60,
+    )
+    key_pool = signing_server._key_pool
+    assert key_pool is not None
+    deadline = time.monotonic() + 5
+    while key_pool.depth()["SECP256K1"] < 3 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    key_pool.stop()
+
+    generate = mocker.spy(signing_server._grep11_client, "generate_key_pair")
+    pairs = signing_server.generate_key_pairs(KeyType.SECP256K1, 5)
+
+    # Only the keys missing from the pool are generated
+    assert generate.call_count == 2
+    assert len(pairs) == 5
+    assert key_pool.depth()["SECP256K1"] == 0
+    assert sorted(signing_server.list_keys(KeyType.SECP256K1)) == sorted(
+        key_id for key_id, _ in pairs
+    )
+    for key_id, pub_key_pem in pairs:
+        assert signing_server.get_key_pem(key_id) == pub_key_pem
+
+
+def test_get_key_pems(signing_server: SigningServerAddon):
+    pairs = signing_server.generate_key_pairs(KeyType.ED25519, 5)
+    key_ids = [key_id for key_id, _ in pairs]
+
+    pems = signing_server.get_key_pems(reversed(key_ids + ["unknown-key-id"]))
+
+    assert pems == [None] + [pem for _, pem in reversed(pairs)]
+
+
+@pytest.mark.parametrize("verify_mode", ["local", "grep11"])
+def test_verify_many(make_signing_server, mocker, verify_mode):
+    signing_server = make_signing_server(verify_mode=verify_mode)
+    verify_single = mocker.spy(signing_server._grep11_client, "verify")
+
+    requests = []
+    for key_type in (KeyType.SECP256K1, KeyType.ED25519):
+        key_id, _ = signing_server.generate_key_pair(key_type)
+        for data in (b"short", b"\x00" * 31 + b"\x01", b"long" * 40):
+            signature = signing_server.sign(key_id, data)
+            requests.append((key_id, data, signature, True))
+            # CKM_ECDSA only signs the leftmost 32 bytes, so tamper with the front
+            requests.append((key_id, b"!" + data, signature, False))
+        requests.append((key_id, b"data", "not-hex", False))
+    requests.append(("unknown-key-id", b"data", "00" * 64, False))
+
+    results = signing_server.verify_many(
+        ((key_id, data, signature) for key_id, data, signature, _ in requests),
+        max_in_flight=4,
+    )
+
+    assert results == [expected for *_, expected in requests]
+    if verify_mode == "local":
+        assert verify_single.call_count == 0
+    else:
+        assert verify_single.call_count == len(requests) - 1
+
+
+def test_local_verify_fallback(signing_server: SigningServerAddon, mocker):
+    key_id, _ = signing_server.generate_key_pair(KeyType.ED25519)
+    signature = signing_server.sign(key_id, b"data")
+    verify_single = mocker.spy(signing_server._grep11_client, "verify")
+
+    # Public keys that cannot be loaded are verified by the GREP11 server
+    _, key_pair = signing_server._find_keys(key_id)
+    key_pair.PublicKey = b"\x04" + key_pair.PublicKey
+
+    assert signing_server.verify(key_id, b"data", signature)
+    assert verify_single.call_count == 1
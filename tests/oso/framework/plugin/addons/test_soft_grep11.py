@@ -0,0 +1,175 @@
+import hashlib
+import time
+
+import grpc
+import pkcs11
+import pytest
+
+from oso.framework.plugin.addons.signing_server._key import (
+    KeyType,
+    StreamingMechanism,
+)
+from oso.framework.plugin.addons.signing_server._soft_grep11 import (
+    MECHANISMS,
+    SoftCryptoServicer,
+    serve,
+)
+from oso.framework.plugin.addons.signing_server._verifier import LocalVerifier
+from oso.framework.plugin.addons.signing_server.generated import (
+    server_pb2,
+    server_pb2_grpc,
+)
+
+
+@pytest.fixture
+def make_stub():
+    servers = []
+
+    def _make(**settings):
+        server, port = serve("localhost:0", None, SoftCryptoServicer(**settings))
+        servers.append(server)
+        channel = grpc.insecure_channel(f"localhost:{port}")
+        return server_pb2_grpc.CryptoStub(channel)
+
+    yield _make
+    for server in servers:
+        server.stop(None)
+
+
+def _generate(stub, key_type: KeyType) -> server_pb2.GenerateKeyPairResponse:
+    return stub.GenerateKeyPair(
+        server_pb2.GenerateKeyPairRequest(
+            Mech=server_pb2.Mechanism(Mechanism=pkcs11.Mechanism.EC_KEY_PAIR_GEN),
+            PubKeyTemplate={
+                pkcs11.Attribute.EC_PARAMS: server_pb2.AttributeValue(
+                    AttributeB=bytes.fromhex(key_type.value.Oid)
+                )
+            },
+        )
+    )
+
+
+def _sign(stub, key_type: KeyType, private_key: bytes, data: bytes) -> bytes:
+    return stub.SignSingle(
+        server_pb2.SignSingleRequest(
+            Mech=server_pb2.Mechanism(Mechanism=key_type.value.Mechanism),
+            PrivKey=server_pb2.KeyBlob(KeyBlobs=[private_key]),
+            Data=data,
+        )
+    ).Signature
+
+
+def _verify(stub, key_type: KeyType, public_key: bytes, data: bytes, signature):
+    stub.VerifySingle(
+        server_pb2.VerifySingleRequest(
+            Mech=server_pb2.Mechanism(Mechanism=key_type.value.Mechanism),
+            PubKey=server_pb2.KeyBlob(KeyBlobs=[public_key]),
+            Data=data,
+            Signature=signature,
+        )
+    )
+
+
+@pytest.mark.parametrize("key_type", list(KeyType))
+def test_sign_and_verify(make_stub, key_type):
+    stub = make_stub()
+    key_pair = _generate(stub, key_type)
+    data = hashlib.sha256(b"data").digest()
+
+    signature = _sign(stub, key_type, key_pair.PrivKeyBytes, data)
+
+    _verify(stub, key_type, key_pair.PubKeyBytes, data, signature)
+    assert LocalVerifier().verify(key_type, key_pair.PubKeyBytes, data, signature.hex())
+    with pytest.raises(grpc.RpcError) as e:
+        _verify(stub, key_type, key_pair.PubKeyBytes, b"other", signature)
+    assert e.value.details() == "CKR_SIGNATURE_INVALID"
+    assert set(MECHANISMS) <= set(
+        stub.GetMechanismList(server_pb2.GetMechanismListRequest()).Mechs
+    )
+
+
+def test_sign_multi_part(make_stub):
+    stub = make_stub()
+    key_pair = _generate(stub, KeyType.SECP256K1)
+    private_key = server_pb2.KeyBlob(KeyBlobs=[key_pair.PrivKeyBytes])
+
+    state = stub.SignInit(
+        server_pb2.SignInitRequest(
+            Mech=server_pb2.Mechanism(Mechanism=StreamingMechanism.ECDSA_SHA256),
+            PrivKey=private_key,
+        )
+    ).State
+    for chunk in [b"chunk-1", b"chunk-2"]:
+        state = stub.SignUpdate(
+            server_pb2.SignUpdateRequest(State=state, Data=chunk)
+        ).State
+    signature = stub.SignFinal(server_pb2.SignFinalRequest(State=state)).Signature
+
+    digest = hashlib.sha256(b"chunk-1chunk-2").digest()
+    assert LocalVerifier().verify(
+        KeyType.SECP256K1, key_pair.PubKeyBytes, digest, signature.hex()
+    )
+    with pytest.raises(grpc.RpcError, match="CKR_OPERATION_NOT_INITIALIZED"):
+        stub.SignFinal(server_pb2.SignFinalRequest(State=state))
+
+
+def _sign_init(stub, key_pair) -> bytes:
+    return stub.SignInit(
+        server_pb2.SignInitRequest(
+            Mech=server_pb2.Mechanism(Mechanism=StreamingMechanism.ECDSA_SHA256),
+            PrivKey=server_pb2.KeyBlob(KeyBlobs=[key_pair.PrivKeyBytes]),
+        )
+    ).State
+
+
+def test_sign_sessions_evicted(make_stub):
+    stub = make_stub(session_ttl=0.2, max_sessions=2)
+    key_pair = _generate(stub, KeyType.SECP256K1)
+
+    # The least recently used session is dropped beyond the cap
+    first, second = _sign_init(stub, key_pair), _sign_init(stub, key_pair)
+    stub.SignUpdate(server_pb2.SignUpdateRequest(State=first, Data=b"data"))
+    third = _sign_init(stub, key_pair)
+    with pytest.raises(grpc.RpcError, match="CKR_OPERATION_NOT_INITIALIZED"):
+        stub.SignFinal(server_pb2.SignFinalRequest(State=second))
+    stub.SignFinal(server_pb2.SignFinalRequest(State=first))
+
+    # Idle sessions expire
+    time.sleep(0.3)
+    with pytest.raises(grpc.RpcError, match="CKR_OPERATION_NOT_INITIALIZED"):
+        stub.SignUpdate(server_pb2.SignUpdateRequest(State=third, Data=b"data"))
+
+
+def test_key_blobs(make_stub):
+    wrapping_key = bytes(32)
+    stub = make_stub(wrapping_key=wrapping_key)
+    ed25519_key = _generate(stub, KeyType.ED25519).PrivKeyBytes
+
+    # Blobs are only valid for the wrapping key they were made with
+    _sign(make_stub(wrapping_key=wrapping_key), KeyType.ED25519, ed25519_key, b"x")
+    for stub, blob, details in [
+        (make_stub(), ed25519_key, "CKR_WRAPPED_KEY_INVALID"),
+        (stub, b"garbage", "CKR_WRAPPED_KEY_INVALID"),
+        (stub, ed25519_key, "CKR_KEY_TYPE_INCONSISTENT"),
+    ]:
+        with pytest.raises(grpc.RpcError) as e:
+            _sign(stub, KeyType.SECP256K1, blob, b"x")
+        assert e.value.code() == grpc.StatusCode.INVALID_ARGUMENT
+        assert e.value.details() == details
+
+
+def test_latency_and_errors(make_stub):
+    request = server_pb2.GetMechanismListRequest()
+
+    start = time.monotonic()
+    make_stub(latency=0.05, jitter=0.001).GetMechanismList(request)
+    assert time.monotonic() - start >= 0.05
+
+    with pytest.raises(grpc.RpcError) as e:
+        make_stub(error_rate=1.0).GetMechanismList(request)
+    assert e.value.code() == grpc.StatusCode.UNAVAILABLE
+
+    stub = make_stub(error_rate=1.0, error_code=grpc.StatusCode.RESOURCE_EXHAUSTED)
+    with pytest.raises(grpc.RpcError) as e:
+        stub.GetMechanismList(request)
+    assert e.value.code() == grpc.StatusCode.RESOURCE_EXHAUSTED